@@ -3,7 +3,13 @@ from __future__ import annotations
 import sqlite3
 
 from .connection import DB_LOCK, get_conn
-from .schema import ensure_indexes, ensure_tables, ensure_views
+from .schema import (
+    collapse_running_runs,
+    ensure_columns,
+    ensure_indexes,
+    ensure_tables,
+    ensure_views,
+)
 
 __all__ = ["init_db"]
 
@@ -18,6 +24,8 @@ def init_db(conn: sqlite3.Connection | None = None) -> None:
             conn.execute("BEGIN")
             try:
                 ensure_tables(conn)
+                ensure_columns(conn)
+                collapse_running_runs(conn)
                 ensure_indexes(conn)
                 ensure_views(conn)
             except Exception:
@@ -7,6 +7,8 @@ from typing import Final
 __all__ = [
     "TABLE_DEFINITIONS",
     "INDEX_DEFINITIONS",
+    "collapse_running_runs",
+    "ensure_columns",
     "ensure_tables",
     "ensure_indexes",
     "ensure_views",
@@ -105,6 +107,14 @@ TABLE_DEFINITIONS: Final[tuple[tuple[str, str], ...]] = (
         " generated_at TEXT NOT NULL"
         ");",
     ),
+    (
+        # scripts/export_seed.py のスナップショットと共通の key/value 表。
+        "metadata",
+        "CREATE TABLE IF NOT EXISTS metadata ("
+        " key TEXT PRIMARY KEY,"
+        " value TEXT NOT NULL"
+        ");",
+    ),
     (
         "etl_runs",
         "CREATE TABLE IF NOT EXISTS etl_runs ("
@@ -116,9 +126,138 @@ TABLE_DEFINITIONS: Final[tuple[tuple[str, str], ...]] = (
         " state TEXT,"
         " started_at TEXT,"
         " finished_at TEXT,"
-        " last_error TEXT"
+        " last_error TEXT,"
+        " heartbeat_at TEXT,"
+        " owner TEXT"
+        ");",
+    ),
+    (
+        "etl_run_sources",
+        "CREATE TABLE IF NOT EXISTS etl_run_sources ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " run_id INTEGER NOT NULL,"
+        " source TEXT NOT NULL,"
+        " started_at TEXT NOT NULL,"
+        " duration_ms REAL NOT NULL,"
+        " records INTEGER NOT NULL,"
+        " rows INTEGER NOT NULL,"
+        " error TEXT,"
+        " UNIQUE (run_id, source),"
+        " FOREIGN KEY (run_id) REFERENCES etl_runs(id) ON DELETE CASCADE"
         ");",
     ),
+    (
+        "etl_run_stages",
+        "CREATE TABLE IF NOT EXISTS etl_run_stages ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " run_id INTEGER NOT NULL,"
+        " seq INTEGER NOT NULL,"
+        " stage TEXT NOT NULL,"
+        " duration_ms REAL NOT NULL,"
+        " rows INTEGER NOT NULL,"
+        " rows_per_sec REAL,"
+        " rss_start_kb INTEGER,"
+        " rss_end_kb INTEGER,"
+        " UNIQUE (run_id, seq),"
+        " FOREIGN KEY (run_id) REFERENCES etl_runs(id) ON DELETE CASCADE"
+        ");",
+    ),
+    (
+        "etl_run_attempts",
+        "CREATE TABLE IF NOT EXISTS etl_run_attempts ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " run_id INTEGER NOT NULL,"
+        " attempt INTEGER NOT NULL,"
+        " error TEXT NOT NULL,"
+        " transient INTEGER NOT NULL,"
+        " wait_ms REAL NOT NULL,"
+        " UNIQUE (run_id, attempt),"
+        " FOREIGN KEY (run_id) REFERENCES etl_runs(id) ON DELETE CASCADE"
+        ");",
+    ),
+    (
+        "etl_refresh_requests",
+        "CREATE TABLE IF NOT EXISTS etl_refresh_requests ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " idempotency_key TEXT NOT NULL UNIQUE,"
+        " run_id INTEGER NOT NULL,"
+        " created_at TEXT NOT NULL,"
+        " expires_at TEXT NOT NULL,"
+        " FOREIGN KEY (run_id) REFERENCES etl_runs(id) ON DELETE CASCADE"
+        ");",
+    ),
+    (
+        "etl_jobs",
+        "CREATE TABLE IF NOT EXISTS etl_jobs ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " run_id INTEGER NOT NULL UNIQUE,"
+        " state TEXT NOT NULL,"
+        " enqueued_at TEXT NOT NULL,"
+        " claimed_at TEXT,"
+        " finished_at TEXT,"
+        " worker TEXT,"
+        " FOREIGN KEY (run_id) REFERENCES etl_runs(id) ON DELETE CASCADE"
+        ");",
+    ),
+    (
+        "etl_checkpoints",
+        "CREATE TABLE IF NOT EXISTS etl_checkpoints ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " run_id INTEGER NOT NULL UNIQUE,"
+        " feed_hash TEXT NOT NULL,"
+        " chunk INTEGER NOT NULL,"
+        " chunk_size INTEGER NOT NULL,"
+        " source_offset INTEGER NOT NULL,"
+        " updated_at TEXT NOT NULL,"
+        " FOREIGN KEY (run_id) REFERENCES etl_runs(id) ON DELETE CASCADE"
+        ");",
+    ),
+    (
+        "etl_run_cancellations",
+        "CREATE TABLE IF NOT EXISTS etl_run_cancellations ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " run_id INTEGER NOT NULL UNIQUE,"
+        " requested_at TEXT NOT NULL,"
+        " FOREIGN KEY (run_id) REFERENCES etl_runs(id) ON DELETE CASCADE"
+        ");",
+    ),
+    (
+        "etl_quarantine",
+        "CREATE TABLE IF NOT EXISTS etl_quarantine ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " run_id INTEGER,"
+        " crop_id INTEGER,"
+        " scope TEXT,"
+        " week TEXT,"
+        " payload TEXT NOT NULL,"
+        " reason TEXT NOT NULL,"
+        " quarantined_at TEXT NOT NULL,"
+        " FOREIGN KEY (run_id) REFERENCES etl_runs(id) ON DELETE CASCADE"
+        ");",
+    ),
+    (
+        # 天気予報キャッシュの永続層。再起動直後のメモリキャッシュを温めるのに使う。
+        "weather_cache",
+        "CREATE TABLE IF NOT EXISTS weather_cache ("
+        " key TEXT PRIMARY KEY,"
+        " payload TEXT NOT NULL,"
+        " cached_at TEXT NOT NULL,"
+        " expires_at TEXT NOT NULL,"
+        " last_used_at TEXT NOT NULL"
+        ");",
+    ),
+)
+
+# AUTOINCREMENT 済みの旧テーブルに後から追加された列。
+COLUMN_MIGRATIONS: Final[tuple[tuple[str, str, str], ...]] = (
+    ("etl_runs", "state", "TEXT"),
+    ("etl_runs", "started_at", "TEXT"),
+    ("etl_runs", "finished_at", "TEXT"),
+    ("etl_runs", "last_error", "TEXT"),
+    ("etl_runs", "heartbeat_at", "TEXT"),
+    ("etl_runs", "owner", "TEXT"),
+    ("etl_run_stages", "rss_start_kb", "INTEGER"),
+    ("etl_run_stages", "rss_end_kb", "INTEGER"),
 )
 
 INDEX_DEFINITIONS: Final[tuple[str, ...]] = (
@@ -128,6 +267,16 @@ INDEX_DEFINITIONS: Final[tuple[str, ...]] = (
     "CREATE UNIQUE INDEX IF NOT EXISTS idx_market_scopes_scope ON market_scopes(scope);",
     "CREATE INDEX IF NOT EXISTS idx_market_scope_categories_scope_category"
     " ON market_scope_categories(scope, priority, category);",
+    "CREATE INDEX IF NOT EXISTS idx_etl_quarantine_run ON etl_quarantine(run_id);",
+    # running 状態の行は常に 1 件まで。複数プロセスからの同時起動を DB 側で排他する。
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_etl_runs_single_running"
+    " ON etl_runs(state) WHERE state = 'running';",
+    "CREATE INDEX IF NOT EXISTS idx_etl_jobs_state ON etl_jobs(state, id);",
+    "CREATE INDEX IF NOT EXISTS idx_etl_runs_started_at ON etl_runs(started_at DESC, id DESC);",
+    "CREATE INDEX IF NOT EXISTS idx_etl_refresh_requests_expires"
+    " ON etl_refresh_requests(expires_at);",
+    "CREATE INDEX IF NOT EXISTS idx_weather_cache_expires ON weather_cache(expires_at);",
+    "CREATE INDEX IF NOT EXISTS idx_weather_cache_last_used ON weather_cache(last_used_at DESC);",
 )
 
 VIEW_DEFINITIONS: Final[tuple[tuple[str, str], ...]] = (
@@ -208,11 +357,47 @@ def ensure_tables(conn: sqlite3.Connection) -> None:
         if existing_sql is None:
             conn.execute(create_sql)
             continue
-        if "AUTOINCREMENT" in existing_sql.upper():
+        # 自然キーの表 (metadata_cache など) は作り直さない。
+        if "AUTOINCREMENT" in existing_sql.upper() or "AUTOINCREMENT" not in create_sql.upper():
             continue
         _recreate_table_with_autoincrement(conn, table, create_sql)
 
 
+def ensure_columns(conn: sqlite3.Connection) -> bool:
+    """Add missing columns and backfill ``etl_runs.started_at``; return whether DDL ran."""
+
+    mutated = False
+    existing: dict[str, set[str]] = {}
+    for table, column, declaration in COLUMN_MIGRATIONS:
+        if table not in existing:
+            existing[table] = {
+                str(row[1]) for row in conn.execute(f"PRAGMA table_info('{table}')").fetchall()
+            }
+        # 表が無ければ (部分的な旧 DB など) ensure_tables が最新定義で作るので触らない。
+        if existing[table] and column not in existing[table]:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+            existing[table].add(column)
+            mutated = True
+    # 履歴の並べ替えを started_at のインデックスだけで済ませるため NULL を残さない。
+    conn.execute("UPDATE etl_runs SET started_at = run_at WHERE started_at IS NULL")
+    return mutated
+
+
+def collapse_running_runs(conn: sqlite3.Connection) -> None:
+    """Keep only the newest ``running`` row so the single-running index can be built."""
+
+    conn.execute(
+        """
+        UPDATE etl_runs
+        SET state = 'stale',
+            status = 'stale',
+            last_error = COALESCE(last_error, 'superseded by a newer run')
+        WHERE state = 'running'
+          AND id < (SELECT MAX(id) FROM etl_runs WHERE state = 'running')
+        """
+    )
+
+
 def ensure_indexes(conn: sqlite3.Connection, *, index_sql: Iterable[str] | None = None) -> None:
     statements = INDEX_DEFINITIONS if index_sql is None else tuple(index_sql)
     for statement in statements:
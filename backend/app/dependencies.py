@@ -14,8 +14,11 @@ from .db.migrations import init_db
 def prepare_database() -> None:
     conn = get_db_conn()
     try:
+        # PLANTING_SEED_SNAPSHOT があれば JSON を読まずにスナップショットを取り込む。
+        installed = seed.install_configured_snapshot(conn)
         init_db(conn)
-        seed.seed(conn)
+        if not installed:
+            seed.seed_if_changed(conn)
     finally:
         conn.close()
 
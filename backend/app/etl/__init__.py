@@ -3,9 +3,9 @@
 from __future__ import annotations
 
 from .. import etl_runner as _etl_runner
-from . import expectations
+from . import expectations, sources, staging
 from .loader import DataLoader, load_price_feed
-from .transform import run_etl
+from .transform import LoadMode, run_etl
 
 STATE_FAILURE = _etl_runner.STATE_FAILURE
 STATE_RUNNING = _etl_runner.STATE_RUNNING
@@ -16,9 +16,12 @@ start_etl_job = _etl_runner.start_etl_job
 
 __all__ = [
     "DataLoader",
+    "LoadMode",
     "load_price_feed",
     "run_etl",
     "expectations",
+    "sources",
+    "staging",
     "STATE_FAILURE",
     "STATE_RUNNING",
     "STATE_STALE",
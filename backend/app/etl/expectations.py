@@ -1,21 +1,86 @@
 from __future__ import annotations
 
+import math
 import sqlite3
+from collections.abc import Sequence
+from dataclasses import dataclass, field
 from typing import Any
 
-__all__ = ["validate_market_prices"]
+__all__ = [
+    "MIN_AVG_PRICE",
+    "MAX_AVG_PRICE",
+    "RejectedRecord",
+    "ValidationResult",
+    "partition_market_prices",
+    "validate_market_prices",
+]
 
+MIN_AVG_PRICE = 0.0
+MAX_AVG_PRICE = 1_000_000.0
+
+
+@dataclass(frozen=True)
+class RejectedRecord:
+    index: int
+    record: dict[str, Any]
+    reasons: tuple[str, ...]
+
+    @property
+    def reason(self) -> str:
+        return "; ".join(self.reasons)
+
+
+@dataclass(frozen=True)
+class ValidationResult:
+    valid_indexes: list[int] = field(default_factory=list)
+    rejected: list[RejectedRecord] = field(default_factory=list)
+
+
+def _price_error(value: Any) -> str | None:
+    if value is None:
+        return None
+    try:
+        price_value = float(value)
+    except (TypeError, ValueError):
+        return f"avg_price is not numeric: {value!r}"
+    if math.isnan(price_value) or not (MIN_AVG_PRICE <= price_value <= MAX_AVG_PRICE):
+        return f"avg_price out of range: {price_value}"
+    return None
+
+
+def partition_market_prices(
+    conn: sqlite3.Connection, dataset: Sequence[dict[str, Any]]
+) -> ValidationResult:
+    """Evaluate every rule over the whole batch and split it into valid and rejected rows."""
 
-def validate_market_prices(conn: sqlite3.Connection, dataset: list[dict[str, Any]]) -> bool:
     scopes = {str(row[0]) for row in conn.execute("SELECT scope FROM market_scopes")}
-    for record in dataset:
-        scope = str(record.get("scope", ""))
-        if scope not in scopes:
-            raise ValueError(f"Unknown market scope: {scope}")
-        avg_price = record.get("avg_price")
-        if avg_price is None:
-            continue
-        price_value = float(avg_price)
-        if not (0.0 <= price_value <= 1_000_000.0):
-            raise ValueError(f"avg_price out of range: {price_value}")
+    crop_ids = {int(row[0]) for row in conn.execute("SELECT id FROM crops")}
+
+    # 列ごとに 1 パスで評価し、最初のエラーで止めずに全行の理由を集める。
+    scope_column = [str(record.get("scope", "")) for record in dataset]
+    crop_column = [record.get("crop_id") for record in dataset]
+    price_column = [record.get("avg_price") for record in dataset]
+
+    scope_errors = [
+        None if scope in scopes else f"Unknown market scope: {scope}" for scope in scope_column
+    ]
+    crop_errors = [
+        None if crop_id in crop_ids else f"Unknown crop_id: {crop_id}" for crop_id in crop_column
+    ]
+    price_errors = [_price_error(value) for value in price_column]
+
+    result = ValidationResult()
+    for index, errors in enumerate(zip(scope_errors, crop_errors, price_errors, strict=True)):
+        reasons = tuple(error for error in errors if error is not None)
+        if reasons:
+            result.rejected.append(RejectedRecord(index, dict(dataset[index]), reasons))
+        else:
+            result.valid_indexes.append(index)
+    return result
+
+
+def validate_market_prices(conn: sqlite3.Connection, dataset: list[dict[str, Any]]) -> bool:
+    result = partition_market_prices(conn, dataset)
+    if result.rejected:
+        raise ValueError(result.rejected[0].reasons[0])
     return True
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from types import MappingProxyType
+
+from ..compat import UTC
+from .loader import DataLoader, load_price_feed
+from .staging import LegacyRow, MarketRow
+from .transform import transform_records
+
+__all__ = [
+    "EtlSource",
+    "SourceIngestError",
+    "SourceRegistrationError",
+    "SourceRegistry",
+    "SourceResult",
+    "feed_file_source",
+    "ingest_sources",
+    "registry",
+]
+
+SOURCES_ENV = "PLANTING_ETL_SOURCES"
+
+
+class SourceRegistrationError(RuntimeError): ...
+
+
+class SourceIngestError(RuntimeError): ...
+
+
+@dataclass(frozen=True)
+class EtlSource:
+    name: str
+    loader: DataLoader
+    io_bound: bool = True
+
+
+@dataclass
+class SourceResult:
+    name: str
+    started_at: str
+    duration_ms: float = 0.0
+    records: int = 0
+    legacy_rows: list[LegacyRow] = field(default_factory=list)
+    market_rows: list[MarketRow] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def rows(self) -> int:
+        return len(self.legacy_rows) + len(self.market_rows)
+
+
+class SourceRegistry:
+    def __init__(self) -> None:
+        self._sources: dict[str, EtlSource] = {}
+
+    def register(self, source: EtlSource, *, override: bool = False) -> None:
+        if source.name in self._sources and not override:
+            raise SourceRegistrationError(f"source '{source.name}' is already registered")
+        self._sources[source.name] = source
+
+    def register_loader(
+        self,
+        name: str,
+        loader: DataLoader,
+        *,
+        io_bound: bool = True,
+        override: bool = False,
+    ) -> EtlSource:
+        source = EtlSource(name, loader, io_bound)
+        self.register(source, override=override)
+        return source
+
+    def unregister(self, name: str) -> None:
+        self._sources.pop(name, None)
+
+    def get(self, name: str) -> EtlSource:
+        try:
+            return self._sources[name]
+        except KeyError as exc:
+            raise KeyError(f"source '{name}' is not registered") from exc
+
+    def names(self) -> tuple[str, ...]:
+        return tuple(sorted(self._sources))
+
+    def sources(self) -> tuple[EtlSource, ...]:
+        return tuple(self._sources[name] for name in self.names())
+
+    def as_mapping(self) -> Mapping[str, EtlSource]:
+        return MappingProxyType(dict(self._sources))
+
+
+def _utc_now() -> str:
+    return datetime.now(tz=UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+def feed_file_source(name: str, path: Path, *, io_bound: bool = False) -> EtlSource:
+    # partial はプロセスプールへ pickle で受け渡せる。
+    return EtlSource(name, partial(load_price_feed, path), io_bound)
+
+
+def _sources_from_env(value: str | None) -> Iterable[EtlSource]:
+    if not value:
+        return ()
+    sources: list[EtlSource] = []
+    for entry in value.split(os.pathsep):
+        name, sep, raw_path = entry.partition("=")
+        if not sep or not name.strip() or not raw_path.strip():
+            raise ValueError(f"Invalid {SOURCES_ENV} entry: {entry!r}")
+        sources.append(feed_file_source(name.strip(), Path(raw_path.strip())))
+    return sources
+
+
+def _ingest_source(source: EtlSource) -> SourceResult:
+    result = SourceResult(name=source.name, started_at=_utc_now())
+    started = time.perf_counter()
+    try:
+        records = list(source.loader())
+        result.records = len(records)
+        result.legacy_rows, result.market_rows = transform_records(records)
+    except Exception as exc:
+        result.error = f"{type(exc).__name__}: {exc}"
+    result.duration_ms = (time.perf_counter() - started) * 1000.0
+    return result
+
+
+def ingest_sources(
+    sources: Sequence[EtlSource],
+    *,
+    max_workers: int | None = None,
+    executor_factory: Callable[[int], Executor] | None = None,
+) -> list[SourceResult]:
+    """Read, parse and transform every source concurrently; results keep input order."""
+
+    io_bound = [index for index, source in enumerate(sources) if source.io_bound]
+    cpu_bound = [index for index, source in enumerate(sources) if not source.io_bound]
+    futures: dict[int, Future[SourceResult]] = {}
+    executors: list[Executor] = []
+    try:
+        if io_bound:
+            threads = ThreadPoolExecutor(
+                max_workers=max_workers or len(io_bound),
+                thread_name_prefix="etl-source",
+            )
+            executors.append(threads)
+            for index in io_bound:
+                futures[index] = threads.submit(_ingest_source, sources[index])
+        if cpu_bound:
+            workers = min(max_workers or len(cpu_bound), os.cpu_count() or 1)
+            processes = (executor_factory or _process_pool)(workers)
+            executors.append(processes)
+            for index in cpu_bound:
+                futures[index] = processes.submit(_ingest_source, sources[index])
+        results: list[SourceResult] = []
+        for index, source in enumerate(sources):
+            try:
+                results.append(futures[index].result())
+            except Exception as exc:  # pragma: no cover - worker crash or pickling failure
+                results.append(
+                    SourceResult(
+                        name=source.name,
+                        started_at=_utc_now(),
+                        error=f"{type(exc).__name__}: {exc}",
+                    )
+                )
+        return results
+    finally:
+        for executor in executors:
+            executor.shutdown(wait=True)
+
+
+def _process_pool(workers: int) -> Executor:
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+def _default_registry() -> SourceRegistry:
+    default = SourceRegistry()
+    for source in _sources_from_env(os.getenv(SOURCES_ENV)):
+        default.register(source)
+    return default
+
+
+registry = _default_registry()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+from collections.abc import Callable, Sequence
+from typing import Final
+
+__all__ = ["LegacyRow", "MarketRow", "merge_via_staging"]
+
+_LOGGER = logging.getLogger(__name__)
+
+LegacyRow = tuple[int, str, float | None, float | None, str, str]
+MarketRow = tuple[int, str, str, float | None, float | None, str, str]
+
+_STAGE_PRICE_WEEKLY: Final = "temp.etl_stage_price_weekly"
+_STAGE_MARKET_PRICES: Final = "temp.etl_stage_market_prices"
+
+# ステージング表は制約・インデックスを持たない TEMP テーブルとし、
+# 本番テーブルのインデックス維持コストをマージ時の 1 回に限定する。
+_STAGING_DDL: Final[tuple[str, ...]] = (
+    "CREATE TEMP TABLE IF NOT EXISTS etl_stage_price_weekly ("
+    " crop_id INTEGER, week TEXT, avg_price REAL, stddev REAL, unit TEXT, source TEXT"
+    ")",
+    "CREATE TEMP TABLE IF NOT EXISTS etl_stage_market_prices ("
+    " crop_id INTEGER, scope TEXT, week TEXT, avg_price REAL, stddev REAL,"
+    " unit TEXT, source TEXT"
+    ")",
+)
+
+_MERGE_PRICE_WEEKLY_SQL: Final = f"""
+    INSERT INTO main.price_weekly (crop_id, week, avg_price, stddev, unit, source)
+    SELECT crop_id, week, avg_price, stddev, unit, source
+    FROM {_STAGE_PRICE_WEEKLY}
+    WHERE true
+    ORDER BY crop_id, week, rowid
+    ON CONFLICT(crop_id, week) DO UPDATE SET
+        avg_price = excluded.avg_price,
+        stddev = excluded.stddev,
+        unit = excluded.unit,
+        source = excluded.source
+"""
+
+_MERGE_MARKET_PRICES_SQL: Final = f"""
+    INSERT INTO main.market_prices (crop_id, scope, week, avg_price, stddev, unit, source)
+    SELECT crop_id, scope, week, avg_price, stddev, unit, source
+    FROM {_STAGE_MARKET_PRICES}
+    WHERE true
+    ORDER BY crop_id, scope, week, rowid
+    ON CONFLICT(crop_id, scope, week) DO UPDATE SET
+        avg_price = excluded.avg_price,
+        stddev = excluded.stddev,
+        unit = excluded.unit,
+        source = excluded.source
+"""
+
+
+def _prepare_staging_tables(conn: sqlite3.Connection) -> None:
+    for statement in _STAGING_DDL:
+        conn.execute(statement)
+    conn.execute(f"DELETE FROM {_STAGE_PRICE_WEEKLY}")
+    conn.execute(f"DELETE FROM {_STAGE_MARKET_PRICES}")
+
+
+def _fill_staging_tables(
+    conn: sqlite3.Connection,
+    legacy_rows: Sequence[LegacyRow],
+    market_rows: Sequence[MarketRow],
+) -> None:
+    if legacy_rows:
+        conn.executemany(
+            f"INSERT INTO {_STAGE_PRICE_WEEKLY} VALUES (?, ?, ?, ?, ?, ?)",
+            legacy_rows,
+        )
+    if market_rows:
+        conn.executemany(
+            f"INSERT INTO {_STAGE_MARKET_PRICES} VALUES (?, ?, ?, ?, ?, ?, ?)",
+            market_rows,
+        )
+
+
+def _validate_staging_tables(conn: sqlite3.Connection) -> None:
+    for table in (_STAGE_PRICE_WEEKLY, _STAGE_MARKET_PRICES):
+        row = conn.execute(
+            f"""
+            SELECT stage.crop_id
+            FROM {table} AS stage
+            LEFT JOIN main.crops AS crops ON crops.id = stage.crop_id
+            WHERE crops.id IS NULL
+            LIMIT 1
+            """
+        ).fetchone()
+        if row is not None:
+            raise ValueError(f"Unknown crop_id in staged rows: {row[0]}")
+
+
+def _clear_staging_tables(conn: sqlite3.Connection) -> None:
+    conn.execute(f"DELETE FROM {_STAGE_PRICE_WEEKLY}")
+    conn.execute(f"DELETE FROM {_STAGE_MARKET_PRICES}")
+
+
+def merge_via_staging(
+    conn: sqlite3.Connection,
+    legacy_rows: Sequence[LegacyRow],
+    market_rows: Sequence[MarketRow],
+    *,
+    finalize: Callable[[sqlite3.Connection], None] | None = None,
+) -> None:
+    """Bulk load rows through TEMP staging tables and merge them in one short transaction.
+
+    Live tables are only locked for the final ``INSERT ... SELECT`` merge, so readers
+    never observe a half-applied feed and the write lock is not held while staging.
+    The connection must not have an open transaction; this function commits on its own.
+    """
+
+    # 呼び出し側の未確定の書き込みを黙ってコミットしないよう、開いたトランザクションは拒む。
+    if conn.in_transaction:
+        raise RuntimeError("merge_via_staging requires a connection without an open transaction")
+    try:
+        _prepare_staging_tables(conn)
+        _fill_staging_tables(conn, legacy_rows, market_rows)
+        _validate_staging_tables(conn)
+        # TEMP への書き込みと検証で取得した共有ロックをここで解放する。
+        conn.commit()
+
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(_MERGE_PRICE_WEEKLY_SQL)
+        conn.execute(_MERGE_MARKET_PRICES_SQL)
+        if finalize is not None:
+            finalize(conn)
+        _clear_staging_tables(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        # 後片付けの失敗で元の例外を隠さないよう、ここでの失敗は記録だけにする。
+        try:
+            _clear_staging_tables(conn)
+            conn.commit()
+        except sqlite3.Error:
+            _LOGGER.warning("ステージング表を空にできませんでした", exc_info=True)
+        raise
@@ -1,18 +1,29 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import os
 import sqlite3
 from collections import defaultdict
 from datetime import date, datetime
-from typing import Any, cast
+from typing import Any, Literal, cast, get_args
 
 from .. import schemas, utils_week
 from ..compat import UTC
-from . import expectations
+from ..etl_runner import context
+from . import expectations, staging
 from .loader import DataLoader, load_price_feed
 
-__all__ = ["run_etl"]
+__all__ = ["LoadMode", "load_transformed", "run_etl", "transform_records"]
+
+# upsert: 1 トランザクションで書き込み、メタデータ更新と同時に見える (既定)。
+# staging: ステージング表に流し込んでから 1 トランザクションでマージする。
+# chunked: チャンクごとにコミットし、中断しても続きから再開できる。代わりに読み手には
+#          書き込み途中のフィードと更新前のメタデータが見える時間がある。
+LoadMode = Literal["upsert", "staging", "chunked"]
+DEFAULT_LOAD_MODE: LoadMode = "upsert"
+DEFAULT_CHUNK_SIZE = 50_000
 
 _UNIT_FACTORS: dict[str, float] = {"円/kg": 1.0, "円/100g": 10.0, "円/500g": 2.0, "円/g": 1000.0}
 _LOGGER = logging.getLogger(__name__)
@@ -207,27 +218,131 @@ def _resolve_categories(
     return resolved
 
 
-def run_etl(conn: sqlite3.Connection, *, data_loader: DataLoader | None = None) -> int:
-    if data_loader is None:
-        loader = cast(DataLoader, load_price_feed)
+def _resolve_load_mode(load_mode: LoadMode | None) -> LoadMode:
+    candidate = load_mode or os.getenv("PLANTING_ETL_LOAD_MODE") or DEFAULT_LOAD_MODE
+    if candidate not in get_args(LoadMode):
+        raise ValueError(f"Unsupported ETL load mode: {candidate}")
+    return cast(LoadMode, candidate)
+
+
+def _resolve_chunk_size(chunk_size: int | None = None) -> int:
+    raw: int | str | None = chunk_size
+    if raw is None:
+        raw = os.getenv("PLANTING_ETL_CHUNK_SIZE") or DEFAULT_CHUNK_SIZE
+    try:
+        resolved = int(raw)
+    except ValueError as exc:
+        raise ValueError(f"Unsupported ETL chunk size: {raw}") from exc
+    if resolved <= 0:
+        raise ValueError(f"Unsupported ETL chunk size: {raw}")
+    return resolved
+
+
+def _row_chunks(
+    legacy_rows: list[staging.LegacyRow],
+    market_rows: list[staging.MarketRow],
+    size: int,
+) -> list[tuple[list[staging.LegacyRow], list[staging.MarketRow]]]:
+    chunks: list[tuple[list[staging.LegacyRow], list[staging.MarketRow]]] = [
+        (legacy_rows[start : start + size], []) for start in range(0, len(legacy_rows), size)
+    ]
+    chunks.extend(
+        ([], market_rows[start : start + size]) for start in range(0, len(market_rows), size)
+    )
+    return chunks
+
+
+ChunkList = list[tuple[list[staging.LegacyRow], list[staging.MarketRow]]]
+
+
+def _hash_chunk(
+    digest: Any, legacy_chunk: list[staging.LegacyRow], market_chunk: list[staging.MarketRow]
+) -> None:
+    digest.update(repr(legacy_chunk).encode("utf-8"))
+    digest.update(repr(market_chunk).encode("utf-8"))
+
+
+def _resume_point(
+    run_context: context.RunContext, chunks: ChunkList, chunk_size: int
+) -> tuple[int, Any]:
+    """Return how many chunks to skip and the running digest over those chunks.
+
+    Checkpoints store the hash of the committed prefix, so verifying one only rehashes
+    the chunks that are skipped, one chunk at a time.
+    """
+
+    resume, run_context.resume = run_context.resume, None
+    digest = hashlib.sha256()
+    if run_context.committed_chunks:
+        skip, expected = run_context.committed_chunks, None
+    elif resume is None:
+        return 0, digest
+    elif resume.chunk_size != chunk_size or resume.chunk > len(chunks):
+        _LOGGER.info("フィードが変わったためチェックポイントを破棄しました")
+        return 0, digest
     else:
-        loader = data_loader
-    records = list(loader())
-    if not records:
-        return 0
+        skip, expected = resume.chunk, resume.feed_hash
+    for legacy_chunk, market_chunk in chunks[:skip]:
+        _hash_chunk(digest, legacy_chunk, market_chunk)
+    if expected is not None:
+        if digest.hexdigest() != expected:
+            _LOGGER.info("フィードが変わったためチェックポイントを破棄しました")
+            return 0, hashlib.sha256()
+        _LOGGER.info("チェックポイントから再開します: chunk=%d", skip)
+    return skip, digest
 
-    market_records: list[dict[str, Any]] = []
-    legacy_records: list[dict[str, Any]] = []
-    for record in records:
-        if record.get("scope"):
-            market_records.append(record)
-        else:
-            legacy_records.append(record)
 
-    transformed_legacy = _transform_legacy_records(legacy_records) if legacy_records else []
-    transformed_market = _transform_market_records(market_records) if market_records else []
+def _upsert_in_chunks(
+    conn: sqlite3.Connection,
+    legacy_rows: list[staging.LegacyRow],
+    market_rows: list[staging.MarketRow],
+    *,
+    chunk_size: int,
+) -> None:
+    # chunked モード: チャンクごとにコミットし、再試行・再起動時はコミット済みチャンクを
+    # 飛ばして続きから書き込む。
+    run_context = context.current()
+    chunks = _row_chunks(legacy_rows, market_rows, chunk_size)
+    committed, digest = 0, hashlib.sha256()
+    if run_context is not None:
+        committed, digest = _resume_point(run_context, chunks, chunk_size)
+        run_context.committed_chunks = committed
+    offset = sum(len(legacy) + len(market) for legacy, market in chunks[:committed])
+    for index in range(committed, len(chunks)):
+        legacy_chunk, market_chunk = chunks[index]
+        context.check_cancelled()
+        _upsert_rows(conn, legacy_chunk, market_chunk)
+        _hash_chunk(digest, legacy_chunk, market_chunk)
+        offset += len(legacy_chunk) + len(market_chunk)
+        if run_context is not None and run_context.on_chunk is not None:
+            # チェックポイントはチャンクと同じトランザクションで確定させる。
+            run_context.on_chunk(
+                context.ChunkCheckpoint(digest.hexdigest(), index + 1, chunk_size, offset)
+            )
+        conn.commit()
+        if run_context is not None:
+            run_context.committed_chunks = index + 1
+
+
+def _upsert_atomically(
+    conn: sqlite3.Connection,
+    legacy_rows: list[staging.LegacyRow],
+    market_rows: list[staging.MarketRow],
+    *,
+    chunk_size: int,
+) -> None:
+    # コミットは呼び出し側でメタデータ更新と一緒に行う。チャンクは中断確認の区切りにだけ使う。
+    for legacy_chunk, market_chunk in _row_chunks(legacy_rows, market_rows, chunk_size):
+        context.check_cancelled()
+        _upsert_rows(conn, legacy_chunk, market_chunk)
+
 
-    if transformed_legacy:
+def _upsert_rows(
+    conn: sqlite3.Connection,
+    legacy_rows: list[staging.LegacyRow],
+    market_rows: list[staging.MarketRow],
+) -> None:
+    if legacy_rows:
         conn.executemany(
             """
             INSERT INTO price_weekly (
@@ -239,50 +354,168 @@ def run_etl(conn: sqlite3.Connection, *, data_loader: DataLoader | None = None)
                 unit = excluded.unit,
                 source = excluded.source
             """,
-            transformed_legacy,
+            legacy_rows,
+        )
+    if market_rows:
+        conn.executemany(
+            """
+            INSERT INTO market_prices (
+                crop_id, scope, week, avg_price, stddev, unit, source
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(crop_id, scope, week) DO UPDATE SET
+                avg_price = excluded.avg_price,
+                stddev = excluded.stddev,
+                unit = excluded.unit,
+                source = excluded.source
+            """,
+            market_rows,
         )
 
-    inserted_market = transformed_market
-    if transformed_market:
-        dataset = [
-            {
-                "crop_id": crop_id,
-                "scope": scope,
-                "week": week_iso,
-                "avg_price": avg_price,
-                "stddev": stddev,
-                "unit": unit,
-                "source": source,
-            }
-            for crop_id, scope, week_iso, avg_price, stddev, unit, source in transformed_market
-        ]
-        fallback_required = False
-        try:
-            valid = expectations.validate_market_prices(conn, dataset)
-        except Exception as exc:  # pragma: no cover - exercised via tests
-            _LOGGER.warning("市場メタデータ検証の失敗: %s", exc, exc_info=True)
-            fallback_required = True
-        else:
-            if not valid:
-                _LOGGER.warning("市場メタデータ検証の失敗: バリデーション基準を満たしませんでした")
-                fallback_required = True
-        if fallback_required:
-            inserted_market = [item for item in transformed_market if item[1] == "national"]
-        if inserted_market:
-            conn.executemany(
-                """
-                INSERT INTO market_prices (
-                    crop_id, scope, week, avg_price, stddev, unit, source
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(crop_id, scope, week) DO UPDATE SET
-                    avg_price = excluded.avg_price,
-                    stddev = excluded.stddev,
-                    unit = excluded.unit,
-                    source = excluded.source
-                """,
-                inserted_market,
+
+def _validated_market_rows(
+    conn: sqlite3.Connection, transformed_market: list[staging.MarketRow]
+) -> tuple[list[staging.MarketRow], list[expectations.RejectedRecord]]:
+    if not transformed_market:
+        return [], []
+    dataset = [
+        {
+            "crop_id": crop_id,
+            "scope": scope,
+            "week": week_iso,
+            "avg_price": avg_price,
+            "stddev": stddev,
+            "unit": unit,
+            "source": source,
+        }
+        for crop_id, scope, week_iso, avg_price, stddev, unit, source in transformed_market
+    ]
+    try:
+        result = expectations.partition_market_prices(conn, dataset)
+    except Exception as exc:  # pragma: no cover - exercised via tests
+        _LOGGER.warning("市場メタデータ検証の失敗: %s", exc, exc_info=True)
+        reason = f"validation error: {exc}"
+        result = expectations.ValidationResult(
+            valid_indexes=[
+                index for index, item in enumerate(transformed_market) if item[1] == "national"
+            ],
+            rejected=[
+                expectations.RejectedRecord(index, dataset[index], (reason,))
+                for index, item in enumerate(transformed_market)
+                if item[1] != "national"
+            ],
+        )
+    if result.rejected:
+        _LOGGER.warning(
+            "市場メタデータ検証の失敗: %d 件を隔離しました",
+            len(result.rejected),
+            extra={"quarantined_records": len(result.rejected)},
+        )
+    return [transformed_market[index] for index in result.valid_indexes], result.rejected
+
+
+def _quarantine_rows(conn: sqlite3.Connection, rejected: list[expectations.RejectedRecord]) -> None:
+    if not rejected:
+        return
+    quarantined_at = _utc_now()
+    run_id = context.current_run_id()
+    conn.executemany(
+        """
+        INSERT INTO etl_quarantine (
+            run_id, crop_id, scope, week, payload, reason, quarantined_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                run_id,
+                item.record.get("crop_id"),
+                item.record.get("scope"),
+                item.record.get("week"),
+                json.dumps(item.record, ensure_ascii=False, sort_keys=True),
+                item.reason,
+                quarantined_at,
             )
+            for item in rejected
+        ],
+    )
 
-    _refresh_market_metadata_cache(conn)
-    conn.commit()
-    return len(transformed_legacy) + len(inserted_market)
+
+def transform_records(
+    records: list[dict[str, Any]],
+) -> tuple[list[staging.LegacyRow], list[staging.MarketRow]]:
+    market_records: list[dict[str, Any]] = []
+    legacy_records: list[dict[str, Any]] = []
+    for record in records:
+        if record.get("scope"):
+            market_records.append(record)
+        else:
+            legacy_records.append(record)
+
+    with context.stage("transform") as timing:
+        transformed_legacy = _transform_legacy_records(legacy_records) if legacy_records else []
+        transformed_market = _transform_market_records(market_records) if market_records else []
+        timing.rows = len(transformed_legacy) + len(transformed_market)
+    return transformed_legacy, transformed_market
+
+
+def load_transformed(
+    conn: sqlite3.Connection,
+    legacy_rows: list[staging.LegacyRow],
+    market_rows: list[staging.MarketRow],
+    *,
+    load_mode: LoadMode | None = None,
+    chunk_size: int | None = None,
+) -> int:
+    mode = _resolve_load_mode(load_mode)
+    with context.stage("validate") as timing:
+        inserted_market, rejected = _validated_market_rows(conn, market_rows)
+        timing.rows = len(market_rows)
+    written = len(legacy_rows) + len(inserted_market)
+
+    def finalize(target: sqlite3.Connection) -> None:
+        _quarantine_rows(target, rejected)
+        with context.stage("metadata_refresh"):
+            _refresh_market_metadata_cache(target)
+
+    context.check_cancelled()
+    if mode == "staging":
+        # staging ではメタデータ更新もマージと同じトランザクション内で走るため upsert に含まれる。
+        with context.stage("upsert") as timing:
+            timing.rows = written
+            staging.merge_via_staging(conn, legacy_rows, inserted_market, finalize=finalize)
+    else:
+        write = _upsert_in_chunks if mode == "chunked" else _upsert_atomically
+        with context.stage("upsert") as timing:
+            timing.rows = written
+            write(conn, legacy_rows, inserted_market, chunk_size=_resolve_chunk_size(chunk_size))
+        finalize(conn)
+        conn.commit()
+    return written
+
+
+def run_etl(
+    conn: sqlite3.Connection,
+    *,
+    data_loader: DataLoader | None = None,
+    load_mode: LoadMode | None = None,
+) -> int:
+    mode = _resolve_load_mode(load_mode)
+    if data_loader is None:
+        loader = cast(DataLoader, load_price_feed)
+    else:
+        loader = data_loader
+
+    def load() -> list[dict[str, Any]]:
+        with context.stage("load") as timing:
+            loaded = list(loader())
+            timing.rows = len(loaded)
+        return loaded
+
+    context.check_cancelled()
+    records = context.memoize("records", load)
+    if not records:
+        return 0
+
+    transformed_legacy, transformed_market = context.memoize(
+        "transformed", lambda: transform_records(records)
+    )
+    return load_transformed(conn, transformed_legacy, transformed_market, load_mode=mode)
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+from .coalesce import RefreshClaim, claim_refresh
 from .connection import _open_connection, _resolve_conn_factory
+from .context import CANCELLED_MESSAGE
+from .control import cancel_run
+from .jobs import EtlExecutor, enqueue_job, resolve_executor
 from .metadata import (
     STATE_FAILURE,
     STATE_RUNNING,
@@ -13,6 +17,7 @@ from .metadata import (
 )
 from .runner import (
     DataLoader,
+    _is_transient,
     _load_run_etl,
     _run_etl_with_retries,
     _RunEtlFactory,
@@ -20,19 +25,23 @@ from .runner import (
     _utc_now,
     start_etl_job,
 )
-from .status import _coerce_state, get_last_status
+from .status import _coerce_state, get_last_status, get_run, list_runs
 
 __all__ = [
+    "CANCELLED_MESSAGE",
     "STATE_FAILURE",
     "STATE_RUNNING",
     "STATE_STALE",
     "STATE_SUCCESS",
     "DataLoader",
+    "EtlExecutor",
+    "RefreshClaim",
     "_RunEtlFactory",
     "_RunEtlFunc",
     "_coerce_state",
     "_ensure_schema",
     "_insert_run_metadata",
+    "_is_transient",
     "_load_run_etl",
     "_mark_run_failure",
     "_mark_run_success",
@@ -40,6 +49,12 @@ __all__ = [
     "_resolve_conn_factory",
     "_run_etl_with_retries",
     "_utc_now",
+    "cancel_run",
+    "claim_refresh",
+    "enqueue_job",
     "get_last_status",
+    "get_run",
+    "list_runs",
+    "resolve_executor",
     "start_etl_job",
 ]
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from ..compat import UTC
+from . import metadata
+
+__all__ = [
+    "DEFAULT_IDEMPOTENCY_TTL",
+    "DEFAULT_RUN_LEASE",
+    "RefreshClaim",
+    "claim_refresh",
+    "run_lease",
+    "stale_cutoff",
+]
+
+DEFAULT_IDEMPOTENCY_TTL = timedelta(hours=1)
+# 実行中の run は heartbeat_at を定期的に更新する。これより古い run は放棄とみなす。
+DEFAULT_RUN_LEASE = timedelta(seconds=60)
+
+
+@dataclass(frozen=True)
+class RefreshClaim:
+    run_id: int
+    created: bool
+
+
+def _format(moment: datetime) -> str:
+    return moment.replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+def _seconds_from_env(name: str, default: timedelta) -> timedelta:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        return timedelta(seconds=float(raw))
+    except ValueError as exc:
+        raise ValueError(f"Invalid {name} value: {raw!r}") from exc
+
+
+def run_lease() -> timedelta:
+    return _seconds_from_env("PLANTING_ETL_RUN_LEASE", DEFAULT_RUN_LEASE)
+
+
+def stale_cutoff(now: datetime) -> str:
+    return _format(now - run_lease())
+
+
+def _keyed_run(conn: sqlite3.Connection, key: str, now: str) -> int | None:
+    row = conn.execute(
+        """
+        SELECT requests.run_id
+        FROM etl_refresh_requests AS requests
+        JOIN etl_runs AS runs ON runs.id = requests.run_id
+        WHERE requests.idempotency_key = ?
+          AND requests.expires_at > ?
+          AND runs.state = ?
+        """,
+        (key, now, metadata.STATE_RUNNING),
+    ).fetchone()
+    return None if row is None else int(row[0])
+
+
+def _remember_key(
+    conn: sqlite3.Connection, key: str, run_id: int, *, now: datetime, ttl: timedelta
+) -> None:
+    conn.execute(
+        "DELETE FROM etl_refresh_requests WHERE expires_at <= ?",
+        (_format(now),),
+    )
+    conn.execute(
+        """
+        INSERT INTO etl_refresh_requests (idempotency_key, run_id, created_at, expires_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(idempotency_key) DO UPDATE SET
+            run_id = excluded.run_id,
+            created_at = excluded.created_at,
+            expires_at = excluded.expires_at
+        """,
+        (key, run_id, _format(now), _format(now + ttl)),
+    )
+    conn.commit()
+
+
+def claim_refresh(
+    conn: sqlite3.Connection,
+    *,
+    idempotency_key: str | None = None,
+    now: datetime | None = None,
+) -> RefreshClaim:
+    """Claim the single ``running`` slot, or join the run that already holds it.
+
+    A key only coalesces while its run is in flight; once that run has finished the
+    same key starts new work, since clients keep one key per browser.
+    """
+
+    moment = now or datetime.now(tz=UTC)
+    started_at = _format(moment)
+    if idempotency_key is not None:
+        keyed = _keyed_run(conn, idempotency_key, started_at)
+        if keyed is not None:
+            return RefreshClaim(run_id=keyed, created=False)
+
+    try:
+        run_id, created = metadata._claim_run(conn, started_at, stale_before=stale_cutoff(moment))
+    except sqlite3.IntegrityError:
+        # 別プロセスが同時に running を確保した場合は、その実行に合流する。
+        conn.rollback()
+        active = metadata._active_run_id(conn)
+        if active is None:
+            raise
+        run_id, created = active, False
+
+    if idempotency_key is not None:
+        ttl = _seconds_from_env("PLANTING_REFRESH_IDEMPOTENCY_TTL", DEFAULT_IDEMPOTENCY_TTL)
+        _remember_key(conn, idempotency_key, run_id, now=moment, ttl=ttl)
+    return RefreshClaim(run_id=run_id, created=created)
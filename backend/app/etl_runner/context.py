@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, TypeVar, cast
+
+__all__ = [
+    "CANCELLED_MESSAGE",
+    "ChunkCheckpoint",
+    "RetryAttempt",
+    "RunCancelled",
+    "RunContext",
+    "StageListener",
+    "StageTiming",
+    "activate",
+    "check_cancelled",
+    "current",
+    "current_run_id",
+    "memoize",
+    "stage",
+]
+
+_T = TypeVar("_T")
+
+
+@dataclass
+class StageTiming:
+    stage: str
+    duration_ms: float = 0.0
+    rows: int = 0
+    rss_start_kb: int | None = None
+    rss_end_kb: int | None = None
+
+    @property
+    def rows_per_sec(self) -> float | None:
+        if not self.rows or self.duration_ms <= 0:
+            return None
+        return self.rows / (self.duration_ms / 1000.0)
+
+
+CANCELLED_MESSAGE = "ETL run cancelled"
+
+
+class RunCancelled(RuntimeError):
+    """Raised at a chunk boundary when a cancel was requested for the active run."""
+
+
+@dataclass(frozen=True)
+class ChunkCheckpoint:
+    feed_hash: str
+    chunk: int
+    chunk_size: int
+    source_offset: int
+
+
+@dataclass(frozen=True)
+class RetryAttempt:
+    attempt: int
+    error: str
+    transient: bool
+    wait_ms: float = 0.0
+
+
+StageListener = Callable[[int, StageTiming], None]
+
+
+@dataclass
+class RunContext:
+    run_id: int | None = None
+    stages: list[StageTiming] = field(default_factory=list)
+    on_stage: StageListener | None = None
+    attempts: list[RetryAttempt] = field(default_factory=list)
+    # 再試行時に読み込み・変換をやり直さないための中間結果と、コミット済みチャンク数。
+    artifacts: dict[str, Any] = field(default_factory=dict)
+    committed_chunks: int = 0
+    # 中断した実行から引き継ぐチェックポイントと、チャンク確定時・キャンセル確認のフック。
+    resume: ChunkCheckpoint | None = None
+    on_chunk: Callable[[ChunkCheckpoint], None] | None = None
+    is_cancelled: Callable[[], bool] | None = None
+
+
+_CURRENT: ContextVar[RunContext | None] = ContextVar("etl_run_context", default=None)
+
+
+def current() -> RunContext | None:
+    return _CURRENT.get()
+
+
+def current_run_id() -> int | None:
+    context = _CURRENT.get()
+    return None if context is None else context.run_id
+
+
+@contextmanager
+def activate(context: RunContext) -> Iterator[RunContext]:
+    token = _CURRENT.set(context)
+    try:
+        yield context
+    finally:
+        _CURRENT.reset(token)
+
+
+def check_cancelled() -> None:
+    context = _CURRENT.get()
+    if context is not None and context.is_cancelled is not None and context.is_cancelled():
+        raise RunCancelled(CANCELLED_MESSAGE)
+
+
+def memoize(key: str, factory: Callable[[], _T]) -> _T:
+    """Compute ``factory()`` once per run; later attempts of the same run reuse the value."""
+
+    context = _CURRENT.get()
+    if context is None:
+        return factory()
+    if key not in context.artifacts:
+        context.artifacts[key] = factory()
+    return cast(_T, context.artifacts[key])
+
+
+def _current_rss_kb() -> int | None:
+    # ru_maxrss はプロセス起動からの最大値で、常駐する API プロセスでは段階ごとの差が出ない。
+    # その時点の常駐量を /proc から読み、/proc の無い環境では記録しない。
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, ValueError, IndexError):  # pragma: no cover - Linux 以外
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+@contextmanager
+def stage(name: str) -> Iterator[StageTiming]:
+    """Time a block and append it to the active run; callers set ``rows`` on the timing."""
+
+    timing = StageTiming(name, rss_start_kb=_current_rss_kb())
+    started = time.perf_counter()
+    try:
+        yield timing
+    finally:
+        timing.duration_ms = (time.perf_counter() - started) * 1000.0
+        timing.rss_end_kb = _current_rss_kb()
+        context = _CURRENT.get()
+        if context is not None:
+            context.stages.append(timing)
+            if context.on_stage is not None:
+                context.on_stage(len(context.stages) - 1, timing)
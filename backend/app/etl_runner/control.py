@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import sqlite3
+
+from .. import schemas
+from . import events, metadata, status
+from .context import CANCELLED_MESSAGE
+from .jobs import JOB_FAILED, JOB_QUEUED
+from .runner import _utc_now
+
+__all__ = ["cancel_run"]
+
+
+def cancel_run(conn: sqlite3.Connection, run_id: int) -> schemas.RefreshStatus | None:
+    """Request cancellation of a running ETL run and return its current status.
+
+    Runs still waiting in the worker queue are failed immediately; runs already
+    executing stop at the next chunk boundary and roll back, except in ``chunked``
+    load mode where the chunks committed so far stay behind their checkpoint.
+    """
+
+    conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute("SELECT state FROM etl_runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            conn.rollback()
+            return None
+        if row[0] == metadata.STATE_RUNNING:
+            now = _utc_now()
+            metadata._request_cancel(conn, run_id, now, commit=False)
+            queued = conn.execute(
+                "UPDATE etl_jobs SET state = ?, finished_at = ? WHERE run_id = ? AND state = ?",
+                (JOB_FAILED, now, run_id, JOB_QUEUED),
+            ).rowcount
+            if queued:
+                metadata._mark_run_failure(
+                    conn, run_id, finished_at=now, error_message=CANCELLED_MESSAGE
+                )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    run = status.get_run(conn, run_id)
+    if run is not None and run.state != metadata.STATE_RUNNING:
+        status.remember_status(conn, run)
+        events.publish_status(run)
+    return run
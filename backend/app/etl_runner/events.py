@@ -0,0 +1,232 @@
+"""In-process pub/sub for refresh progress, consumed by ``/api/refresh/events``."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Final, Literal
+
+from .. import schemas
+from . import connection, status
+
+if TYPE_CHECKING:
+    from .context import StageTiming
+
+__all__ = [
+    "RefreshEvent",
+    "RefreshEventBus",
+    "Subscription",
+    "bus",
+    "format_sse",
+    "publish_stage",
+    "publish_status",
+    "stream_events",
+    "watch_database",
+]
+
+logger = logging.getLogger(__name__)
+
+EventKind = Literal["state", "stage"]
+
+DEFAULT_QUEUE_SIZE: Final = 256
+DEFAULT_WATCH_INTERVAL: Final = 0.5
+
+
+@dataclass(frozen=True)
+class RefreshEvent:
+    kind: EventKind
+    run_id: int | None
+    data: dict[str, Any]
+
+
+class Subscription:
+    def __init__(self, bus: RefreshEventBus, loop: asyncio.AbstractEventLoop, size: int) -> None:
+        self._bus = bus
+        self._loop = loop
+        self._queue: asyncio.Queue[RefreshEvent] = asyncio.Queue(maxsize=size)
+        self.dropped = 0
+
+    def _offer(self, event: RefreshEvent) -> None:
+        # 遅いクライアントのために ETL を待たせない。溢れたら古いイベントから捨てる。
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(event)
+
+    def deliver(self, event: RefreshEvent) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._offer, event)
+        except RuntimeError:  # pragma: no cover - 購読側のイベントループが終了済み
+            self.close()
+
+    async def get(self) -> RefreshEvent:
+        return await self._queue.get()
+
+    def close(self) -> None:
+        self._bus._unsubscribe(self)
+
+    def __enter__(self) -> Subscription:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+
+class RefreshEventBus:
+    """Fan out events published from ETL threads to asyncio subscribers."""
+
+    def __init__(self, *, queue_size: int = DEFAULT_QUEUE_SIZE) -> None:
+        self._queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: list[Subscription] = []
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self, asyncio.get_running_loop(), self._queue_size)
+        with self._lock:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event: RefreshEvent) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+
+bus = RefreshEventBus()
+
+
+def publish_status(run: schemas.RefreshStatus, *, target: RefreshEventBus | None = None) -> None:
+    (target or bus).publish(RefreshEvent("state", run.run_id, run.model_dump()))
+
+
+def publish_stage(
+    run_id: int, seq: int, timing: StageTiming, *, target: RefreshEventBus | None = None
+) -> None:
+    stage = schemas.RefreshStage(
+        stage=timing.stage,
+        duration_ms=timing.duration_ms,
+        rows=timing.rows,
+        rows_per_sec=timing.rows_per_sec,
+        rss_start_kb=timing.rss_start_kb,
+        rss_end_kb=timing.rss_end_kb,
+    )
+    event = schemas.RefreshStageEvent(run_id=run_id, seq=seq, stage=stage)
+    (target or bus).publish(RefreshEvent("stage", run_id, event.model_dump()))
+
+
+def format_sse(event: RefreshEvent) -> str:
+    payload = json.dumps(event.data, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {event.kind}\ndata: {payload}\n\n"
+
+
+def _poll_latest(conn: sqlite3.Connection, seen: dict[str, Any]) -> list[RefreshEvent]:
+    row = conn.execute("SELECT id, state FROM etl_runs ORDER BY id DESC LIMIT 1").fetchone()
+    if row is None:
+        return []
+    run_id, state = int(row[0]), row[1]
+    if seen.get("run_id") != run_id:
+        seen.update(run_id=run_id, state=None, stages=0)
+    events: list[RefreshEvent] = []
+    run = status.get_run(conn, run_id) if state != seen["state"] else None
+    stage_rows = conn.execute(
+        "SELECT seq, stage, duration_ms, rows, rows_per_sec, rss_start_kb, rss_end_kb"
+        " FROM etl_run_stages"
+        " WHERE run_id = ? AND seq >= ? ORDER BY seq",
+        (run_id, seen["stages"]),
+    ).fetchall()
+    for stage_row in stage_rows:
+        stage = schemas.RefreshStage(
+            stage=stage_row[1],
+            duration_ms=float(stage_row[2]),
+            rows=int(stage_row[3]),
+            rows_per_sec=stage_row[4],
+            rss_start_kb=stage_row[5],
+            rss_end_kb=stage_row[6],
+        )
+        event = schemas.RefreshStageEvent(run_id=run_id, seq=int(stage_row[0]), stage=stage)
+        events.append(RefreshEvent("stage", run_id, event.model_dump()))
+        seen["stages"] = int(stage_row[0]) + 1
+    if run is not None:
+        seen["state"] = state
+        events.append(RefreshEvent("state", run_id, run.model_dump()))
+    conn.commit()
+    return events
+
+
+async def watch_database(
+    *,
+    conn_factory: Callable[[], sqlite3.Connection] | None = None,
+    interval: float = DEFAULT_WATCH_INTERVAL,
+    target: RefreshEventBus | None = None,
+    stop_event: asyncio.Event | None = None,
+) -> None:
+    """Bridge progress written by the worker process onto the in-process bus.
+
+    Only one query loop runs per API process, and only while somebody is subscribed.
+    """
+
+    event_bus = target or bus
+    stop = stop_event or asyncio.Event()
+    factory = connection._resolve_conn_factory(conn_factory)
+    conn = await asyncio.to_thread(connection._open_connection, factory)
+    seen: dict[str, Any] = {}
+    try:
+        while not stop.is_set():
+            if event_bus.subscriber_count:
+                try:
+                    for event in await asyncio.to_thread(_poll_latest, conn, seen):
+                        event_bus.publish(event)
+                except sqlite3.Error:
+                    logger.exception("refresh event watcher query failed")
+            else:
+                seen.clear()
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=interval)
+            except TimeoutError:
+                continue
+    finally:
+        conn.close()
+
+
+async def stream_events(
+    snapshot: Callable[[], schemas.RefreshStatus],
+    *,
+    target: RefreshEventBus | None = None,
+    heartbeat: float = 15.0,
+    is_disconnected: Callable[[], Any] | None = None,
+) -> AsyncIterator[str]:
+    """Yield SSE frames: the current status first, then every published event.
+
+    ``snapshot`` is called only after subscribing, so an event published while it
+    reads the database is queued behind it instead of being lost.
+    """
+
+    with (target or bus).subscribe() as subscription:
+        yield "retry: 3000\n\n"
+        current = await asyncio.to_thread(snapshot)
+        yield format_sse(RefreshEvent("state", current.run_id, current.model_dump()))
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+            except TimeoutError:
+                if is_disconnected is not None and await is_disconnected():
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event)
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Final, Literal, cast, get_args
+
+from ..compat import UTC
+from . import metadata
+from .runner import _utc_now
+
+__all__ = [
+    "DEFAULT_EXECUTOR",
+    "DEFAULT_LEASE_SECONDS",
+    "EtlExecutor",
+    "JOB_DONE",
+    "JOB_FAILED",
+    "JOB_QUEUED",
+    "JOB_RUNNING",
+    "QueuedJob",
+    "claim_next_job",
+    "enqueue_job",
+    "finish_job",
+    "heartbeat_job",
+    "requeue_abandoned_jobs",
+    "resolve_executor",
+]
+
+EtlExecutor = Literal["inline", "process"]
+DEFAULT_EXECUTOR: EtlExecutor = "inline"
+
+JOB_QUEUED: Final = "queued"
+JOB_RUNNING: Final = "running"
+JOB_DONE: Final = "done"
+JOB_FAILED: Final = "failed"
+
+# 実行中のジョブは claimed_at を定期的に更新する。これより古い claim は放棄とみなす。
+DEFAULT_LEASE_SECONDS: Final = 60.0
+
+
+@dataclass(frozen=True)
+class QueuedJob:
+    id: int
+    run_id: int
+
+
+def resolve_executor(executor: EtlExecutor | None = None) -> EtlExecutor:
+    candidate = executor or os.getenv("PLANTING_ETL_EXECUTOR") or DEFAULT_EXECUTOR
+    if candidate not in get_args(EtlExecutor):
+        raise ValueError(f"Unsupported ETL executor: {candidate}")
+    return cast(EtlExecutor, candidate)
+
+
+def enqueue_job(conn: sqlite3.Connection, run_id: int) -> int:
+    cursor = conn.execute(
+        """
+        INSERT INTO etl_jobs (run_id, state, enqueued_at)
+        VALUES (?, ?, ?)
+        ON CONFLICT(run_id) DO NOTHING
+        """,
+        (run_id, JOB_QUEUED, _utc_now()),
+    )
+    conn.commit()
+    if cursor.rowcount:
+        return int(cursor.lastrowid or 0)
+    row = conn.execute("SELECT id FROM etl_jobs WHERE run_id = ?", (run_id,)).fetchone()
+    return int(row[0])
+
+
+def claim_next_job(conn: sqlite3.Connection, worker: str) -> QueuedJob | None:
+    conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT id, run_id FROM etl_jobs WHERE state = ? ORDER BY id LIMIT 1",
+            (JOB_QUEUED,),
+        ).fetchone()
+        if row is None:
+            conn.commit()
+            return None
+        conn.execute(
+            "UPDATE etl_jobs SET state = ?, claimed_at = ?, worker = ? WHERE id = ?",
+            (JOB_RUNNING, _utc_now(), worker, row[0]),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return QueuedJob(id=int(row[0]), run_id=int(row[1]))
+
+
+def finish_job(conn: sqlite3.Connection, job_id: int, *, succeeded: bool) -> None:
+    conn.execute(
+        "UPDATE etl_jobs SET state = ?, finished_at = ? WHERE id = ?",
+        (JOB_DONE if succeeded else JOB_FAILED, _utc_now(), job_id),
+    )
+    conn.commit()
+
+
+def heartbeat_job(conn: sqlite3.Connection, job_id: int, worker: str) -> bool:
+    """Extend the lease on a claimed job; False once the job is no longer ours."""
+
+    cursor = conn.execute(
+        "UPDATE etl_jobs SET claimed_at = ? WHERE id = ? AND worker = ? AND state = ?",
+        (_utc_now(), job_id, worker, JOB_RUNNING),
+    )
+    conn.commit()
+    return bool(cursor.rowcount)
+
+
+def _lease_expired(claimed_at: str | None, cutoff: datetime) -> bool:
+    if claimed_at is None:
+        return True
+    try:
+        return datetime.fromisoformat(claimed_at) < cutoff
+    except ValueError:
+        return True
+
+
+def requeue_abandoned_jobs(
+    conn: sqlite3.Connection, *, lease_seconds: float = DEFAULT_LEASE_SECONDS
+) -> int:
+    """Put jobs back in the queue once their worker died or stopped renewing its lease."""
+
+    cutoff = datetime.now(tz=UTC) - timedelta(seconds=lease_seconds)
+    rows = conn.execute(
+        """
+        SELECT j.id, j.worker, j.claimed_at
+        FROM etl_jobs AS j
+        JOIN etl_runs AS r ON r.id = j.run_id
+        WHERE j.state = ? AND r.state = 'running'
+        """,
+        (JOB_RUNNING,),
+    ).fetchall()
+    abandoned = [
+        (JOB_QUEUED, row[0], row[2])
+        for row in rows
+        if _lease_expired(row[2], cutoff) or metadata._process_is_gone(row[1])
+    ]
+    # 判定後にハートビートが届いていれば claimed_at が変わるので取り戻さない。
+    requeued = 0
+    for params in abandoned:
+        cursor = conn.execute(
+            """
+            UPDATE etl_jobs
+            SET state = ?, claimed_at = NULL, worker = NULL
+            WHERE id = ? AND claimed_at IS ? AND state = 'running'
+            """,
+            params,
+        )
+        requeued += cursor.rowcount
+    conn.execute(
+        """
+        UPDATE etl_jobs
+        SET state = ?, finished_at = ?
+        WHERE state IN (?, ?)
+          AND run_id NOT IN (SELECT id FROM etl_runs WHERE state = 'running')
+        """,
+        (JOB_FAILED, _utc_now(), JOB_QUEUED, JOB_RUNNING),
+    )
+    conn.commit()
+    return requeued
@@ -1,34 +1,53 @@
 from __future__ import annotations
 
+import os
+import socket
 import sqlite3
-from typing import Final
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Final
 
 from .. import schemas
+from ..db import schema
+
+if TYPE_CHECKING:
+    from ..etl.sources import SourceResult
+    from .context import ChunkCheckpoint, RetryAttempt, StageTiming
 
 STATE_RUNNING: Final[schemas.RefreshState] = "running"
 STATE_SUCCESS: Final[schemas.RefreshState] = "success"
 STATE_FAILURE: Final[schemas.RefreshState] = "failure"
 STATE_STALE: Final[schemas.RefreshState] = "stale"
 
+DEFAULT_RUN_RETENTION: Final = 1000
+
 
 def _ensure_schema(conn: sqlite3.Connection) -> None:
-    columns = {row[1] for row in conn.execute("PRAGMA table_info('etl_runs')").fetchall()}
-    migrations: dict[str, str] = {
-        "state": "ALTER TABLE etl_runs ADD COLUMN state TEXT",
-        "started_at": "ALTER TABLE etl_runs ADD COLUMN started_at TEXT",
-        "finished_at": "ALTER TABLE etl_runs ADD COLUMN finished_at TEXT",
-        "last_error": "ALTER TABLE etl_runs ADD COLUMN last_error TEXT",
-    }
-    mutated = False
-    for column, ddl in migrations.items():
-        if column not in columns:
-            conn.execute(ddl)
-            mutated = True
-    if mutated:
-        conn.commit()
+    # 通常は init_db が済ませている。init_db を経ない旧 DB 向けの互換入口。
+    schema.ensure_columns(conn)
+    conn.commit()
+
+
+def _process_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
 
 
-def _insert_run_metadata(conn: sqlite3.Connection, started_at: str) -> int:
+def _process_is_gone(name: str | None) -> bool:
+    # 所有者名は "host:pid"。同じホストのプロセスだけは生死を直接確かめられる。
+    host, _, pid = (name or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+def _insert_run_metadata(
+    conn: sqlite3.Connection, started_at: str, *, owner: str | None = None
+) -> int:
     cursor = conn.execute(
         """
         INSERT INTO etl_runs (
@@ -39,10 +58,23 @@ def _insert_run_metadata(conn: sqlite3.Connection, started_at: str) -> int:
             state,
             started_at,
             finished_at,
-            last_error
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            last_error,
+            heartbeat_at,
+            owner
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
-        (started_at, STATE_RUNNING, 0, None, STATE_RUNNING, started_at, None, None),
+        (
+            started_at,
+            STATE_RUNNING,
+            0,
+            None,
+            STATE_RUNNING,
+            started_at,
+            None,
+            None,
+            started_at,
+            owner or _process_name(),
+        ),
     )
     run_id_raw = cursor.lastrowid
     if run_id_raw is None:  # pragma: no cover - SQLite guarantees an id for AUTOINCREMENT
@@ -51,6 +83,75 @@ def _insert_run_metadata(conn: sqlite3.Connection, started_at: str) -> int:
     return int(run_id_raw)
 
 
+def _heartbeat_run(conn: sqlite3.Connection, run_id: int, *, now: str, owner: str) -> bool:
+    """Extend the run's lease and record who executes it; False once it is no longer running."""
+
+    cursor = conn.execute(
+        "UPDATE etl_runs SET heartbeat_at = ?, owner = ? WHERE id = ? AND state = ?",
+        (now, owner, run_id, STATE_RUNNING),
+    )
+    conn.commit()
+    return bool(cursor.rowcount)
+
+
+def _reclaim_stale_runs(conn: sqlite3.Connection, *, stale_before: str, now: str) -> int:
+    """Mark running rows stale once their lease expired or their owner process is gone."""
+
+    rows = conn.execute(
+        """
+        SELECT id, owner, COALESCE(heartbeat_at, started_at, run_at)
+        FROM etl_runs
+        WHERE state = ?
+        """,
+        (STATE_RUNNING,),
+    ).fetchall()
+    abandoned = [
+        int(row[0]) for row in rows if str(row[2]) < stale_before or _process_is_gone(row[1])
+    ]
+    message = "run abandoned before completion"
+    conn.executemany(
+        """
+        UPDATE etl_runs
+        SET status = ?,
+            state = ?,
+            finished_at = ?,
+            last_error = ?,
+            error_message = ?
+        WHERE id = ? AND state = ?
+        """,
+        [
+            (STATE_STALE, STATE_STALE, now, message, message, run_id, STATE_RUNNING)
+            for run_id in abandoned
+        ],
+    )
+    return len(abandoned)
+
+
+def _active_run_id(conn: sqlite3.Connection) -> int | None:
+    row = conn.execute(
+        "SELECT id FROM etl_runs WHERE state = ? ORDER BY id DESC LIMIT 1",
+        (STATE_RUNNING,),
+    ).fetchone()
+    return None if row is None else int(row[0])
+
+
+def _claim_run(conn: sqlite3.Connection, started_at: str, *, stale_before: str) -> tuple[int, bool]:
+    """Return ``(run_id, created)``; joins the in-flight run instead of inserting a second one."""
+
+    conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        _reclaim_stale_runs(conn, stale_before=stale_before, now=started_at)
+        active = _active_run_id(conn)
+        if active is not None:
+            conn.commit()
+            return active, False
+        return _insert_run_metadata(conn, started_at), True
+    except Exception:
+        conn.rollback()
+        raise
+
+
 def _mark_run_failure(
     conn: sqlite3.Connection, run_id: int, *, finished_at: str, error_message: str
 ) -> None:
@@ -86,3 +187,202 @@ def _mark_run_success(
         (STATE_SUCCESS, STATE_SUCCESS, finished_at, updated_records, run_id),
     )
     conn.commit()
+
+
+def _record_source_results(
+    conn: sqlite3.Connection, run_id: int, results: Iterable[SourceResult]
+) -> None:
+    conn.executemany(
+        """
+        INSERT INTO etl_run_sources (
+            run_id, source, started_at, duration_ms, records, rows, error
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(run_id, source) DO UPDATE SET
+            started_at = excluded.started_at,
+            duration_ms = excluded.duration_ms,
+            records = excluded.records,
+            rows = excluded.rows,
+            error = excluded.error
+        """,
+        [
+            (
+                run_id,
+                result.name,
+                result.started_at,
+                result.duration_ms,
+                result.records,
+                result.rows,
+                result.error,
+            )
+            for result in results
+        ],
+    )
+    conn.commit()
+
+
+def _record_stage_progress(
+    conn: sqlite3.Connection, run_id: int, seq: int, timing: StageTiming
+) -> None:
+    # データ書き込み中のトランザクションには相乗りし、そのコミットで一緒に見えるようにする。
+    in_transaction = conn.in_transaction
+    _record_stage_timings(conn, run_id, [timing], start=seq, commit=not in_transaction)
+
+
+def _record_stage_timings(
+    conn: sqlite3.Connection,
+    run_id: int,
+    stages: Iterable[StageTiming],
+    *,
+    start: int = 0,
+    commit: bool = True,
+) -> None:
+    conn.executemany(
+        """
+        INSERT INTO etl_run_stages (
+            run_id, seq, stage, duration_ms, rows, rows_per_sec, rss_start_kb, rss_end_kb
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(run_id, seq) DO UPDATE SET
+            stage = excluded.stage,
+            duration_ms = excluded.duration_ms,
+            rows = excluded.rows,
+            rows_per_sec = excluded.rows_per_sec,
+            rss_start_kb = excluded.rss_start_kb,
+            rss_end_kb = excluded.rss_end_kb
+        """,
+        [
+            (
+                run_id,
+                seq,
+                timing.stage,
+                timing.duration_ms,
+                timing.rows,
+                timing.rows_per_sec,
+                timing.rss_start_kb,
+                timing.rss_end_kb,
+            )
+            for seq, timing in enumerate(stages, start=start)
+        ],
+    )
+    if commit:
+        conn.commit()
+
+
+def _record_attempts(
+    conn: sqlite3.Connection, run_id: int, attempts: Iterable[RetryAttempt]
+) -> None:
+    conn.executemany(
+        """
+        INSERT INTO etl_run_attempts (run_id, attempt, error, transient, wait_ms)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(run_id, attempt) DO UPDATE SET
+            error = excluded.error,
+            transient = excluded.transient,
+            wait_ms = excluded.wait_ms
+        """,
+        [
+            (run_id, item.attempt, item.error, int(item.transient), item.wait_ms)
+            for item in attempts
+        ],
+    )
+    conn.commit()
+
+
+def _save_checkpoint(conn: sqlite3.Connection, run_id: int, checkpoint: ChunkCheckpoint) -> None:
+    # コミットはしない。チャンクの書き込みと同じトランザクションで確定させる。
+    conn.execute(
+        """
+        INSERT INTO etl_checkpoints (
+            run_id, feed_hash, chunk, chunk_size, source_offset, updated_at
+        ) VALUES (?, ?, ?, ?, ?, strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
+        ON CONFLICT(run_id) DO UPDATE SET
+            feed_hash = excluded.feed_hash,
+            chunk = excluded.chunk,
+            chunk_size = excluded.chunk_size,
+            source_offset = excluded.source_offset,
+            updated_at = excluded.updated_at
+        """,
+        (
+            run_id,
+            checkpoint.feed_hash,
+            checkpoint.chunk,
+            checkpoint.chunk_size,
+            checkpoint.source_offset,
+        ),
+    )
+
+
+def _load_resume_checkpoint(conn: sqlite3.Connection, run_id: int) -> ChunkCheckpoint | None:
+    """Checkpoint of this run, or of the latest interrupted run since the last success."""
+
+    from .context import ChunkCheckpoint
+
+    row = conn.execute(
+        """
+        SELECT c.feed_hash, c.chunk, c.chunk_size, c.source_offset
+        FROM etl_checkpoints AS c
+        JOIN etl_runs AS r ON r.id = c.run_id
+        WHERE r.id = ?
+           OR (
+                r.state IN (?, ?)
+                AND r.id > COALESCE((SELECT MAX(id) FROM etl_runs WHERE state = ?), 0)
+           )
+        ORDER BY r.id = ? DESC, r.id DESC
+        LIMIT 1
+        """,
+        (run_id, STATE_FAILURE, STATE_STALE, STATE_SUCCESS, run_id),
+    ).fetchone()
+    if row is None:
+        return None
+    return ChunkCheckpoint(
+        feed_hash=str(row[0]),
+        chunk=int(row[1]),
+        chunk_size=int(row[2]),
+        source_offset=int(row[3]),
+    )
+
+
+def _request_cancel(
+    conn: sqlite3.Connection, run_id: int, requested_at: str, *, commit: bool = True
+) -> None:
+    conn.execute(
+        """
+        INSERT INTO etl_run_cancellations (run_id, requested_at) VALUES (?, ?)
+        ON CONFLICT(run_id) DO NOTHING
+        """,
+        (run_id, requested_at),
+    )
+    if commit:
+        conn.commit()
+
+
+def _cancel_requested(conn: sqlite3.Connection, run_id: int) -> bool:
+    row = conn.execute("SELECT 1 FROM etl_run_cancellations WHERE run_id = ?", (run_id,)).fetchone()
+    return row is not None
+
+
+def _run_retention() -> int:
+    raw = os.getenv("PLANTING_ETL_RUN_RETENTION")
+    if not raw:
+        return DEFAULT_RUN_RETENTION
+    try:
+        return max(0, int(raw))
+    except ValueError as exc:
+        raise ValueError(f"Invalid PLANTING_ETL_RUN_RETENTION value: {raw!r}") from exc
+
+
+def _compact_runs(conn: sqlite3.Connection, *, keep: int | None = None) -> int:
+    """Delete finished runs beyond the newest ``keep``; child rows go with them (CASCADE)."""
+
+    limit = _run_retention() if keep is None else keep
+    if limit <= 0:
+        return 0
+    cursor = conn.execute(
+        """
+        DELETE FROM etl_runs
+        WHERE state != ?
+          AND id <= (SELECT id FROM etl_runs ORDER BY id DESC LIMIT 1 OFFSET ?)
+        """,
+        (STATE_RUNNING, limit),
+    )
+    conn.commit()
+    return cursor.rowcount
@@ -1,21 +1,27 @@
 from __future__ import annotations
 
 import logging
+import random
 import sqlite3
+import threading
 import time
-from collections.abc import Callable, Iterable
+from collections.abc import Callable, Iterable, Sequence
 from datetime import datetime
 from typing import TYPE_CHECKING, Any, TypeAlias, cast
 
 from typing_extensions import Protocol
 
 from ..compat import UTC
-from . import connection, metadata
+from . import coalesce, connection, events, metadata, status
+from . import context as etl_context
 
 logger = logging.getLogger(__name__)
 
 DataLoader: TypeAlias = Callable[[], Iterable[dict[str, Any]]]
 
+DEFAULT_MAX_RETRY_DELAY = 5.0
+_TRANSIENT_SQLITE_CODES = frozenset({sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED})
+
 
 class _RunEtlFunc(Protocol):
     def __call__(
@@ -32,6 +38,7 @@ def _utc_now() -> str:
 
 if TYPE_CHECKING:
     from ..etl import run_etl as _typed_run_etl
+    from ..etl.sources import EtlSource, SourceResult
 
     def _load_run_etl() -> _RunEtlFunc:
         return _typed_run_etl
@@ -50,6 +57,66 @@ def _resolve_run_etl_factory() -> _RunEtlFactory:
     return shim._load_run_etl
 
 
+def _resolve_sources(
+    sources: Sequence[EtlSource] | None, data_loader: DataLoader | None
+) -> list[EtlSource]:
+    if sources is not None:
+        return list(sources)
+    if data_loader is not None:
+        return []
+    from ..etl import sources as etl_sources
+
+    return list(etl_sources.registry.sources())
+
+
+def _source_ingest_factory(
+    sources: Sequence[EtlSource],
+    *,
+    max_workers: int | None,
+    results: list[SourceResult],
+) -> _RunEtlFactory:
+    from ..etl import sources as etl_sources
+    from ..etl import transform
+
+    def run_sources(conn: sqlite3.Connection, *, data_loader: DataLoader | None = None) -> int:
+        def ingest() -> list[SourceResult]:
+            with etl_context.stage("ingest") as timing:
+                ingested = etl_sources.ingest_sources(sources, max_workers=max_workers)
+                timing.rows = sum(result.rows for result in ingested)
+            return ingested
+
+        results[:] = etl_context.memoize("source_results", ingest)
+        failed = [result for result in results if result.error is not None]
+        if failed:
+            details = "; ".join(f"{result.name}: {result.error}" for result in failed)
+            raise etl_sources.SourceIngestError(f"ETL source ingestion failed ({details})")
+        legacy_rows = [row for result in results for row in result.legacy_rows]
+        market_rows = [row for result in results for row in result.market_rows]
+        if not legacy_rows and not market_rows:
+            return 0
+        # 取り込みは並列、書き込みはこの接続 1 本に集約する。
+        return transform.load_transformed(conn, legacy_rows, market_rows)
+
+    return lambda: run_sources
+
+
+def _is_transient(exc: BaseException) -> bool:
+    if not isinstance(exc, sqlite3.OperationalError):
+        return False
+    code = getattr(exc, "sqlite_errorcode", None)
+    if code is None:
+        # SQLite 以外（ローダーなど）が送出した OperationalError は従来どおり再試行する。
+        return True
+    return (int(code) & 0xFF) in _TRANSIENT_SQLITE_CODES
+
+
+def _backoff_delay(attempt: int, *, base: float, cap: float, rng: random.Random) -> float:
+    if base <= 0:
+        return 0.0
+    # full jitter: [0, min(cap, base * 2^(n-1))]
+    return rng.uniform(0.0, min(cap, base * (2 ** (attempt - 1))))
+
+
 def _run_etl_with_retries(
     *,
     load_run_etl: _RunEtlFactory,
@@ -57,18 +124,78 @@ def _run_etl_with_retries(
     data_loader: DataLoader | None,
     max_retries: int,
     retry_delay: float,
+    max_retry_delay: float = DEFAULT_MAX_RETRY_DELAY,
+    rng: random.Random | None = None,
+    sleep: Callable[[float], None] = time.sleep,
 ) -> int:
     attempt = 0
+    jitter = rng or random.SystemRandom()
+    run_context = etl_context.current()
     while True:
         try:
             run_etl = load_run_etl()
             return run_etl(conn, data_loader=data_loader)
-        except sqlite3.DatabaseError:
+        except sqlite3.DatabaseError as exc:
             attempt += 1
-            if attempt >= max_retries:
+            transient = _is_transient(exc)
+            retrying = transient and attempt < max_retries
+            delay = (
+                _backoff_delay(attempt, base=retry_delay, cap=max_retry_delay, rng=jitter)
+                if retrying
+                else 0.0
+            )
+            if run_context is not None:
+                run_context.attempts.append(
+                    etl_context.RetryAttempt(
+                        attempt=attempt,
+                        error=f"{type(exc).__name__}: {exc}",
+                        transient=transient,
+                        wait_ms=delay * 1000.0,
+                    )
+                )
+            if not retrying:
                 raise
-            if retry_delay:
-                time.sleep(retry_delay)
+            # 未コミットの書き込みだけを捨て、コミット済みチャンクは残したまま再開する。
+            conn.rollback()
+            logger.warning(
+                "transient ETL failure; retrying",
+                extra={"attempt": attempt, "delay": delay, "error": str(exc)},
+            )
+            if delay:
+                sleep(delay)
+
+
+def _announce_run(conn: sqlite3.Connection, run_id: int) -> None:
+    run = status.get_run(conn, run_id)
+    if run is None:
+        return
+    status.remember_status(conn, run)
+    if events.bus.subscriber_count:
+        events.publish_status(run)
+
+
+def _keep_run_alive(
+    factory: Callable[[], sqlite3.Connection],
+    run_id: int,
+    owner: str,
+    done: threading.Event,
+    interval: float,
+) -> None:
+    # 短い実行では接続を開かずに済むよう、最初の更新時に開く。
+    conn: sqlite3.Connection | None = None
+    try:
+        while not done.wait(interval):
+            try:
+                if conn is None:
+                    conn = connection._open_connection(factory)
+                if not metadata._heartbeat_run(conn, run_id, now=_utc_now(), owner=owner):
+                    return
+            except sqlite3.Error:
+                # 一時的なロック競合なら次の周期で取り返せる。
+                logger.warning("ETL run heartbeat failed", extra={"run_id": run_id}, exc_info=True)
+    finally:
+        if conn is not None:
+            conn.close()
 
 
 def start_etl_job(
@@ -77,15 +204,76 @@ def start_etl_job(
     conn_factory: Callable[[], sqlite3.Connection] | None = None,
     max_retries: int = 3,
     retry_delay: float = 0.1,
+    sources: Sequence[EtlSource] | None = None,
+    max_workers: int | None = None,
+    run_id: int | None = None,
 ) -> None:
     factory = connection._resolve_conn_factory(conn_factory)
     conn = connection._open_connection(factory)
     try:
-        metadata._ensure_schema(conn)
-        started_at = _utc_now()
-        run_id = metadata._insert_run_metadata(conn, started_at)
+        if run_id is None:
+            now = datetime.now(tz=UTC)
+            run_id, created = metadata._claim_run(
+                conn, _utc_now(), stale_before=coalesce.stale_cutoff(now)
+            )
+            if not created:
+                logger.info("ETL run already in progress", extra={"run_id": run_id})
+                return
+        # キューから渡された run もここで所有者を引き継ぎ、実行中はリースを更新し続ける。
+        owner = metadata._process_name()
+        if not metadata._heartbeat_run(conn, run_id, now=_utc_now(), owner=owner):
+            logger.info("ETL run is no longer running", extra={"run_id": run_id})
+            return
+        done = threading.Event()
+        heartbeat = threading.Thread(
+            target=_keep_run_alive,
+            args=(factory, run_id, owner, done, coalesce.run_lease().total_seconds() / 3),
+            name=f"etl-run-{run_id}-lease",
+            daemon=True,
+        )
+        heartbeat.start()
         try:
+            _execute_run(conn, run_id, data_loader, max_retries, retry_delay, sources, max_workers)
+        finally:
+            done.set()
+            heartbeat.join()
+    finally:
+        conn.close()
+
+
+def _execute_run(
+    conn: sqlite3.Connection,
+    run_id: int,
+    data_loader: DataLoader | None,
+    max_retries: int,
+    retry_delay: float,
+    sources: Sequence[EtlSource] | None,
+    max_workers: int | None,
+) -> None:
+    selected_sources = _resolve_sources(sources, data_loader)
+    source_results: list[SourceResult] = []
+
+    def on_stage(seq: int, timing: etl_context.StageTiming) -> None:
+        metadata._record_stage_progress(conn, run_id, seq, timing)
+        if events.bus.subscriber_count:
+            events.publish_stage(run_id, seq, timing)
+
+    _announce_run(conn, run_id)
+    run_context = etl_context.RunContext(
+        run_id=run_id,
+        on_stage=on_stage,
+        resume=metadata._load_resume_checkpoint(conn, run_id),
+        on_chunk=lambda checkpoint: metadata._save_checkpoint(conn, run_id, checkpoint),
+        is_cancelled=lambda: metadata._cancel_requested(conn, run_id),
+    )
+    try:
+        if selected_sources:
+            load_run_etl = _source_ingest_factory(
+                selected_sources, max_workers=max_workers, results=source_results
+            )
+        else:
             load_run_etl = _resolve_run_etl_factory()
+        with etl_context.activate(run_context):
             updated_records = _run_etl_with_retries(
                 load_run_etl=load_run_etl,
                 conn=conn,
@@ -93,20 +281,36 @@ def start_etl_job(
                 max_retries=max_retries,
                 retry_delay=retry_delay,
             )
-        except Exception as exc:  # pragma: no cover - defensive path
-            finished_at = _utc_now()
-            metadata._mark_run_failure(
-                conn, run_id, finished_at=finished_at, error_message=str(exc)
-            )
-            raise
-        else:
-            finished_at = _utc_now()
-            metadata._mark_run_success(
-                conn, run_id, finished_at=finished_at, updated_records=updated_records
-            )
+    except Exception as exc:  # pragma: no cover - defensive path
+        conn.rollback()
+        if source_results:
+            metadata._record_source_results(conn, run_id, source_results)
+        metadata._record_stage_timings(conn, run_id, run_context.stages)
+        metadata._record_attempts(conn, run_id, run_context.attempts)
+        finished_at = _utc_now()
+        metadata._mark_run_failure(conn, run_id, finished_at=finished_at, error_message=str(exc))
+        metadata._compact_runs(conn)
+        _announce_run(conn, run_id)
+        if isinstance(exc, etl_context.RunCancelled):
+            # 利用者による中断は異常終了ではない。チェックポイントは次回の再開に残す。
             logger.info(
-                "market_metadata cache refresh confirmed",
-                extra={"updated_records": updated_records},
+                "ETL run cancelled",
+                extra={"run_id": run_id, "committed_chunks": run_context.committed_chunks},
             )
-    finally:
-        conn.close()
+            return
+        raise
+    else:
+        if source_results:
+            metadata._record_source_results(conn, run_id, source_results)
+        metadata._record_stage_timings(conn, run_id, run_context.stages)
+        metadata._record_attempts(conn, run_id, run_context.attempts)
+        finished_at = _utc_now()
+        metadata._mark_run_success(
+            conn, run_id, finished_at=finished_at, updated_records=updated_records
+        )
+        metadata._compact_runs(conn)
+        _announce_run(conn, run_id)
+        logger.info(
+            "market_metadata cache refresh confirmed",
+            extra={"updated_records": updated_records},
+        )
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from . import coalesce, connection, control, jobs, metadata, runner
+
+__all__ = ["RefreshScheduler", "SchedulerConfig"]
+
+logger = logging.getLogger(__name__)
+
+_RUN_POLL_INTERVAL = 1.0
+
+
+@dataclass(frozen=True)
+class SchedulerConfig:
+    interval: float
+    jitter: float = 0.0
+    shutdown_timeout: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> SchedulerConfig | None:
+        raw_interval = os.getenv("PLANTING_REFRESH_INTERVAL")
+        if not raw_interval:
+            return None
+        try:
+            interval = float(raw_interval)
+            raw_jitter = os.getenv("PLANTING_REFRESH_JITTER")
+            jitter = float(raw_jitter) if raw_jitter else interval * 0.1
+        except ValueError as exc:
+            raise ValueError(f"Invalid refresh scheduler settings: {exc}") from exc
+        if interval <= 0:
+            return None
+        return cls(interval=interval, jitter=max(0.0, jitter))
+
+
+class RefreshScheduler:
+    """Trigger ``start_etl_job`` on a jittered cadence from the API lifespan."""
+
+    def __init__(
+        self,
+        config: SchedulerConfig,
+        *,
+        conn_factory: Callable[[], sqlite3.Connection] | None = None,
+        warm: Callable[[sqlite3.Connection], object] | None = None,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.config = config
+        self._conn_factory = connection._resolve_conn_factory(conn_factory)
+        self._warm = warm
+        self._rng = rng or random.Random()
+        self._stop = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._running: int | None = None
+        self.completed_runs = 0
+        self.skipped_runs = 0
+
+    def next_delay(self) -> float:
+        offset = self._rng.uniform(-self.config.jitter, self.config.jitter)
+        return max(0.0, self.config.interval + offset)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stop.clear()
+            self._task = asyncio.create_task(self._loop(), name="refresh-scheduler")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        self._stop.set()
+        run_id = self._running
+        if run_id is not None:
+            # to_thread のタスクを止めても ETL は動き続けるため、run 自体に中断を要求する。
+            await asyncio.to_thread(self._cancel, run_id)
+        try:
+            await asyncio.wait_for(task, timeout=self.config.shutdown_timeout)
+        except TimeoutError:
+            logger.warning("refresh scheduler did not stop in time; cancelling")
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self.next_delay())
+            except TimeoutError:
+                pass
+            else:
+                break
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("scheduled refresh failed")
+
+    async def run_once(self) -> bool:
+        """Run one scheduled refresh; returns ``False`` when a run was already in flight."""
+
+        claim = await asyncio.to_thread(self._claim)
+        if claim is None:
+            self.skipped_runs += 1
+            logger.info("scheduled refresh skipped; run already in progress")
+            return False
+        self._running = claim.run_id
+        try:
+            if jobs.resolve_executor() == "process":
+                await asyncio.to_thread(self._enqueue, claim.run_id)
+                await self._wait_for_run(claim.run_id)
+            else:
+                await asyncio.to_thread(
+                    runner.start_etl_job, conn_factory=self._conn_factory, run_id=claim.run_id
+                )
+        finally:
+            self._running = None
+        self.completed_runs += 1
+        if self._warm is not None and await asyncio.to_thread(self._succeeded, claim.run_id):
+            await asyncio.to_thread(self._run_warm)
+        return True
+
+    def _claim(self) -> coalesce.RefreshClaim | None:
+        conn = self._conn_factory()
+        try:
+            claim = coalesce.claim_refresh(conn)
+        finally:
+            conn.close()
+        return claim if claim.created else None
+
+    def _enqueue(self, run_id: int) -> None:
+        conn = self._conn_factory()
+        try:
+            jobs.enqueue_job(conn, run_id)
+        finally:
+            conn.close()
+
+    def _cancel(self, run_id: int) -> None:
+        conn = self._conn_factory()
+        try:
+            control.cancel_run(conn, run_id)
+        except Exception:
+            logger.warning("failed to cancel scheduled refresh", exc_info=True)
+        finally:
+            conn.close()
+
+    def _run_state(self, run_id: int) -> str | None:
+        conn = self._conn_factory()
+        try:
+            row = conn.execute("SELECT state FROM etl_runs WHERE id = ?", (run_id,)).fetchone()
+        finally:
+            conn.close()
+        return None if row is None else str(row[0])
+
+    def _succeeded(self, run_id: int) -> bool:
+        return self._run_state(run_id) == metadata.STATE_SUCCESS
+
+    async def _wait_for_run(self, run_id: int) -> None:
+        while await asyncio.to_thread(self._run_state, run_id) == metadata.STATE_RUNNING:
+            if self._stop.is_set():
+                return
+            await asyncio.sleep(_RUN_POLL_INTERVAL)
+
+    def _run_warm(self) -> None:
+        if self._warm is None:  # pragma: no cover - guarded by run_once
+            return
+        conn = self._conn_factory()
+        try:
+            self._warm(conn)
+        finally:
+            conn.close()
@@ -1,6 +1,12 @@
 from __future__ import annotations
 
+import os
 import sqlite3
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass
 from typing import Any, cast
 
 from .. import schemas
@@ -13,6 +19,28 @@ _STATE_LOOKUP: dict[str, schemas.RefreshState] = {
     metadata.STATE_STALE: metadata.STATE_STALE,
 }
 
+_RUN_COLUMNS_SQL = """
+    SELECT
+        id,
+        COALESCE(state, status) AS state,
+        COALESCE(started_at, run_at) AS started_at,
+        finished_at,
+        updated_records,
+        COALESCE(last_error, error_message) AS last_error,
+        run_at
+    FROM etl_runs
+"""
+
+_RUNS_SQL = (
+    _RUN_COLUMNS_SQL
+    + """
+    ORDER BY etl_runs.started_at DESC, etl_runs.id DESC
+    LIMIT ?
+"""
+)
+
+_RUN_SQL = _RUN_COLUMNS_SQL + " WHERE id = ?"
+
 
 def _coerce_state(value: Any) -> schemas.RefreshState:
     if isinstance(value, str):
@@ -23,39 +51,146 @@ def _coerce_state(value: Any) -> schemas.RefreshState:
     return metadata.STATE_STALE
 
 
-def get_last_status(conn: sqlite3.Connection) -> schemas.RefreshStatus:
-    metadata._ensure_schema(conn)
-    row = conn.execute(
-        """
-        SELECT
-            COALESCE(state, status) AS state,
-            COALESCE(started_at, run_at) AS started_at,
-            finished_at,
-            updated_records,
-            COALESCE(last_error, error_message) AS last_error,
-            run_at
-        FROM etl_runs
-        ORDER BY COALESCE(started_at, run_at) DESC
-        LIMIT 1
-        """,
-    ).fetchone()
-    if row is None:
-        return schemas.RefreshStatus(
-            state="stale",
-            started_at=None,
-            finished_at=None,
-            updated_records=0,
-            last_error=None,
+def _load_stages(
+    conn: sqlite3.Connection, run_ids: Sequence[int]
+) -> dict[int, list[schemas.RefreshStage]]:
+    stages: dict[int, list[schemas.RefreshStage]] = defaultdict(list)
+    if not run_ids:
+        return stages
+    placeholders = ", ".join("?" for _ in run_ids)
+    try:
+        rows = conn.execute(
+            f"""
+            SELECT run_id, stage, duration_ms, rows, rows_per_sec, rss_start_kb, rss_end_kb
+            FROM etl_run_stages
+            WHERE run_id IN ({placeholders})
+            ORDER BY run_id, seq
+            """,
+            tuple(run_ids),
+        ).fetchall()
+    except sqlite3.OperationalError:  # pragma: no cover - init_db 前の旧 DB
+        return stages
+    for row in rows:
+        stages[int(row["run_id"])].append(
+            schemas.RefreshStage(
+                stage=row["stage"],
+                duration_ms=float(row["duration_ms"]),
+                rows=int(row["rows"]),
+                rows_per_sec=row["rows_per_sec"],
+                rss_start_kb=row["rss_start_kb"],
+                rss_end_kb=row["rss_end_kb"],
+            )
         )
+    return stages
+
 
-    state = _coerce_state(row["state"])
-    finished_at = cast(str | None, row["finished_at"])
+def _row_to_status(
+    row: sqlite3.Row, stages: dict[int, list[schemas.RefreshStage]]
+) -> schemas.RefreshStatus:
+    run_id = int(row["id"])
     raw_updated_records = cast(int | None, row["updated_records"])
     updated_records = 0 if raw_updated_records is None else int(raw_updated_records)
     return schemas.RefreshStatus(
-        state=state,
+        state=_coerce_state(row["state"]),
         started_at=row["started_at"],
-        finished_at=finished_at,
+        finished_at=cast(str | None, row["finished_at"]),
         updated_records=updated_records,
         last_error=cast(str | None, row["last_error"]),
+        run_id=run_id,
+        stages=stages.get(run_id, []),
     )
+
+
+def list_runs(conn: sqlite3.Connection, *, limit: int = 20) -> list[schemas.RefreshStatus]:
+    rows = conn.execute(_RUNS_SQL, (limit,)).fetchall()
+    stages = _load_stages(conn, [int(row["id"]) for row in rows])
+    return [_row_to_status(row, stages) for row in rows]
+
+
+def get_run(conn: sqlite3.Connection, run_id: int) -> schemas.RefreshStatus | None:
+    row = conn.execute(_RUN_SQL, (run_id,)).fetchone()
+    if row is None:
+        return None
+    return _row_to_status(row, _load_stages(conn, [run_id]))
+
+
+@dataclass(frozen=True)
+class _CachedStatus:
+    latest_id: int | None
+    status: schemas.RefreshStatus
+    expires_at: float
+
+
+DEFAULT_STATUS_TTL = 2.0
+
+_status_cache: dict[str, _CachedStatus] = {}
+_status_cache_lock = threading.Lock()
+
+
+def _status_ttl() -> float:
+    raw = os.getenv("PLANTING_REFRESH_STATUS_TTL")
+    try:
+        return DEFAULT_STATUS_TTL if not raw else max(0.0, float(raw))
+    except ValueError:
+        return DEFAULT_STATUS_TTL
+
+
+def _database_key(conn: sqlite3.Connection) -> str:
+    row = conn.execute("PRAGMA database_list").fetchone()
+    return "" if row is None else str(row[2])
+
+
+def _latest_run_id(conn: sqlite3.Connection) -> int | None:
+    row = conn.execute("SELECT MAX(id) FROM etl_runs").fetchone()
+    return None if row is None or row[0] is None else int(row[0])
+
+
+def remember_status(conn: sqlite3.Connection, run: schemas.RefreshStatus) -> None:
+    """Write-through from the runner so state changes are visible before the TTL expires."""
+
+    key = _database_key(conn)
+    ttl = _status_ttl()
+    if not key or ttl <= 0 or run.run_id is None:
+        return
+    latest = _latest_run_id(conn)
+    if latest != run.run_id:
+        return
+    with _status_cache_lock:
+        _status_cache[key] = _CachedStatus(latest, run, time.monotonic() + ttl)
+
+
+def invalidate_status(conn: sqlite3.Connection | None = None) -> None:
+    with _status_cache_lock:
+        if conn is None:
+            _status_cache.clear()
+        else:
+            _status_cache.pop(_database_key(conn), None)
+
+
+def get_last_status(conn: sqlite3.Connection, *, cached: bool = True) -> schemas.RefreshStatus:
+    # MAX(id) は主キー末尾の参照だけで済む。新しい実行や履歴の削除はこれで検知し、
+    # 別プロセスによる同じ行の状態更新は TTL の範囲で追随する。
+    # cached=False は必ず DB を読み、その結果でキャッシュを更新する。
+    key = _database_key(conn)
+    latest = _latest_run_id(conn)
+    if key and cached:
+        with _status_cache_lock:
+            entry = _status_cache.get(key)
+        if entry is not None and entry.latest_id == latest and entry.expires_at > time.monotonic():
+            return entry.status.model_copy(deep=True)
+    runs = list_runs(conn, limit=1)
+    if not runs:
+        status = schemas.RefreshStatus(
+            state="stale",
+            started_at=None,
+            finished_at=None,
+            updated_records=0,
+            last_error=None,
+        )
+    else:
+        status = runs[0]
+    ttl = _status_ttl()
+    if key and ttl > 0:
+        with _status_cache_lock:
+            _status_cache[key] = _CachedStatus(latest, status, time.monotonic() + ttl)
+    return status
@@ -0,0 +1,161 @@
+"""Out-of-process ETL executor: ``python -m app.etl_runner.worker``."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import threading
+from collections.abc import Callable, Sequence
+from pathlib import Path
+
+from . import connection, jobs, metadata, runner
+
+__all__ = ["main", "run_worker", "spawn_worker_process", "stop_worker_process"]
+
+logger = logging.getLogger(__name__)
+
+_BACKEND_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_POLL_INTERVAL = 1.0
+
+
+def _keep_lease(
+    factory: Callable[[], sqlite3.Connection],
+    job_id: int,
+    worker: str,
+    done: threading.Event,
+    interval: float,
+) -> None:
+    conn = connection._open_connection(factory)
+    try:
+        while not done.wait(interval):
+            try:
+                jobs.heartbeat_job(conn, job_id, worker)
+            except sqlite3.Error:
+                # 一時的なロック競合なら次の周期で取り返せる。
+                logger.warning("ETL job heartbeat failed", extra={"job_id": job_id}, exc_info=True)
+    finally:
+        conn.close()
+
+
+def run_worker(
+    *,
+    conn_factory: Callable[[], sqlite3.Connection] | None = None,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    once: bool = False,
+    stop_event: threading.Event | None = None,
+    lease_seconds: float = jobs.DEFAULT_LEASE_SECONDS,
+) -> int:
+    """Drain ``etl_jobs`` and return the number of processed jobs.
+
+    With ``once`` the loop exits as soon as the queue is empty.
+    """
+
+    factory = connection._resolve_conn_factory(conn_factory)
+    stop = stop_event or threading.Event()
+    name = metadata._process_name()
+    conn = connection._open_connection(factory)
+    try:
+        requeued = jobs.requeue_abandoned_jobs(conn, lease_seconds=lease_seconds)
+        if requeued:
+            logger.warning("requeued abandoned ETL jobs", extra={"jobs": requeued})
+        processed = 0
+        while not stop.is_set():
+            job = jobs.claim_next_job(conn, name)
+            if job is None:
+                if once:
+                    break
+                stop.wait(poll_interval)
+                continue
+            succeeded = False
+            # 実行中は claimed_at を更新し続け、他のワーカーに放棄とみなされないようにする。
+            done = threading.Event()
+            heartbeat = threading.Thread(
+                target=_keep_lease,
+                args=(factory, job.id, name, done, lease_seconds / 3),
+                name=f"etl-job-{job.id}-lease",
+                daemon=True,
+            )
+            heartbeat.start()
+            try:
+                runner.start_etl_job(conn_factory=factory, run_id=job.run_id)
+                succeeded = True
+            except Exception:
+                # 失敗内容は start_etl_job が etl_runs に記録済み。
+                logger.exception("ETL job failed", extra={"job_id": job.id, "run_id": job.run_id})
+            finally:
+                done.set()
+                heartbeat.join()
+                jobs.finish_job(conn, job.id, succeeded=succeeded)
+            processed += 1
+        return processed
+    finally:
+        conn.close()
+
+
+def spawn_worker_process(
+    *, poll_interval: float = DEFAULT_POLL_INTERVAL
+) -> subprocess.Popen[bytes]:
+    from .. import db as db_legacy
+
+    env = dict(os.environ)
+    # テストなどで差し替えた DB パスをワーカーにも引き継ぐ。
+    env["PLANTING_DB_PATH"] = str(db_legacy.DATABASE_FILE)
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "app.etl_runner.worker",
+            "--poll-interval",
+            str(poll_interval),
+        ],
+        cwd=_BACKEND_DIR,
+        env=env,
+    )
+
+
+def stop_worker_process(process: subprocess.Popen[bytes], *, timeout: float = 10.0) -> None:
+    if process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:  # pragma: no cover - worker stuck in a long write
+        process.kill()
+        process.wait()
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run queued planting-planner ETL jobs")
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help="Seconds to wait between queue polls",
+    )
+    parser.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+    parser.add_argument(
+        "--nice",
+        type=int,
+        default=10,
+        help="Scheduling niceness increment so API processes keep CPU priority",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.nice and hasattr(os, "nice"):
+        os.nice(args.nice)
+
+    stop = threading.Event()
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    run_worker(poll_interval=args.poll_interval, once=args.once, stop_event=stop)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
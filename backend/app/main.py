@@ -1,20 +1,55 @@
 from __future__ import annotations
 
+import asyncio
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
 from .dependencies import prepare_database
+from .etl_runner import resolve_executor
+from .etl_runner.events import watch_database
+from .etl_runner.scheduler import RefreshScheduler, SchedulerConfig
+from .etl_runner.worker import spawn_worker_process, stop_worker_process
 from .middleware.security import SecurityHeadersMiddleware
 from .routes import api_router
 from .routes.telemetry import router as telemetry_router
+from .routes.weather import get_weather_service
+from .warmup import warm_read_caches
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI) -> AsyncIterator[None]:
     prepare_database()
-    yield
+    weather_service = get_weather_service()
+    await weather_service.start()
+    worker = spawn_worker_process() if resolve_executor() == "process" else None
+    # ワーカープロセスの進捗は DB 経由でしか見えないため、SSE 用に 1 本だけ監視する。
+    watcher_stop = asyncio.Event()
+    watcher = (
+        asyncio.create_task(watch_database(stop_event=watcher_stop), name="refresh-events")
+        if worker is not None
+        else None
+    )
+    scheduler_config = SchedulerConfig.from_env()
+    scheduler = (
+        RefreshScheduler(scheduler_config, warm=warm_read_caches)
+        if scheduler_config is not None
+        else None
+    )
+    if scheduler is not None:
+        scheduler.start()
+    try:
+        yield
+    finally:
+        if scheduler is not None:
+            await scheduler.stop()
+        if watcher is not None:
+            watcher_stop.set()
+            await watcher
+        if worker is not None:
+            stop_worker_process(worker)
+        await weather_service.aclose()
 
 
 app = FastAPI(title="planting-planner API", lifespan=lifespan)
@@ -3,12 +3,16 @@ from __future__ import annotations
 import logging
 from typing import Annotated
 
-from fastapi import APIRouter, BackgroundTasks, Header, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 
 from .. import schemas
+from ..db.connection import get_conn as get_db_conn
 from ..dependencies import ConnDependency
+from ..etl_runner import events as refresh_events
+from ..services import cancel_refresh, start_refresh
+from ..services import refresh_runs as get_refresh_runs
 from ..services import refresh_status as get_refresh_status
-from ..services import start_refresh
 
 router = APIRouter()
 
@@ -30,23 +34,25 @@ def _require_idempotency_key(idempotency_key: str | None) -> str:
 @router.post("/api/refresh", response_model=schemas.RefreshResponse)
 def refresh(
     background_tasks: BackgroundTasks,
+    conn: ConnDependency,
     payload: schemas.RefreshTriggerPayload | None = None,
     idempotency_key: IdempotencyKey = None,
 ) -> schemas.RefreshResponse:
     key = _require_idempotency_key(idempotency_key)
     logger.info("refresh requested", extra={"idempotency_key": key})
-    return start_refresh(background_tasks, payload)
+    return start_refresh(background_tasks, payload, conn=conn, idempotency_key=key)
 
 
 @router.post("/refresh", response_model=schemas.RefreshResponse)
 def refresh_legacy(
     background_tasks: BackgroundTasks,
+    conn: ConnDependency,
     payload: schemas.RefreshTriggerPayload | None = None,
     idempotency_key: IdempotencyKey = None,
 ) -> schemas.RefreshResponse:
     key = _require_idempotency_key(idempotency_key)
     logger.info("legacy refresh requested", extra={"idempotency_key": key})
-    return start_refresh(background_tasks, payload)
+    return start_refresh(background_tasks, payload, conn=conn, idempotency_key=key)
 
 
 @router.get("/api/refresh/status", response_model=schemas.RefreshStatusResponse)
@@ -57,3 +63,40 @@ def refresh_status(conn: ConnDependency) -> schemas.RefreshStatusResponse:
 @router.get("/refresh/status", response_model=schemas.RefreshStatusResponse)
 def refresh_status_legacy(conn: ConnDependency) -> schemas.RefreshStatusResponse:
     return get_refresh_status(conn)
+
+
+def _read_snapshot() -> schemas.RefreshStatus:
+    # 購読後にジェネレータから呼ばれるため、依存性の接続ではなく専用の接続を使う。
+    # キャッシュは最大 TTL 分古く、購読前に終わった実行を取りこぼすので読まない。
+    conn = get_db_conn()
+    try:
+        return get_refresh_status(conn, cached=False)
+    finally:
+        conn.close()
+
+
+@router.get("/api/refresh/events", response_class=StreamingResponse)
+def refresh_event_stream(request: Request) -> StreamingResponse:
+    # 最初の 1 件だけ DB から読み、以降は ETL からの通知をそのまま流す。
+    return StreamingResponse(
+        refresh_events.stream_events(_read_snapshot, is_disconnected=request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/api/refresh/runs", response_model=schemas.RefreshRunsResponse)
+def refresh_runs(
+    conn: ConnDependency,
+    limit: int = Query(20, ge=1, le=200, description="number of recent runs"),
+) -> schemas.RefreshRunsResponse:
+    return get_refresh_runs(conn, limit=limit)
+
+
+@router.post(
+    "/api/refresh/runs/{run_id}/cancel",
+    response_model=schemas.RefreshStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def refresh_cancel(run_id: int, conn: ConnDependency) -> schemas.RefreshStatus:
+    return cancel_refresh(conn, run_id)
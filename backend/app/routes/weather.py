@@ -1,13 +1,17 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
 from .. import schemas
 from ..services.weather import WeatherService, WeatherServiceError
+from ..services.weather_store import WeatherStore
 
 router = APIRouter()
 
-_weather_service = WeatherService()
+_weather_service = WeatherService(store=WeatherStore.from_env())
+
+# 更新できていない古い予報を返したときに付ける。
+STALE_HEADER = "X-Weather-Stale"
 
 
 def get_weather_service() -> WeatherService:
@@ -19,11 +23,42 @@ weather_service_dependency = Depends(get_weather_service)
 
 @router.get("/api/weather", response_model=schemas.WeatherResponse)
 async def read_weather(
+    response: Response,
     lat: float = Query(..., description="latitude"),
     lon: float = Query(..., description="longitude"),
     service: WeatherService = weather_service_dependency,
 ) -> schemas.WeatherResponse:
     try:
-        return await service.get_weather(lat, lon)
+        result = await service.get_weather_result(lat, lon)
     except WeatherServiceError as exc:
         raise HTTPException(status_code=exc.status_code, detail=str(exc)) from exc
+    if result.stale:
+        response.headers[STALE_HEADER] = "true"
+    return result.payload
+
+
+@router.post("/api/weather/batch", response_model=schemas.WeatherBatchResponse)
+async def read_weather_batch(
+    payload: schemas.WeatherBatchRequest,
+    service: WeatherService = weather_service_dependency,
+) -> schemas.WeatherBatchResponse:
+    results = await service.get_weather_batch(
+        [(location.lat, location.lon) for location in payload.locations]
+    )
+    items: list[schemas.WeatherBatchItem] = []
+    # 1 地点の失敗でバッチ全体を落とさず、地点ごとにエラーを返す。
+    for location, result in zip(payload.locations, results, strict=True):
+        if isinstance(result, WeatherServiceError):
+            items.append(
+                schemas.WeatherBatchItem(lat=location.lat, lon=location.lon, error=str(result))
+            )
+        else:
+            items.append(
+                schemas.WeatherBatchItem(
+                    lat=location.lat,
+                    lon=location.lon,
+                    weather=result.payload,
+                    stale=result.stale,
+                )
+            )
+    return schemas.WeatherBatchResponse(items=items)
@@ -104,18 +104,39 @@ class RefreshResponse(BaseModel):
     state: RefreshState
 
 
+class RefreshStage(BaseModel):
+    stage: str
+    duration_ms: float
+    rows: int = 0
+    rows_per_sec: float | None = None
+    rss_start_kb: int | None = None
+    rss_end_kb: int | None = None
+
+
+class RefreshStageEvent(BaseModel):
+    run_id: int
+    seq: int
+    stage: RefreshStage
+
+
 class RefreshStatus(BaseModel):
     state: RefreshState
     started_at: str | None = None
     finished_at: str | None = None
     updated_records: int = 0
     last_error: str | None = None
+    run_id: int | None = None
+    stages: list[RefreshStage] = Field(default_factory=list)
 
 
 class RefreshStatusResponse(RefreshStatus):
     """Alias for compatibility with existing endpoints."""
 
 
+class RefreshRunsResponse(BaseModel):
+    runs: list[RefreshStatus]
+
+
 class PricePoint(BaseModel):
     week: str
     avg_price: float | None = None
@@ -162,3 +183,25 @@ class WeatherResponse(BaseModel):
     fetched_at: str = Field(alias="fetchedAt", serialization_alias="fetchedAt")
 
     model_config = ConfigDict(populate_by_name=True)
+
+
+WEATHER_BATCH_MAX_LOCATIONS = 100
+
+
+class WeatherLocation(BaseModel):
+    lat: float
+    lon: float
+
+
+class WeatherBatchRequest(BaseModel):
+    locations: list[WeatherLocation] = Field(min_length=1, max_length=WEATHER_BATCH_MAX_LOCATIONS)
+
+
+class WeatherBatchItem(WeatherLocation):
+    weather: WeatherResponse | None = None
+    stale: bool = False
+    error: str | None = None
+
+
+class WeatherBatchResponse(BaseModel):
+    items: list[WeatherBatchItem]
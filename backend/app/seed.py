@@ -11,9 +11,14 @@ from __future__ import annotations
 from .seed import (  # noqa: F401
     DEFAULT_DATA_DIR,
     SeedPayload,
+    SnapshotError,
+    install_configured_snapshot,
+    install_snapshot,
     load_seed_payload,
     seed,
+    seed_fingerprint,
     seed_from_default_db,
+    seed_if_changed,
     write_crops,
     write_growth_days,
     write_market_scopes,
@@ -25,9 +30,14 @@ from .seed import (  # noqa: F401
 __all__ = [
     "DEFAULT_DATA_DIR",
     "SeedPayload",
+    "SnapshotError",
+    "install_configured_snapshot",
+    "install_snapshot",
     "load_seed_payload",
     "seed",
+    "seed_fingerprint",
     "seed_from_default_db",
+    "seed_if_changed",
     "write_crops",
     "write_growth_days",
     "write_market_scopes",
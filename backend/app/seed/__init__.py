@@ -7,6 +7,8 @@ from pathlib import Path
 from .. import db as db_legacy
 from . import writers as _writers
 from .data_loader import DEFAULT_DATA_DIR, SeedPayload, load_seed_payload
+from .fingerprint import read_seed_fingerprint, seed_fingerprint, write_seed_fingerprint
+from .snapshot import SnapshotError, install_configured_snapshot, install_snapshot
 from .writers import (
     write_crops,
     write_growth_days,
@@ -26,9 +28,15 @@ sys.modules.setdefault("app.seed.markets_writer", markets_writer)
 __all__ = [
     "DEFAULT_DATA_DIR",
     "SeedPayload",
+    "SnapshotError",
+    "install_configured_snapshot",
+    "install_snapshot",
     "load_seed_payload",
+    "read_seed_fingerprint",
     "seed",
+    "seed_fingerprint",
     "seed_from_default_db",
+    "seed_if_changed",
     "write_crops",
     "write_growth_days",
     "write_market_scopes",
@@ -36,6 +44,7 @@ __all__ = [
     "write_price_samples",
     "write_theme_tokens",
     "write_seed_payload",
+    "write_seed_fingerprint",
     "crops_writer",
     "markets_writer",
 ]
@@ -48,6 +57,7 @@ def seed(conn: sqlite3.Connection | None = None, data_dir: Path | None = None) -
         close_conn = True
 
     db.init_db(conn)
+    fingerprint = seed_fingerprint(data_dir)
     payload = load_seed_payload(data_dir=data_dir)
     write_seed_payload(
         conn,
@@ -58,12 +68,25 @@ def seed(conn: sqlite3.Connection | None = None, data_dir: Path | None = None) -
         market_scope_categories=payload.market_scope_categories,
         theme_tokens=payload.theme_tokens,
     )
+    write_seed_fingerprint(conn, fingerprint)
     conn.commit()
 
     if close_conn:
         conn.close()
 
 
+def seed_if_changed(conn: sqlite3.Connection, data_dir: Path | None = None) -> bool:
+    """Seed only when the inputs differ from the fingerprint stored by the last seed."""
+
+    stored = read_seed_fingerprint(conn)
+    if stored is not None and stored == seed_fingerprint(data_dir):
+        # 指紋が一致していても crops が空なら手で消された DB とみなして入れ直す。
+        if conn.execute("SELECT 1 FROM crops LIMIT 1").fetchone() is not None:
+            return False
+    seed(conn, data_dir)
+    return True
+
+
 def seed_from_default_db() -> None:
     conn = db.get_conn()
     try:
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Final
+
+from .data_loader import DEFAULT_DATA_DIR
+
+__all__ = [
+    "SEED_FINGERPRINT_KEY",
+    "SEED_INPUT_FILES",
+    "read_seed_fingerprint",
+    "seed_fingerprint",
+    "write_seed_fingerprint",
+]
+
+SEED_FINGERPRINT_KEY: Final = "seed_fingerprint"
+
+SEED_INPUT_FILES: Final[tuple[str, ...]] = (
+    "crops.json",
+    "growth_days.json",
+    "price_weekly.sample.json",
+    "market_scopes.json",
+    "market_scope_categories.json",
+    "theme_tokens.json",
+)
+
+# 書き込み結果が変わる writer の変更時に上げ、同じ入力でも再投入させる。
+SEED_FORMAT_VERSION: Final = 1
+
+
+def seed_fingerprint(data_dir: Path | None = None) -> str:
+    """Hash the raw bytes of every seed input; absent optional files hash as absent."""
+
+    base_dir = data_dir or DEFAULT_DATA_DIR
+    digest = hashlib.sha256(f"seed-format:{SEED_FORMAT_VERSION}\n".encode())
+    for name in SEED_INPUT_FILES:
+        path = base_dir / name
+        try:
+            content = path.read_bytes()
+        except FileNotFoundError:
+            digest.update(f"{name}:absent\n".encode())
+            continue
+        digest.update(f"{name}:{len(content)}\n".encode())
+        digest.update(content)
+    return digest.hexdigest()
+
+
+def read_seed_fingerprint(conn: sqlite3.Connection) -> str | None:
+    try:
+        row = conn.execute(
+            "SELECT value FROM metadata WHERE key = ?", (SEED_FINGERPRINT_KEY,)
+        ).fetchone()
+    except sqlite3.OperationalError:  # init_db 前の DB
+        return None
+    return None if row is None else str(row[0])
+
+
+def write_seed_fingerprint(conn: sqlite3.Connection, fingerprint: str) -> None:
+    conn.execute(
+        "INSERT INTO metadata (key, value) VALUES (?, ?)"
+        " ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (SEED_FINGERPRINT_KEY, fingerprint),
+    )
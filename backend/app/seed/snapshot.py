@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+from pathlib import Path
+from typing import Final
+
+from ..db.schema import TABLE_DEFINITIONS
+
+__all__ = [
+    "SNAPSHOT_ENV",
+    "SnapshotError",
+    "expected_git_commit",
+    "install_configured_snapshot",
+    "install_snapshot",
+    "read_snapshot_metadata",
+    "resolve_schema_version",
+    "verify_snapshot",
+]
+
+logger = logging.getLogger(__name__)
+
+# scripts/export_seed.py が生成した seed-YYYYMMDD.db のパス。
+SNAPSHOT_ENV: Final = "PLANTING_SEED_SNAPSHOT"
+_GIT_COMMIT_ENV: Final = "PLANTING_GIT_COMMIT"
+
+
+class SnapshotError(RuntimeError):
+    """Raised when a seed snapshot cannot be used for this server build."""
+
+
+def resolve_schema_version() -> str:
+    for key in ("PLANTING_SCHEMA_VERSION", "VITE_SCHEMA_VERSION"):
+        value = os.getenv(key)
+        if value:
+            return value
+    return "unknown"
+
+
+def expected_git_commit() -> str | None:
+    value = os.getenv(_GIT_COMMIT_ENV, "").strip()
+    return value or None
+
+
+def _open_readonly(path: Path) -> sqlite3.Connection:
+    if not path.is_file():
+        raise SnapshotError(f"Seed snapshot not found: {path}")
+    return sqlite3.connect(f"file:{path.as_posix()}?mode=ro", uri=True)
+
+
+def read_snapshot_metadata(path: Path) -> dict[str, str]:
+    conn = _open_readonly(path)
+    try:
+        rows = conn.execute("SELECT key, value FROM metadata").fetchall()
+    except sqlite3.DatabaseError as exc:
+        raise SnapshotError(f"Seed snapshot has no metadata: {path}") from exc
+    finally:
+        conn.close()
+    return {str(key): str(value) for key, value in rows}
+
+
+def _table_columns(conn: sqlite3.Connection, tables: list[str]) -> dict[str, set[str]]:
+    return {
+        table: {str(row[1]) for row in conn.execute(f"PRAGMA table_info({table})")}
+        for table in tables
+    }
+
+
+def _expected_columns() -> dict[str, set[str]]:
+    conn = sqlite3.connect(":memory:")
+    try:
+        for _, sql in TABLE_DEFINITIONS:
+            conn.execute(sql)
+        return _table_columns(conn, [name for name, _ in TABLE_DEFINITIONS])
+    finally:
+        conn.close()
+
+
+def verify_snapshot(path: Path) -> dict[str, str]:
+    metadata = read_snapshot_metadata(path)
+    schema_version = resolve_schema_version()
+    if metadata.get("schema_version") != schema_version:
+        raise SnapshotError(
+            f"Seed snapshot schema_version {metadata.get('schema_version')!r}"
+            f" does not match {schema_version!r}"
+        )
+    git_commit = expected_git_commit()
+    if git_commit is not None and metadata.get("git_commit") != git_commit:
+        raise SnapshotError(
+            f"Seed snapshot git_commit {metadata.get('git_commit')!r} does not match {git_commit!r}"
+        )
+
+    # schema_version は未設定だと両側とも "unknown" で一致してしまうため、
+    # 稼働中のスキーマと表・列の集合も突き合わせる。
+    expected = _expected_columns()
+    conn = _open_readonly(path)
+    try:
+        tables = {
+            row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+        missing = [name for name in expected if name not in tables]
+        if missing:
+            raise SnapshotError(f"Seed snapshot is missing tables: {', '.join(missing)}")
+        actual = _table_columns(conn, list(expected))
+    finally:
+        conn.close()
+    mismatched = [name for name, columns in expected.items() if actual[name] != columns]
+    if mismatched:
+        raise SnapshotError(
+            f"Seed snapshot columns do not match the running schema: {', '.join(mismatched)}"
+        )
+    return metadata
+
+
+def _has_seed_data(conn: sqlite3.Connection) -> bool:
+    try:
+        return conn.execute("SELECT 1 FROM crops LIMIT 1").fetchone() is not None
+    except sqlite3.OperationalError:
+        return False
+
+
+def install_snapshot(conn: sqlite3.Connection, path: Path) -> bool:
+    """Copy a verified snapshot into an empty database using the sqlite backup API."""
+
+    # 稼働中のデータ (etl_runs や更新済み価格) を上書きしないよう、空の DB にだけ入れる。
+    if _has_seed_data(conn):
+        return False
+    metadata = verify_snapshot(path)
+    conn.commit()
+    source = _open_readonly(path)
+    try:
+        source.backup(conn)
+    finally:
+        source.close()
+    logger.info(
+        "Installed seed snapshot %s (schema_version=%s, git_commit=%s)",
+        path,
+        metadata.get("schema_version"),
+        metadata.get("git_commit"),
+    )
+    return True
+
+
+def install_configured_snapshot(conn: sqlite3.Connection) -> bool:
+    raw_path = os.getenv(SNAPSHOT_ENV, "").strip()
+    if not raw_path:
+        return False
+    try:
+        return install_snapshot(conn, Path(raw_path))
+    except SnapshotError as exc:
+        logger.warning("Ignoring seed snapshot; falling back to JSON seed: %s", exc)
+        return False
@@ -6,67 +6,84 @@ from typing import Any
 
 from . import _crops_common as common
 
+# 別 id が同じ name を持つ場合は従来の INSERT OR IGNORE と同じく黙って残す。
+_CROPS_UPSERT_SQL = """
+INSERT INTO crops (id, name, category) VALUES (?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    name = excluded.name,
+    category = excluded.category
+ON CONFLICT DO NOTHING
+""".strip()
+
+_PRICE_WEEKLY_UPSERT_SQL = """
+INSERT INTO price_weekly (
+    crop_id, week, avg_price, stddev, unit, source
+) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(crop_id, week) DO UPDATE SET
+    avg_price = excluded.avg_price,
+    stddev = excluded.stddev,
+    unit = excluded.unit,
+    source = excluded.source
+""".strip()
+
+_MARKET_PRICES_UPSERT_SQL = """
+INSERT INTO market_prices (
+    crop_id, scope, week, avg_price, stddev, unit, source
+) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(crop_id, scope, week) DO UPDATE SET
+    avg_price = excluded.avg_price,
+    stddev = excluded.stddev,
+    unit = excluded.unit,
+    source = excluded.source
+""".strip()
+
+PriceRow = tuple[int, str, float | None, float | None, str, str]
+MarketPriceRow = tuple[int, str, str, float | None, float | None, str, str]
+
+
+def _price_row(crop_id: int, price: Mapping[str, Any]) -> PriceRow:
+    return (
+        crop_id,
+        common.normalize_week_value(price["week"]),
+        common.optional_float(price.get("price")),
+        common.optional_float(price.get("stddev")),
+        price.get("unit", "円/kg"),
+        price.get("source", "seed"),
+    )
+
+
+def _market_price_row(crop_id: int, price: Mapping[str, Any]) -> MarketPriceRow:
+    normalized_unit, factor = common.convert_unit(str(price.get("unit", "円/kg")))
+    avg_value = common.optional_float(price.get("avg_price", price.get("price")))
+    stddev_value = common.optional_float(price.get("stddev"))
+    return (
+        crop_id,
+        str(price["scope"]),
+        common.normalize_week_value(price["week"]),
+        None if avg_value is None else avg_value * factor,
+        None if stddev_value is None else stddev_value * factor,
+        normalized_unit,
+        price.get("source", "seed"),
+    )
+
 
 def write_crops(conn: sqlite3.Connection, crops: Iterable[Mapping[str, Any]]) -> None:
     crops_list = list(crops)
-    for crop in crops_list:
-        crop_id = int(crop["id"])
-        name = crop["name"]
-        category = common.normalize_crop_category(crop["category"])
-        conn.execute(
-            "INSERT OR IGNORE INTO crops (id, name, category) VALUES (?, ?, ?)",
-            (crop_id, name, category),
-        )
-        conn.execute(
-            "UPDATE crops SET name = ?, category = ? WHERE id = ?",
-            (name, category, crop_id),
-        )
-
-    for crop_id, price in common.iter_price_records(crops_list):
-        week_iso = common.normalize_week_value(price["week"])
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO price_weekly (
-                crop_id, week, avg_price, stddev, unit, source
-            ) VALUES (?, ?, ?, ?, ?, ?)
-            """.strip(),
-            (
-                crop_id,
-                week_iso,
-                common.optional_float(price.get("price")),
-                common.optional_float(price.get("stddev")),
-                price.get("unit", "円/kg"),
-                price.get("source", "seed"),
-            ),
-        )
+    crop_rows = [
+        (int(crop["id"]), crop["name"], common.normalize_crop_category(crop["category"]))
+        for crop in crops_list
+    ]
+    price_rows = [
+        _price_row(crop_id, price) for crop_id, price in common.iter_price_records(crops_list)
+    ]
+    market_rows = [
+        _market_price_row(crop_id, price)
+        for crop_id, price in common.iter_market_price_records(crops_list)
+    ]
 
-    for crop_id, price in common.iter_market_price_records(crops_list):
-        scope = str(price["scope"])
-        week_iso = common.normalize_week_value(price["week"])
-        normalized_unit, factor = common.convert_unit(str(price.get("unit", "円/kg")))
-        avg_price = price.get("avg_price", price.get("price"))
-        avg_value = common.optional_float(avg_price)
-        if avg_value is not None:
-            avg_value *= factor
-        stddev_value = common.optional_float(price.get("stddev"))
-        if stddev_value is not None:
-            stddev_value *= factor
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO market_prices (
-                crop_id, scope, week, avg_price, stddev, unit, source
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            """.strip(),
-            (
-                crop_id,
-                scope,
-                week_iso,
-                avg_value,
-                stddev_value,
-                normalized_unit,
-                price.get("source", "seed"),
-            ),
-        )
+    conn.executemany(_CROPS_UPSERT_SQL, crop_rows)
+    conn.executemany(_PRICE_WEEKLY_UPSERT_SQL, price_rows)
+    conn.executemany(_MARKET_PRICES_UPSERT_SQL, market_rows)
 
 
 __all__ = ["write_crops"]
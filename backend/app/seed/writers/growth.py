@@ -27,21 +27,24 @@ def _coerce_str(value: object, *, field: str) -> str:
     raise TypeError(f"{field} must be a string, got {type(value).__name__}")
 
 
+_GROWTH_DAYS_UPSERT_SQL = """
+INSERT INTO growth_days (crop_id, region, days) VALUES (?, ?, ?)
+ON CONFLICT(crop_id, region) DO UPDATE SET days = excluded.days
+""".strip()
+
+
 def write_growth_days(
     conn: sqlite3.Connection, growth_days: Iterable[Mapping[str, object]]
 ) -> None:
-    for entry in growth_days:
-        crop_id = _coerce_int(entry["crop_id"], field="crop_id")
-        region = _coerce_str(entry["region"], field="region")
-        days = _coerce_int(entry["days"], field="days")
-        conn.execute(
-            "INSERT OR IGNORE INTO growth_days (crop_id, region, days) VALUES (?, ?, ?)",
-            (crop_id, region, days),
-        )
-        conn.execute(
-            "UPDATE growth_days SET days = ? WHERE crop_id = ? AND region = ?",
-            (days, crop_id, region),
+    rows = [
+        (
+            _coerce_int(entry["crop_id"], field="crop_id"),
+            _coerce_str(entry["region"], field="region"),
+            _coerce_int(entry["days"], field="days"),
         )
+        for entry in growth_days
+    ]
+    conn.executemany(_GROWTH_DAYS_UPSERT_SQL, rows)
 
 
 __all__ = ["write_growth_days"]
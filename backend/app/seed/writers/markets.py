@@ -6,84 +6,103 @@ from typing import Any
 
 from . import _crops_common as common
 
+_MARKET_SCOPES_UPSERT_SQL = """
+INSERT INTO market_scopes (
+    scope, display_name, timezone, priority, theme_token
+) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(scope) DO UPDATE SET
+    display_name = excluded.display_name,
+    timezone = excluded.timezone,
+    priority = excluded.priority,
+    theme_token = excluded.theme_token
+""".strip()
+
+_MARKET_SCOPE_CATEGORIES_UPSERT_SQL = """
+INSERT INTO market_scope_categories (
+    scope, category, display_name, priority, source
+) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(scope, category) DO UPDATE SET
+    display_name = excluded.display_name,
+    priority = excluded.priority,
+    source = excluded.source
+""".strip()
+
+# サンプル価格は crops.json 由来の実データを上書きしない。
+_PRICE_SAMPLES_INSERT_SQL = """
+INSERT INTO price_weekly (
+    crop_id, week, avg_price, stddev, unit, source
+) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(crop_id, week) DO NOTHING
+""".strip()
+
+_THEME_TOKENS_UPSERT_SQL = """
+INSERT INTO theme_tokens (token, hex_color, text_color)
+VALUES (?, ?, ?)
+ON CONFLICT(token) DO UPDATE SET
+    hex_color = excluded.hex_color,
+    text_color = excluded.text_color
+""".strip()
+
 
 def write_market_scopes(
     conn: sqlite3.Connection, market_scopes: Iterable[Mapping[str, Any]]
 ) -> None:
-    for scope in market_scopes:
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO market_scopes (
-                scope, display_name, timezone, priority, theme_token
-            ) VALUES (?, ?, ?, ?, ?)
-            """.strip(),
-            (
-                scope["scope"],
-                scope["display_name"],
-                scope.get("timezone", "Asia/Tokyo"),
-                int(scope.get("priority", 100)),
-                scope["theme_token"],
-            ),
+    rows = [
+        (
+            scope["scope"],
+            scope["display_name"],
+            scope.get("timezone", "Asia/Tokyo"),
+            int(scope.get("priority", 100)),
+            scope["theme_token"],
         )
+        for scope in market_scopes
+    ]
+    conn.executemany(_MARKET_SCOPES_UPSERT_SQL, rows)
 
 
 def write_market_scope_categories(
     conn: sqlite3.Connection, categories: Iterable[Mapping[str, Any]]
 ) -> None:
-    for category in categories:
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO market_scope_categories (
-                scope, category, display_name, priority, source
-            ) VALUES (?, ?, ?, ?, ?)
-            """.strip(),
-            (
-                category["scope"],
-                category["category"],
-                category.get("display_name", category["category"]),
-                int(category.get("priority", 100)),
-                category.get("source", "seed"),
-            ),
+    rows = [
+        (
+            category["scope"],
+            category["category"],
+            category.get("display_name", category["category"]),
+            int(category.get("priority", 100)),
+            category.get("source", "seed"),
         )
+        for category in categories
+    ]
+    conn.executemany(_MARKET_SCOPE_CATEGORIES_UPSERT_SQL, rows)
 
 
 def write_price_samples(
     conn: sqlite3.Connection, price_samples: Iterable[Mapping[str, Any]]
 ) -> None:
-    for row in price_samples:
-        conn.execute(
-            """
-            INSERT OR IGNORE INTO price_weekly (
-                crop_id, week, avg_price, stddev, unit, source
-            ) VALUES (?, ?, ?, ?, ?, ?)
-            """.strip(),
-            (
-                int(row["crop_id"]),
-                str(row["week"]),
-                common.optional_float(row.get("avg_price")),
-                common.optional_float(row.get("stddev")),
-                row.get("unit", "円/kg"),
-                row.get("source", "seed"),
-            ),
+    rows = [
+        (
+            int(row["crop_id"]),
+            str(row["week"]),
+            common.optional_float(row.get("avg_price")),
+            common.optional_float(row.get("stddev")),
+            row.get("unit", "円/kg"),
+            row.get("source", "seed"),
         )
+        for row in price_samples
+    ]
+    conn.executemany(_PRICE_SAMPLES_INSERT_SQL, rows)
 
 
 def write_theme_tokens(conn: sqlite3.Connection, theme_tokens: Iterable[Mapping[str, Any]]) -> None:
-    for token in theme_tokens:
-        conn.execute(
-            """
-            INSERT INTO theme_tokens (token, hex_color, text_color)
-            VALUES (?, ?, ?)
-            ON CONFLICT(token) DO UPDATE SET
-                hex_color = excluded.hex_color,
-                text_color = excluded.text_color
-            """.strip(),
-            (
-                token["token"],
-                token["hex_color"],
-                token.get("text_color", "#000000"),
-            ),
+    rows = [
+        (
+            token["token"],
+            token["hex_color"],
+            token.get("text_color", "#000000"),
         )
+        for token in theme_tokens
+    ]
+    conn.executemany(_THEME_TOKENS_UPSERT_SQL, rows)
 
 
 __all__ = [
@@ -6,6 +6,9 @@ import sqlite3
 from fastapi import BackgroundTasks, HTTPException, status
 
 from .. import etl_runner, schemas
+from ..etl_runner import coalesce, control, jobs
+from ..etl_runner import status as run_status
+from ..etl_runner.context import CANCELLED_MESSAGE
 from .weather import WeatherAdapter, WeatherService, WeatherServiceError
 
 logger: logging.Logger = logging.getLogger(__name__)
@@ -14,6 +17,9 @@ logger: logging.Logger = logging.getLogger(__name__)
 def start_refresh(
     background_tasks: BackgroundTasks,
     payload: schemas.RefreshTriggerPayload | None = None,
+    *,
+    conn: sqlite3.Connection | None = None,
+    idempotency_key: str | None = None,
 ) -> schemas.RefreshResponse:
     if payload and payload.get("force"):
         raise HTTPException(
@@ -21,12 +27,28 @@ def start_refresh(
             detail="force refresh is not supported",
         )
 
-    background_tasks.add_task(etl_runner.start_etl_job)
+    if conn is None:
+        background_tasks.add_task(etl_runner.start_etl_job)
+        return schemas.RefreshResponse(state=etl_runner.STATE_RUNNING)
+
+    claim = coalesce.claim_refresh(conn, idempotency_key=idempotency_key)
+    if not claim.created:
+        logger.info(
+            "refresh joined in-flight run",
+            extra={"run_id": claim.run_id, "idempotency_key": idempotency_key},
+        )
+    elif jobs.resolve_executor() == "process":
+        # API プロセスのスレッドプールを使わず、ワーカープロセスへキュー経由で渡す。
+        jobs.enqueue_job(conn, claim.run_id)
+    else:
+        background_tasks.add_task(etl_runner.start_etl_job, run_id=claim.run_id)
     return schemas.RefreshResponse(state=etl_runner.STATE_RUNNING)
 
 
-def refresh_status(conn: sqlite3.Connection) -> schemas.RefreshStatusResponse:
-    status_obj = etl_runner.get_last_status(conn)
+def refresh_status(
+    conn: sqlite3.Connection, *, cached: bool = True
+) -> schemas.RefreshStatusResponse:
+    status_obj = etl_runner.get_last_status(conn, cached=cached)
     payload = status_obj.model_dump() if hasattr(status_obj, "model_dump") else status_obj.dict()
     response = schemas.RefreshStatusResponse(**payload)
     if response.state == etl_runner.STATE_SUCCESS:
@@ -37,6 +59,26 @@ def refresh_status(conn: sqlite3.Connection) -> schemas.RefreshStatusResponse:
     return response
 
 
+def refresh_runs(conn: sqlite3.Connection, *, limit: int) -> schemas.RefreshRunsResponse:
+    return schemas.RefreshRunsResponse(runs=run_status.list_runs(conn, limit=limit))
+
+
+def cancel_refresh(conn: sqlite3.Connection, run_id: int) -> schemas.RefreshStatus:
+    run = control.cancel_run(conn, run_id)
+    if run is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"ETL run {run_id} not found",
+        )
+    if run.state != etl_runner.STATE_RUNNING and run.last_error != CANCELLED_MESSAGE:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"ETL run {run_id} is not running",
+        )
+    logger.info("refresh cancel requested", extra={"run_id": run_id})
+    return run
+
+
 def log_telemetry_event(event: schemas.TelemetryEvent) -> None:
     logger.info(
         "telemetry event received",
@@ -50,5 +92,7 @@ __all__ = [
     "WeatherServiceError",
     "start_refresh",
     "refresh_status",
+    "refresh_runs",
+    "cancel_refresh",
     "log_telemetry_event",
 ]
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import asyncio
 import importlib
+import importlib.util
 import inspect
-from collections.abc import Callable, Mapping
-from contextlib import suppress
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections.abc import Callable, Coroutine, Iterator, Mapping, Sequence
+from contextlib import contextmanager, suppress
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from functools import partial
 from http import HTTPStatus
-from threading import Lock
 from typing import Any, Protocol, cast
 
 import httpx
@@ -16,22 +22,94 @@ from pydantic import ValidationError
 
 from .. import schemas
 from ..compat import UTC
+from .weather_cache import (
+    DEFAULT_MAX_BYTES,
+    DEFAULT_MAX_ENTRIES,
+    CacheEntry,
+    CacheKey,
+    WeatherCache,
+    WeatherCacheStats,
+)
+from .weather_store import WeatherStore
+
+logger = logging.getLogger(__name__)
 
-CacheKey = str
 OPEN_METEO_FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
 OPEN_METEO_FORECAST_DAYS = 2
+# 2 日分の日次予報は数 km 程度では変わらないため、0.1 度 (約 10km) の格子に寄せる。
+DEFAULT_GRID_DEGREES = 0.1
+_GRID_ENV = "PLANTING_WEATHER_GRID_DEGREES"
+# 複数地点リクエスト 1 本あたりの地点数。URL が長くなりすぎない範囲に抑える。
+MULTI_LOCATION_CHUNK_SIZE = 50
+DEFAULT_BATCH_CONCURRENCY = 4
+DEFAULT_STORE_FLUSH_INTERVAL = 5.0
+# 遅延の標本が揃うまでのヘッジ待ち時間と、p95 が極端に小さいときの下限。
+DEFAULT_HEDGE_DELAY = 1.0
+MIN_HEDGE_DELAY = 0.01
+HEDGE_PERCENTILE = 95.0
+
+
+def _resolve_grid_degrees() -> float:
+    raw = os.getenv(_GRID_ENV)
+    if raw is None or not raw.strip():
+        return DEFAULT_GRID_DEGREES
+    try:
+        value = float(raw)
+    except ValueError:
+        return DEFAULT_GRID_DEGREES
+    return max(value, 0.0)
+
+
+def quantize_coordinates(lat: float, lon: float, grid_degrees: float) -> tuple[float, float]:
+    """Snap a coordinate to the nearest grid point; a non-positive grid keeps it as is."""
+
+    if grid_degrees <= 0:
+        return lat, lon
+    return (
+        round(round(lat / grid_degrees) * grid_degrees, 6),
+        round(round(lon / grid_degrees) * grid_degrees, 6),
+    )
 
 
 class AdapterRegistry(Protocol):
     def get(self, name: str) -> Any:  # pragma: no cover - protocol definition
         ...
 
+    def as_mapping(self) -> Mapping[str, Any]:  # pragma: no cover - protocol definition
+        ...
+
+    def allow_request(self, name: str) -> bool:  # pragma: no cover - protocol definition
+        ...
+
+    def record_success(
+        self, name: str, latency: float
+    ) -> None:  # pragma: no cover - protocol definition
+        ...
+
+    def record_failure(self, name: str) -> None:  # pragma: no cover - protocol definition
+        ...
+
+    def release(self, name: str) -> None:  # pragma: no cover - protocol definition
+        ...
+
+    def latency_percentile(
+        self, name: str, percentile: float
+    ) -> float | None:  # pragma: no cover - protocol definition
+        ...
+
 
 class WeatherAdapter(Protocol):
     def get_daily(self, lat: float, lon: float) -> Any:  # pragma: no cover - protocol definition
         ...
 
 
+class MultiLocationWeatherAdapter(WeatherAdapter, Protocol):
+    def get_daily_many(
+        self, locations: Sequence[tuple[float, float]]
+    ) -> Any:  # pragma: no cover - protocol definition
+        ...
+
+
 def _load_adapter_registry() -> AdapterRegistry | None:
     with suppress(ModuleNotFoundError):  # pragma: no cover - optional dependency
         module = importlib.import_module("adapter")
@@ -42,10 +120,157 @@ def _load_adapter_registry() -> AdapterRegistry | None:
 adapter_registry = _load_adapter_registry()
 
 
-@dataclass
-class CacheEntry:
+@dataclass(frozen=True)
+class WeatherClientConfig:
+    timeout: float = 10.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+
+    @classmethod
+    def from_env(cls) -> WeatherClientConfig:
+        defaults = cls()
+        try:
+            return cls(
+                timeout=float(os.getenv("PLANTING_WEATHER_TIMEOUT", defaults.timeout)),
+                max_connections=int(
+                    os.getenv("PLANTING_WEATHER_MAX_CONNECTIONS", defaults.max_connections)
+                ),
+                max_keepalive_connections=int(
+                    os.getenv("PLANTING_WEATHER_MAX_KEEPALIVE", defaults.max_keepalive_connections)
+                ),
+                keepalive_expiry=float(
+                    os.getenv("PLANTING_WEATHER_KEEPALIVE_EXPIRY", defaults.keepalive_expiry)
+                ),
+                http2=os.getenv("PLANTING_WEATHER_HTTP2", "").strip().lower()
+                in {"1", "true", "yes"},
+            )
+        except ValueError as exc:
+            raise ValueError(f"Invalid weather client settings: {exc}") from exc
+
+
+def create_weather_client(config: WeatherClientConfig | None = None) -> httpx.AsyncClient:
+    config = config or WeatherClientConfig.from_env()
+    # HTTP/2 は任意依存の h2 が入っている場合だけ有効にする。
+    http2 = config.http2 and importlib.util.find_spec("h2") is not None
+    if config.http2 and not http2:
+        logger.warning("PLANTING_WEATHER_HTTP2 is set but h2 is not installed; using HTTP/1.1")
+    return httpx.AsyncClient(
+        timeout=config.timeout,
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        ),
+        http2=http2,
+    )
+
+
+@dataclass(frozen=True)
+class WeatherFanOutConfig:
+    enabled: bool = False
+    # None なら登録プロバイダの過半数。
+    quorum: int | None = None
+    provider_timeout: float = 5.0
+
+    @classmethod
+    def from_env(cls) -> WeatherFanOutConfig:
+        defaults = cls()
+        quorum = os.getenv("PLANTING_WEATHER_QUORUM", "").strip()
+        try:
+            return cls(
+                enabled=os.getenv("PLANTING_WEATHER_FANOUT", "").strip().lower()
+                in {"1", "true", "yes"},
+                quorum=int(quorum) if quorum else defaults.quorum,
+                provider_timeout=float(
+                    os.getenv("PLANTING_WEATHER_PROVIDER_TIMEOUT", defaults.provider_timeout)
+                ),
+            )
+        except ValueError as exc:
+            raise ValueError(f"Invalid weather fan-out settings: {exc}") from exc
+
+
+def weather_provider_specs(registry: AdapterRegistry) -> list[Any]:
+    """Registered weather providers: the ``weather`` spec first, then specs tagged ``kind=weather``."""
+
+    specs = [
+        spec
+        for name, spec in registry.as_mapping().items()
+        if name == "weather" or (spec.metadata or {}).get("kind") == "weather"
+    ]
+    return sorted(specs, key=lambda spec: (spec.name != "weather", spec.name))
+
+
+class _Forecast(Mapping[str, Any]):
+    """Read-only view of a provider payload that hashes and compares by forecast content.
+
+    ``fetchedAt`` differs per provider, so it is left out of the identity. This lets
+    ``MajorityVoteStrategy()`` vote on fan-out answers without an explicit ``key=``.
+    """
+
+    __slots__ = ("payload", "_identity")
+
+    def __init__(self, payload: Mapping[str, Any]) -> None:
+        self.payload = payload
+        self._identity = json.dumps(
+            {name: value for name, value in payload.items() if name != "fetchedAt"},
+            sort_keys=True,
+            default=str,
+        )
+
+    def __getitem__(self, name: str) -> Any:
+        return self.payload[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.payload)
+
+    def __len__(self) -> int:
+        return len(self.payload)
+
+    def __hash__(self) -> int:
+        return hash(self._identity)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, _Forecast):
+            return self._identity == other._identity
+        return NotImplemented
+
+
+async def _call_adapter(
+    adapter: WeatherAdapter, lat: float, lon: float, timeout: float
+) -> Mapping[str, Any]:
+    async def invoke() -> Any:
+        result = adapter.get_daily(lat, lon)
+        return await result if inspect.isawaitable(result) else result
+
+    try:
+        result = await asyncio.wait_for(invoke(), timeout)
+    except TimeoutError as exc:
+        raise WeatherServiceError(
+            "weather provider timed out",
+            status_code=HTTPStatus.GATEWAY_TIMEOUT,
+        ) from exc
+    except WeatherServiceError:
+        raise
+    except Exception as exc:
+        raise WeatherServiceError(
+            "weather adapter request failed",
+            status_code=HTTPStatus.BAD_GATEWAY,
+        ) from exc
+    if not isinstance(result, Mapping):
+        raise WeatherServiceError(
+            "weather adapter returned unexpected payload",
+            status_code=HTTPStatus.BAD_GATEWAY,
+        )
+    return result
+
+
+@dataclass(frozen=True)
+class WeatherResult:
     payload: schemas.WeatherResponse
-    cached_at: datetime
+    # ソフト TTL 超過や上流障害で、更新できていない古い予報を返した場合に True。
+    stale: bool = False
 
 
 class WeatherServiceError(RuntimeError):
@@ -70,9 +295,34 @@ class OpenMeteoWeatherAdapter:
 
     async def get_daily(self, lat: float, lon: float) -> dict[str, Any]:
         payload = await self._request(lat, lon)
+        if not isinstance(payload, Mapping):
+            raise WeatherServiceError(
+                "weather provider returned unexpected payload",
+                status_code=HTTPStatus.BAD_GATEWAY,
+            )
         return self._normalize_payload(payload)
 
-    async def _request(self, lat: float, lon: float) -> Mapping[str, Any]:
+    async def get_daily_many(
+        self, locations: Sequence[tuple[float, float]]
+    ) -> list[dict[str, Any]]:
+        # Open-Meteo はカンマ区切りの座標を受け付け、2 地点以上なら地点順の配列で返す。
+        payload = await self._request(
+            ",".join(str(lat) for lat, _ in locations),
+            ",".join(str(lon) for _, lon in locations),
+        )
+        items = [payload] if isinstance(payload, Mapping) else payload
+        if (
+            not isinstance(items, list)
+            or len(items) != len(locations)
+            or not all(isinstance(item, Mapping) for item in items)
+        ):
+            raise WeatherServiceError(
+                "weather provider returned unexpected payload",
+                status_code=HTTPStatus.BAD_GATEWAY,
+            )
+        return [self._normalize_payload(item) for item in items]
+
+    async def _request(self, lat: float | str, lon: float | str) -> Any:
         params = {
             "latitude": lat,
             "longitude": lon,
@@ -109,7 +359,7 @@ class OpenMeteoWeatherAdapter:
                 status_code=HTTPStatus.BAD_GATEWAY,
             ) from exc
 
-        if not isinstance(payload, Mapping):
+        if not isinstance(payload, Mapping | list):
             raise WeatherServiceError(
                 "weather provider returned unexpected payload",
                 status_code=HTTPStatus.BAD_GATEWAY,
@@ -171,48 +421,469 @@ class OpenMeteoWeatherAdapter:
         return {"daily": normalized_daily, "fetchedAt": fetched_at}
 
 
+class FanOutWeatherAdapter:
+    """Query several providers concurrently and aggregate the first ``quorum`` answers."""
+
+    def __init__(
+        self,
+        providers: Mapping[str, WeatherAdapter],
+        *,
+        quorum: int | None = None,
+        provider_timeout: float = 5.0,
+        aggregation_strategy: Callable[[Sequence[Mapping[str, Any]]], Any] | None = None,
+    ) -> None:
+        if not providers:
+            raise ValueError("at least one weather provider is required")
+        self._providers = dict(providers)
+        majority = len(self._providers) // 2 + 1
+        self._quorum = min(max(quorum or majority, 1), len(self._providers))
+        self._provider_timeout = provider_timeout
+        self._aggregation_strategy = aggregation_strategy
+
+    @classmethod
+    def from_specs(cls, specs: Sequence[Any], config: WeatherFanOutConfig) -> FanOutWeatherAdapter:
+        # 集約方法は ``weather`` の spec を優先し、無ければ名前順で最初に定義したものを使う。
+        strategy = next(
+            (spec.aggregation_strategy for spec in specs if spec.aggregation_strategy), None
+        )
+        return cls(
+            {spec.name: spec.factory() for spec in specs},
+            quorum=config.quorum,
+            provider_timeout=config.provider_timeout,
+            aggregation_strategy=strategy,
+        )
+
+    async def get_daily(self, lat: float, lon: float) -> Mapping[str, Any]:
+        tasks = {
+            asyncio.create_task(_call_adapter(adapter, lat, lon, self._provider_timeout)): name
+            for name, adapter in self._providers.items()
+        }
+        answers: dict[str, Mapping[str, Any]] = {}
+        pending = set(tasks)
+        try:
+            # 定足数に達した時点で返し、遅いプロバイダは待たずに打ち切る。
+            while pending and len(answers) < self._quorum:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        answers[tasks[task]] = task.result()
+                    else:
+                        logger.warning("weather provider %s failed: %s", tasks[task], error)
+                if len(answers) + len(pending) < self._quorum:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if len(answers) < self._quorum:
+            raise WeatherServiceError(
+                "weather providers did not reach quorum",
+                status_code=HTTPStatus.BAD_GATEWAY,
+            )
+        responses = [answers[name] for name in self._providers if name in answers]
+        if self._aggregation_strategy is None:
+            return responses[0]
+        try:
+            result = self._aggregation_strategy([_Forecast(answer) for answer in responses])
+        except Exception as exc:
+            raise WeatherServiceError(
+                "weather provider responses could not be aggregated",
+                status_code=HTTPStatus.BAD_GATEWAY,
+            ) from exc
+        return result.payload if isinstance(result, _Forecast) else cast(Mapping[str, Any], result)
+
+
+class HedgedWeatherAdapter:
+    """Call providers in order, hedging to the next one after the primary's p95 latency.
+
+    Outcomes feed the registry's latency window and circuit breaker; providers whose
+    circuit is open are skipped until the registry lets a half-open probe through.
+    """
+
+    def __init__(
+        self,
+        providers: Mapping[str, WeatherAdapter],
+        health: AdapterRegistry,
+        *,
+        provider_timeout: float = 5.0,
+        default_delay: float = DEFAULT_HEDGE_DELAY,
+    ) -> None:
+        if not providers:
+            raise ValueError("at least one weather provider is required")
+        self._providers = dict(providers)
+        self._health = health
+        self._provider_timeout = provider_timeout
+        self._default_delay = default_delay
+
+    @classmethod
+    def from_specs(
+        cls, specs: Sequence[Any], health: AdapterRegistry, config: WeatherFanOutConfig
+    ) -> HedgedWeatherAdapter:
+        return cls(
+            {spec.name: spec.factory() for spec in specs},
+            health,
+            provider_timeout=config.provider_timeout,
+        )
+
+    async def get_daily(self, lat: float, lon: float) -> Mapping[str, Any]:
+        candidates = iter(self._providers)
+        running: dict[asyncio.Task[Mapping[str, Any]], str] = {}
+        last_error: WeatherServiceError | None = None
+        latest: str | None = None
+
+        def launch() -> bool:
+            nonlocal latest
+            for name in candidates:
+                if self._health.allow_request(name):
+                    task = asyncio.create_task(self._call(name, lat, lon))
+                    running[task] = latest = name
+                    return True
+            return False
+
+        exhausted = not launch()
+        try:
+            while running:
+                delay = None if exhausted or latest is None else self._hedge_delay(latest)
+                done, _ = await asyncio.wait(
+                    running, timeout=delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # 先行リクエストが p95 を超えても返らないので、次のプロバイダにも投げる。
+                    exhausted = not launch()
+                    continue
+                # 同時に終わった呼び出しはすべて running から外して例外も回収してから返す。
+                # 先に返すと、終わった呼び出しまで finally で release されてしまう。
+                result: Mapping[str, Any] | None = None
+                for task in [task for task in running if task in done]:
+                    del running[task]
+                    error = task.exception()
+                    if error is not None:
+                        last_error = cast(WeatherServiceError, error)
+                    elif result is None:
+                        result = task.result()
+                if result is not None:
+                    return result
+                if not running:
+                    exhausted = not launch()
+        finally:
+            for task, name in running.items():
+                task.cancel()
+                # 打ち切った呼び出しは成否に数えず、半開状態の試行枠だけ返す。
+                self._health.release(name)
+
+        if last_error is not None:
+            raise last_error
+        raise WeatherServiceError(
+            "no weather provider is available",
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+        )
+
+    def _hedge_delay(self, name: str) -> float:
+        p95 = self._health.latency_percentile(name, HEDGE_PERCENTILE)
+        return self._default_delay if p95 is None else max(p95, MIN_HEDGE_DELAY)
+
+    async def _call(self, name: str, lat: float, lon: float) -> Mapping[str, Any]:
+        started = time.perf_counter()
+        try:
+            result = await _call_adapter(self._providers[name], lat, lon, self._provider_timeout)
+        except WeatherServiceError:
+            self._health.record_failure(name)
+            raise
+        self._health.record_success(name, time.perf_counter() - started)
+        return result
+
+
 class WeatherService:
     def __init__(
         self,
         *,
         adapter_factory: Callable[[], WeatherAdapter] | None = None,
         cache_ttl: timedelta | None = None,
+        cache_hard_ttl: timedelta | None = None,
+        cache_max_stale: timedelta | None = None,
         clock: Callable[[], datetime] | None = None,
+        cache_max_entries: int = DEFAULT_MAX_ENTRIES,
+        cache_max_bytes: int = DEFAULT_MAX_BYTES,
+        grid_degrees: float | None = None,
+        store: WeatherStore | None = None,
+        batch_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        fanout: WeatherFanOutConfig | None = None,
+        store_flush_interval: float = DEFAULT_STORE_FLUSH_INTERVAL,
     ) -> None:
         self._adapter_factory = adapter_factory
+        self._grid_degrees = _resolve_grid_degrees() if grid_degrees is None else grid_degrees
+        # ソフト TTL までは新鮮、ハード TTL までは古い値を即返して裏で更新、それ以降は
+        # 同期で取り直す。上流が失敗したときは max_stale まで古い値で応答する。
         self._cache_ttl = cache_ttl or timedelta(hours=24)
+        self._cache_hard_ttl = max(cache_hard_ttl or self._cache_ttl * 2, self._cache_ttl)
+        self._cache_max_stale = max(cache_max_stale or timedelta(days=7), self._cache_hard_ttl)
         self._clock = clock or partial(datetime.now, UTC)
-        self._cache: dict[CacheKey, CacheEntry] = {}
-        self._lock = Lock()
+        self._cache = WeatherCache(
+            ttl=self._cache_max_stale, max_entries=cache_max_entries, max_bytes=cache_max_bytes
+        )
+        # キャッシュと取得中タスクはイベントループ上でだけ触り、参照から更新までの間に
+        # await を挟まない。単一スレッドで順に実行されるためロックは要らない。
+        self._inflight: dict[CacheKey, asyncio.Task[schemas.WeatherResponse]] = {}
         self._adapter: WeatherAdapter | None = None
+        # 単一プロバイダのときもレジストリのサーキットブレーカーを通すための名前。
+        self._circuit_name: str | None = None
+        self._http_client: httpx.AsyncClient | None = None
+        self._store = store
+        self._store_flush_interval = store_flush_interval
+        self._flush_task: asyncio.Task[None] | None = None
+        self._warm_limit = cache_max_entries
+        self._batch_concurrency = max(1, batch_concurrency)
+        self._fanout = fanout or WeatherFanOutConfig.from_env()
+
+    async def start(self, config: WeatherClientConfig | None = None) -> None:
+        """Open the shared HTTP client, warm the cache and start flushing the store."""
+
+        if self._store is not None:
+            await self._warm_from_store()
+            if self._flush_task is None:
+                self._flush_task = asyncio.create_task(
+                    self._flush_periodically(), name="weather-store-flush"
+                )
+        if self._http_client is None:
+            self._http_client = create_weather_client(config)
+            if self._adapter_factory is None:
+                # 共有クライアントを使うよう、既定アダプタを作り直させる。
+                self._adapter = None
+
+    async def aclose(self) -> None:
+        task, self._flush_task = self._flush_task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        if self._store is not None:
+            await self._flush_store(self._clock())
+        client, self._http_client = self._http_client, None
+        if client is None:
+            return
+        if self._adapter_factory is None:
+            self._adapter = None
+        await client.aclose()
 
     async def get_weather(self, lat: float, lon: float) -> schemas.WeatherResponse:
+        return (await self.get_weather_result(lat, lon)).payload
+
+    async def get_weather_result(self, lat: float, lon: float) -> WeatherResult:
+        # キャッシュキーと上流リクエストの両方を格子点に揃え、同じセルの利用者で共有する。
+        lat, lon = quantize_coordinates(lat, lon, self._grid_degrees)
         key = self._build_cache_key(lat, lon)
         now = self._clock()
-        with self._lock:
-            cached = self._cache.get(key)
-            if cached and now - cached.cached_at < self._cache_ttl:
-                return cached.payload
+        cached = self._cache.get(key, now)
+        if cached is not None and now - cached.cached_at < self._cache_ttl:
+            if self._store is not None:
+                self._store.touch(key, now)
+            return WeatherResult(cached.payload)
+        # 同じキーの取得中タスクがあれば相乗りし、上流への同時アクセスを 1 本にまとめる。
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, lat, lon, now))
+            self._track(key, task)
+        return await self._settle(cached, task, now)
+
+    async def get_weather_batch(
+        self, locations: Sequence[tuple[float, float]]
+    ) -> list[WeatherResult | WeatherServiceError]:
+        """Resolve many coordinates at once; results (or errors) follow the input order."""
+
+        now = self._clock()
+        keys: list[CacheKey] = []
+        points: dict[CacheKey, tuple[float, float]] = {}
+        for lat, lon in locations:
+            lat, lon = quantize_coordinates(lat, lon, self._grid_degrees)
+            key = self._build_cache_key(lat, lon)
+            keys.append(key)
+            points.setdefault(key, (lat, lon))
+
+        adapter: WeatherAdapter | None = None
+        with suppress(WeatherServiceError):
+            adapter = self._resolve_adapter()
+        semaphore = asyncio.Semaphore(self._batch_concurrency)
+        waiting: dict[CacheKey, CacheEntry | None] = {}
+        fresh: dict[CacheKey, WeatherResult] = {}
+        misses: list[tuple[CacheKey, float, float]] = []
+        for key, (lat, lon) in points.items():
+            cached = self._cache.get(key, now)
+            if cached is not None and now - cached.cached_at < self._cache_ttl:
+                if self._store is not None:
+                    self._store.touch(key, now)
+                fresh[key] = WeatherResult(cached.payload)
+                continue
+            waiting[key] = cached
+            if key not in self._inflight:
+                misses.append((key, lat, lon))
+        if hasattr(adapter, "get_daily_many"):
+            for start in range(0, len(misses), MULTI_LOCATION_CHUNK_SIZE):
+                chunk = misses[start : start + MULTI_LOCATION_CHUNK_SIZE]
+                chunk_task = asyncio.create_task(
+                    self._limited(semaphore, self._load_many(chunk, now))
+                )
+                for key, _, _ in chunk:
+                    self._track(key, asyncio.create_task(self._pick(chunk_task, key)))
+        else:
+            for key, lat, lon in misses:
+                self._track(
+                    key,
+                    asyncio.create_task(self._limited(semaphore, self._load(key, lat, lon, now))),
+                )
+        tasks = {key: self._inflight[key] for key in waiting}
+
+        async def settle(key: CacheKey) -> WeatherResult | WeatherServiceError:
+            try:
+                return await self._settle(waiting[key], tasks[key], now)
+            except WeatherServiceError as exc:
+                return exc
+
+        settled = dict(
+            zip(waiting, await asyncio.gather(*(settle(key) for key in waiting)), strict=True)
+        )
+        return [fresh[key] if key in fresh else settled[key] for key in keys]
+
+    async def _settle(
+        self,
+        cached: CacheEntry | None,
+        task: asyncio.Task[schemas.WeatherResponse],
+        now: datetime,
+    ) -> WeatherResult:
+        if cached is not None and now - cached.cached_at < self._cache_hard_ttl:
+            # stale-while-revalidate: 更新はタスクに任せて古い値を待たずに返す。
+            return WeatherResult(cached.payload, stale=True)
+        try:
+            # 待ち手のキャンセルで共有タスクまで止めない。
+            return WeatherResult(await asyncio.shield(task))
+        except WeatherServiceError:
+            if cached is None:
+                raise
+            # stale-if-error: 上流が落ちていても保持している最後の予報で応答する。
+            return WeatherResult(cached.payload, stale=True)
 
+    def _track(self, key: CacheKey, task: asyncio.Task[schemas.WeatherResponse]) -> None:
+        self._inflight[key] = task
+        task.add_done_callback(partial(self._forget_inflight, key))
+
+    @staticmethod
+    async def _limited(semaphore: asyncio.Semaphore, coro: Coroutine[Any, Any, Any]) -> Any:
+        async with semaphore:
+            return await coro
+
+    @staticmethod
+    async def _pick(
+        chunk: asyncio.Task[dict[CacheKey, schemas.WeatherResponse]], key: CacheKey
+    ) -> schemas.WeatherResponse:
+        return (await asyncio.shield(chunk))[key]
+
+    def _forget_inflight(self, key: CacheKey, task: asyncio.Task[schemas.WeatherResponse]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        # 待ち手がいない裏更新でも "exception was never retrieved" を出さずに記録する。
+        error = task.exception()
+        if error is not None:
+            logger.warning("weather refresh failed for %s: %s", key, error)
+
+    async def _load(
+        self, key: CacheKey, lat: float, lon: float, now: datetime
+    ) -> schemas.WeatherResponse:
+        stored = await self._read_store(key, now)
+        if stored is not None:
+            return stored
         payload = await self._fetch_from_adapter(lat, lon)
+        return await self._remember(key, self._validate(payload), now)
+
+    async def _load_many(
+        self, points: Sequence[tuple[CacheKey, float, float]], now: datetime
+    ) -> dict[CacheKey, schemas.WeatherResponse]:
+        loaded: dict[CacheKey, schemas.WeatherResponse] = {}
+        for key, _, _ in points:
+            stored = await self._read_store(key, now)
+            if stored is not None:
+                loaded[key] = stored
+        missing = [point for point in points if point[0] not in loaded]
+        if missing:
+            payloads = await self._fetch_many_from_adapter([(lat, lon) for _, lat, lon in missing])
+            for (key, _, _), payload in zip(missing, payloads, strict=True):
+                loaded[key] = await self._remember(key, self._validate(payload), now)
+        return loaded
 
+    async def _read_store(self, key: CacheKey, now: datetime) -> schemas.WeatherResponse | None:
+        if self._store is None:
+            return None
+        # 別プロセスや再起動前に永続層へ書かれた新鮮な予報があれば上流を呼ばない。
         try:
-            response = schemas.WeatherResponse.model_validate(payload)
+            stored = await asyncio.to_thread(self._store.get, key, now)
+        except (sqlite3.Error, ValueError) as exc:
+            # 永続層は任意の補助なので、読めなければメモリキャッシュと上流だけで応答する。
+            logger.warning("weather cache store read failed for %s: %s", key, exc)
+            return None
+        if stored is None or now - stored.cached_at >= self._cache_ttl:
+            return None
+        self._cache.put(key, stored.payload, stored.cached_at)
+        self._store.touch(key, now)
+        return stored.payload
+
+    @staticmethod
+    def _validate(payload: Mapping[str, Any]) -> schemas.WeatherResponse:
+        try:
+            return schemas.WeatherResponse.model_validate(payload)
         except ValidationError as exc:  # pragma: no cover - defensive guard
             raise WeatherServiceError(
                 "weather adapter returned invalid payload",
                 status_code=HTTPStatus.BAD_GATEWAY,
             ) from exc
 
-        with self._lock:
-            self._cache[key] = CacheEntry(payload=response, cached_at=now)
+    async def _remember(
+        self, key: CacheKey, response: schemas.WeatherResponse, now: datetime
+    ) -> schemas.WeatherResponse:
+        self._cache.put(key, response, now)
+        if self._store is not None:
+            flush_due = self._store.stage(
+                key, response, cached_at=now, expires_at=now + self._cache_max_stale
+            )
+            if flush_due:
+                await self._flush_store(now)
         return response
 
+    async def _flush_store(self, now: datetime) -> None:
+        assert self._store is not None
+        try:
+            await asyncio.to_thread(self._store.flush, now)
+        except sqlite3.Error as exc:
+            # 書けなかった行はストア側で積み直されるので、次の flush で再試行される。
+            logger.warning("weather cache store flush failed: %s", exc)
+
+    async def _flush_periodically(self) -> None:
+        # 書き込みが flush_size に届かない間も、積んだ行と参照時刻を一定間隔で永続層へ書き出す。
+        assert self._store is not None
+        while True:
+            await asyncio.sleep(self._store_flush_interval)
+            if self._store.has_pending():
+                await self._flush_store(self._clock())
+
+    async def _warm_from_store(self) -> None:
+        assert self._store is not None
+        now = self._clock()
+        try:
+            stored = await asyncio.to_thread(self._store.load_recent, now, limit=self._warm_limit)
+        except sqlite3.Error as exc:
+            logger.warning("weather cache warm-up skipped: %s", exc)
+            return
+        # 最近使われたものほど LRU の末尾に来るよう、古い順に積む。
+        for entry in reversed(stored):
+            self._cache.put(entry.key, entry.payload, entry.cached_at)
+
+    def cache_stats(self) -> WeatherCacheStats:
+        return self._cache.stats()
+
     def _build_cache_key(self, lat: float, lon: float) -> CacheKey:
         return f"{lat:.6f}:{lon:.6f}"
 
     def _create_default_adapter(self) -> WeatherAdapter:
-        return OpenMeteoWeatherAdapter()
+        return OpenMeteoWeatherAdapter(client=self._http_client)
 
     def _resolve_adapter(self) -> WeatherAdapter:
         if self._adapter_factory is not None:
@@ -221,7 +892,17 @@ class WeatherService:
             return self._adapter
 
         if self._adapter is None:
-            if adapter_registry is None:
+            specs = (
+                weather_provider_specs(adapter_registry)
+                if adapter_registry is not None and self._fanout.enabled
+                else []
+            )
+            if specs:
+                adapter: WeatherAdapter = FanOutWeatherAdapter.from_specs(specs, self._fanout)
+            elif len(hedged := self._hedged_specs()) > 1:
+                assert adapter_registry is not None
+                adapter = HedgedWeatherAdapter.from_specs(hedged, adapter_registry, self._fanout)
+            elif adapter_registry is None:
                 adapter = self._create_default_adapter()
             else:
                 try:
@@ -230,6 +911,8 @@ class WeatherService:
                     adapter = self._create_default_adapter()
                 else:
                     adapter = spec.factory()
+                if hasattr(adapter_registry, "allow_request"):
+                    self._circuit_name = "weather"
             if not hasattr(adapter, "get_daily"):
                 raise WeatherServiceError(
                     "weather adapter does not implement get_daily",
@@ -238,8 +921,52 @@ class WeatherService:
             self._adapter = adapter
         return self._adapter
 
+    def _hedged_specs(self) -> list[Any]:
+        if (
+            adapter_registry is None
+            or self._fanout.enabled
+            or not hasattr(adapter_registry, "as_mapping")
+        ):
+            return []
+        return weather_provider_specs(adapter_registry)
+
+    @contextmanager
+    def _circuit(self) -> Iterator[None]:
+        """Apply the registry's circuit breaker to the single-provider path.
+
+        Fan-out and hedged adapters track provider health themselves, so this is a no-op
+        for them; an open circuit fails fast and callers fall back to stale-if-error.
+        """
+
+        name = self._circuit_name
+        if name is None or adapter_registry is None:
+            yield
+            return
+        if not adapter_registry.allow_request(name):
+            raise WeatherServiceError(
+                "weather provider is unavailable",
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            )
+        started = time.perf_counter()
+        try:
+            yield
+        except WeatherServiceError:
+            adapter_registry.record_failure(name)
+            raise
+        except BaseException:
+            # キャンセルなどは成否に数えず、半開状態の試行枠だけ返す。
+            adapter_registry.release(name)
+            raise
+        adapter_registry.record_success(name, time.perf_counter() - started)
+
     async def _fetch_from_adapter(self, lat: float, lon: float) -> Mapping[str, Any]:
         adapter = self._resolve_adapter()
+        with self._circuit():
+            return await self._call_single(adapter, lat, lon)
+
+    async def _call_single(
+        self, adapter: WeatherAdapter, lat: float, lon: float
+    ) -> Mapping[str, Any]:
         try:
             result = adapter.get_daily(lat, lon)
         except WeatherServiceError:
@@ -269,10 +996,50 @@ class WeatherService:
 
         return result
 
+    async def _fetch_many_from_adapter(
+        self, locations: Sequence[tuple[float, float]]
+    ) -> list[Mapping[str, Any]]:
+        adapter = cast(MultiLocationWeatherAdapter, self._resolve_adapter())
+        with self._circuit():
+            try:
+                result = adapter.get_daily_many(locations)
+                if inspect.isawaitable(result):
+                    result = await result
+            except WeatherServiceError:
+                raise
+            except Exception as exc:  # pragma: no cover - adapter failure
+                raise WeatherServiceError(
+                    "weather adapter request failed",
+                    status_code=HTTPStatus.BAD_GATEWAY,
+                ) from exc
+
+            if (
+                not isinstance(result, Sequence)
+                or len(result) != len(locations)
+                or not all(isinstance(item, Mapping) for item in result)
+            ):
+                raise WeatherServiceError(
+                    "weather adapter returned unexpected payload",
+                    status_code=HTTPStatus.BAD_GATEWAY,
+                )
+            return list(result)
+
 
 __all__ = [
+    "CacheEntry",
+    "WeatherCacheStats",
+    "WeatherResult",
     "WeatherService",
+    "WeatherStore",
     "WeatherServiceError",
     "WeatherAdapter",
+    "MultiLocationWeatherAdapter",
     "OpenMeteoWeatherAdapter",
+    "WeatherClientConfig",
+    "WeatherFanOutConfig",
+    "FanOutWeatherAdapter",
+    "HedgedWeatherAdapter",
+    "weather_provider_specs",
+    "create_weather_client",
+    "quantize_coordinates",
 ]
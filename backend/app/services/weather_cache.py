@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from .. import schemas
+
+CacheKey = str
+
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+@dataclass
+class CacheEntry:
+    payload: schemas.WeatherResponse
+    cached_at: datetime
+    size: int
+
+
+@dataclass(frozen=True)
+class WeatherCacheStats:
+    entries: int
+    bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+
+def _payload_size(payload: schemas.WeatherResponse) -> int:
+    # JSON 表現の長さで近似する。Python オブジェクトの実サイズより小さいが、上限は相対値で十分。
+    return len(payload.model_dump_json(by_alias=True))
+
+
+class WeatherCache:
+    """LRU cache with entry/byte caps and TTL expiry; not thread-safe on its own.
+
+    ``ttl`` bounds how long an entry is retained, not how long it is fresh; callers
+    compare ``CacheEntry.cached_at`` against their own soft/hard limits.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: timedelta,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("cache limits must be positive")
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        # 参照順 (LRU) とは別に cached_at の最小ヒープを持つ。永続層からの温め直しや
+        # read-through では古い cached_at の行が後から入るため、書き込み順では期限順にならない。
+        # 置き換え・追い出し済みの項目はヒープに残し、取り出した時点で読み飛ばす。
+        self._entries: OrderedDict[CacheKey, CacheEntry] = OrderedDict()
+        self._expiry: list[tuple[datetime, int, CacheKey, CacheEntry]] = []
+        self._sequence = itertools.count()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey, now: datetime) -> CacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        if now - entry.cached_at >= self._ttl:
+            self._remove(key)
+            self._expirations += 1
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry
+
+    def put(self, key: CacheKey, payload: schemas.WeatherResponse, now: datetime) -> None:
+        if key in self._entries:
+            self._remove(key)
+        entry = CacheEntry(payload=payload, cached_at=now, size=_payload_size(payload))
+        self._entries[key] = entry
+        heapq.heappush(self._expiry, (entry.cached_at, next(self._sequence), key, entry))
+        self._bytes += entry.size
+        self.purge_expired(now)
+        while len(self._entries) > self._max_entries or (
+            self._bytes > self._max_bytes and len(self._entries) > 1
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._evictions += 1
+        if len(self._expiry) > 2 * len(self._entries) + 64:
+            self._compact_expiry()
+
+    def purge_expired(self, now: datetime) -> int:
+        purged = 0
+        cutoff = now - self._ttl
+        while self._expiry and self._expiry[0][0] <= cutoff:
+            _, _, key, entry = heapq.heappop(self._expiry)
+            if self._entries.get(key) is entry:
+                self._remove(key)
+                purged += 1
+        self._expirations += purged
+        return purged
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._expiry.clear()
+        self._bytes = 0
+
+    def stats(self) -> WeatherCacheStats:
+        return WeatherCacheStats(
+            entries=len(self._entries),
+            bytes=self._bytes,
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            expirations=self._expirations,
+        )
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def _compact_expiry(self) -> None:
+        self._expiry = [item for item in self._expiry if self._entries.get(item[2]) is item[3]]
+        heapq.heapify(self._expiry)
+
+
+__all__ = [
+    "CacheEntry",
+    "CacheKey",
+    "DEFAULT_MAX_BYTES",
+    "DEFAULT_MAX_ENTRIES",
+    "WeatherCache",
+    "WeatherCacheStats",
+]
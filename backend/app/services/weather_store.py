@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+
+from .. import schemas
+from ..db.schema import INDEX_DEFINITIONS, TABLE_DEFINITIONS
+
+__all__ = ["StoredWeather", "WeatherStore"]
+
+ConnFactory = Callable[[], sqlite3.Connection]
+
+DEFAULT_FLUSH_SIZE = 32
+_TABLE_SQL = dict(TABLE_DEFINITIONS)["weather_cache"]
+_INDEX_SQL = tuple(sql for sql in INDEX_DEFINITIONS if " ON weather_cache(" in sql)
+
+_UPSERT_SQL = """
+INSERT INTO weather_cache (key, payload, cached_at, expires_at, last_used_at)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(key) DO UPDATE SET
+    payload = excluded.payload,
+    cached_at = excluded.cached_at,
+    expires_at = excluded.expires_at,
+    last_used_at = excluded.last_used_at
+""".strip()
+
+
+@dataclass(frozen=True)
+class StoredWeather:
+    key: str
+    payload: schemas.WeatherResponse
+    cached_at: datetime
+
+
+def _row_to_stored(row: sqlite3.Row | tuple[str, str, str]) -> StoredWeather:
+    key, payload, cached_at = row[0], row[1], row[2]
+    return StoredWeather(
+        key=str(key),
+        payload=schemas.WeatherResponse.model_validate_json(payload),
+        cached_at=datetime.fromisoformat(str(cached_at)),
+    )
+
+
+class WeatherStore:
+    """SQLite tier behind ``WeatherCache``; writes are buffered and flushed in batches.
+
+    Methods block on SQLite, so async callers run them via ``asyncio.to_thread``.
+    """
+
+    def __init__(
+        self,
+        conn_factory: ConnFactory,
+        *,
+        flush_size: int = DEFAULT_FLUSH_SIZE,
+        ensure_schema: bool = False,
+    ) -> None:
+        self._conn_factory = conn_factory
+        self._flush_size = max(1, flush_size)
+        self._lock = Lock()
+        self._pending: dict[str, tuple[str, str, str, str, str]] = {}
+        self._touched: dict[str, str] = {}
+        # アプリの DB なら init_db が表を作る。別ファイルのときだけ初回接続時に作る。
+        self._needs_schema = ensure_schema
+
+    @classmethod
+    def from_env(cls) -> WeatherStore | None:
+        # 1 ならアプリの DB、パスを渡せば別の SQLite ファイルに保存する。
+        raw = os.getenv("PLANTING_WEATHER_CACHE_DB", "").strip()
+        if not raw or raw.lower() in {"0", "false", "no"}:
+            return None
+        if raw.lower() in {"1", "true", "yes"}:
+            from ..db.connection import get_conn
+
+            return cls(get_conn)
+        path = Path(raw)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return cls(lambda: sqlite3.connect(path, check_same_thread=False), ensure_schema=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = self._conn_factory()
+        if self._needs_schema:
+            conn.execute(_TABLE_SQL)
+            for sql in _INDEX_SQL:
+                conn.execute(sql)
+            conn.commit()
+            self._needs_schema = False
+        return conn
+
+    def stage(
+        self,
+        key: str,
+        payload: schemas.WeatherResponse,
+        *,
+        cached_at: datetime,
+        expires_at: datetime,
+    ) -> bool:
+        """Buffer a write; returns True once the buffer should be flushed."""
+
+        row = (
+            key,
+            payload.model_dump_json(by_alias=True),
+            cached_at.isoformat(),
+            expires_at.isoformat(),
+            cached_at.isoformat(),
+        )
+        with self._lock:
+            self._pending[key] = row
+            self._touched.pop(key, None)
+            return len(self._pending) >= self._flush_size
+
+    def has_pending(self) -> bool:
+        with self._lock:
+            return bool(self._pending or self._touched)
+
+    def touch(self, key: str, used_at: datetime) -> None:
+        with self._lock:
+            if key not in self._pending:
+                self._touched[key] = used_at.isoformat()
+
+    def flush(self, now: datetime) -> int:
+        with self._lock:
+            pending = list(self._pending.values())
+            touched = [(used_at, key) for key, used_at in self._touched.items()]
+            self._pending.clear()
+            self._touched.clear()
+        try:
+            conn = self._connect()
+            try:
+                conn.executemany(_UPSERT_SQL, pending)
+                conn.executemany("UPDATE weather_cache SET last_used_at = ? WHERE key = ?", touched)
+                conn.execute("DELETE FROM weather_cache WHERE expires_at <= ?", (now.isoformat(),))
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            self._restage(pending, touched)
+            raise
+        return len(pending)
+
+    def _restage(
+        self,
+        pending: list[tuple[str, str, str, str, str]],
+        touched: list[tuple[str, str]],
+    ) -> None:
+        # 失敗中に新しく積まれた行の方が新しいので、それは上書きしない。
+        with self._lock:
+            for row in pending:
+                self._pending.setdefault(row[0], row)
+            for used_at, key in touched:
+                if key not in self._pending:
+                    self._touched.setdefault(key, used_at)
+
+    def get(self, key: str, now: datetime) -> StoredWeather | None:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT key, payload, cached_at FROM weather_cache"
+                " WHERE key = ? AND expires_at > ?",
+                (key, now.isoformat()),
+            ).fetchone()
+        finally:
+            conn.close()
+        return None if row is None else _row_to_stored(row)
+
+    def load_recent(self, now: datetime, *, limit: int) -> list[StoredWeather]:
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT key, payload, cached_at FROM weather_cache"
+                " WHERE expires_at > ? ORDER BY last_used_at DESC LIMIT ?",
+                (now.isoformat(), limit),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [_row_to_stored(row) for row in rows]
@@ -0,0 +1,80 @@
+"""Read-path warmers executed after a successful scheduled refresh."""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import time
+from collections.abc import Callable
+from typing import get_args
+
+from fastapi import Response
+
+from . import schemas
+
+__all__ = ["Warmer", "register_warmer", "unregister_warmer", "warm_read_caches", "warmers"]
+
+logger = logging.getLogger(__name__)
+
+Warmer = Callable[[sqlite3.Connection], None]
+
+_WARMERS: dict[str, Warmer] = {}
+
+
+def register_warmer(name: str, warmer: Warmer) -> None:
+    _WARMERS[name] = warmer
+
+
+def unregister_warmer(name: str) -> None:
+    _WARMERS.pop(name, None)
+
+
+def warmers() -> tuple[str, ...]:
+    return tuple(_WARMERS)
+
+
+def warm_read_caches(conn: sqlite3.Connection) -> dict[str, float]:
+    """Run every registered warmer and return the elapsed milliseconds per warmer."""
+
+    durations: dict[str, float] = {}
+    for name, warmer in list(_WARMERS.items()):
+        started = time.perf_counter()
+        try:
+            warmer(conn)
+        except Exception:
+            logger.warning("read cache warmer failed", extra={"warmer": name}, exc_info=True)
+            continue
+        durations[name] = (time.perf_counter() - started) * 1000.0
+    logger.info("read caches warmed", extra={"warmers": durations})
+    return durations
+
+
+def _warm_market_metadata(conn: sqlite3.Connection) -> None:
+    from .etl import transform
+    from .routes import markets
+
+    row = conn.execute(
+        "SELECT 1 FROM metadata_cache WHERE cache_key = 'market_metadata'"
+    ).fetchone()
+    if row is None:
+        transform._refresh_market_metadata_cache(conn)
+        conn.commit()
+    markets.market_metadata(Response(), conn)
+
+
+def _warm_crops(conn: sqlite3.Connection) -> None:
+    from .routes import crops
+
+    crops.list_crops(None, conn=conn)
+
+
+def _warm_recommend(conn: sqlite3.Connection) -> None:
+    from .routes import recommend
+
+    for region in get_args(schemas.Region):
+        recommend.recommend(None, None, None, region, response=Response(), conn=conn)
+
+
+register_warmer("market_metadata", _warm_market_metadata)
+register_warmer("crops", _warm_crops)
+register_warmer("recommend", _warm_recommend)
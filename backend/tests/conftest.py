@@ -1,8 +1,24 @@
 from __future__ import annotations
 
+import os
+import shutil
 import sys
+import tempfile
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parent.parent
-if str(ROOT) not in sys.path:
-    sys.path.insert(0, str(ROOT))
+# バックエンド直下から実行しても、リポジトリ直下の ``adapter`` パッケージを import できるようにする。
+for candidate in (ROOT, ROOT.parent):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+# 収集時に seed() するテストもあるため、app を import する前に一時 DB を指しておく。
+# data/planting.db は実行時のファイルなので、テストからは書き換えない。
+_DB_DIR = Path(tempfile.mkdtemp(prefix="planting-tests-"))
+os.environ["PLANTING_DB_PATH"] = str(_DB_DIR / "planting.db")
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    shutil.rmtree(_DB_DIR, ignore_errors=True)
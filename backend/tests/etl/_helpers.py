@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import sqlite3
+import subprocess
+import sys
 from collections.abc import Iterable
 from pathlib import Path
 
+from app import db, seed
+
 TokenRow = tuple[str, str, str]
 ScopeRow = tuple[str, str, str, int, str]
 CategoryRow = tuple[str, str, str, int, str]
@@ -19,6 +23,26 @@ def make_conn(path: Path | None = None) -> sqlite3.Connection:
     return conn
 
 
+def prepare_db(path: Path | None = None, *, seeded: bool = False) -> sqlite3.Connection:
+    """Create the schema plus the test crops (or the full seed) and return the connection."""
+
+    conn = make_conn(path)
+    db.init_db(conn)
+    if seeded:
+        seed.seed(conn)
+    else:
+        prepare_crops(conn)
+    return conn
+
+
+def dead_pid() -> int:
+    """PID of a process that has already exited, for "host:pid" owner checks."""
+
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
 def prepare_crops(conn: sqlite3.Connection) -> None:
     conn.execute("INSERT INTO crops (id, name, category) VALUES (1, 'A', 'leaf')")
     conn.execute("INSERT INTO crops (id, name, category) VALUES (2, 'B', 'root')")
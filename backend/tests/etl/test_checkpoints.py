@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Callable, Iterator
+from contextlib import closing
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import etl, etl_runner
+from app.dependencies import get_conn
+from app.etl import transform
+from app.etl_runner import coalesce, context, control, jobs, status
+from app.main import app
+
+from ._helpers import make_conn, prepare_db
+
+RECORDS: list[dict[str, object]] = [
+    {"crop_id": 1, "week": f"2024-W0{week}", "avg_price": 100 + week, "source": "feed"}
+    for week in range(1, 5)
+]
+
+
+def _conn_factory(db_path: Path) -> Callable[[], sqlite3.Connection]:
+    def factory() -> sqlite3.Connection:
+        return make_conn(db_path)
+
+    prepare_db(db_path).close()
+    return factory
+
+
+def _count_chunk_writes(
+    monkeypatch: pytest.MonkeyPatch, *, fail_on: int | None = None
+) -> list[int]:
+    original = transform._upsert_rows
+    calls: list[int] = []
+
+    def upsert_rows(conn: sqlite3.Connection, legacy: list[Any], market: list[Any]) -> None:
+        calls.append(len(legacy) + len(market))
+        if fail_on is not None and len(calls) == fail_on:
+            raise RuntimeError("worker killed")
+        original(conn, legacy, market)
+
+    monkeypatch.setattr(transform, "_upsert_rows", upsert_rows)
+    return calls
+
+
+def test_interrupted_run_resumes_from_last_committed_chunk(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    factory = _conn_factory(tmp_path / "resume.db")
+    monkeypatch.setenv("PLANTING_ETL_LOAD_MODE", "chunked")
+    monkeypatch.setenv("PLANTING_ETL_CHUNK_SIZE", "1")
+
+    _count_chunk_writes(monkeypatch, fail_on=3)
+    with pytest.raises(RuntimeError, match="worker killed"):
+        etl.start_etl_job(conn_factory=factory, data_loader=lambda: RECORDS)
+
+    with closing(factory()) as conn:
+        checkpoint = conn.execute(
+            "SELECT chunk, chunk_size, source_offset, length(feed_hash) FROM etl_checkpoints"
+        ).fetchone()
+        assert tuple(checkpoint) == (2, 1, 2, 64)
+        assert conn.execute("SELECT COUNT(*) FROM price_weekly").fetchone()[0] == 2
+
+    calls = _count_chunk_writes(monkeypatch)
+    etl.start_etl_job(conn_factory=factory, data_loader=lambda: RECORDS)
+
+    assert calls == [1, 1]
+    with closing(factory()) as conn:
+        status = etl_runner.get_last_status(conn)
+        assert status.state == "success"
+        assert status.updated_records == len(RECORDS)
+        assert conn.execute("SELECT COUNT(*) FROM price_weekly").fetchone()[0] == len(RECORDS)
+        resumed = conn.execute(
+            "SELECT chunk, source_offset FROM etl_checkpoints WHERE run_id = ?",
+            (status.run_id,),
+        ).fetchone()
+        assert tuple(resumed) == (4, 4)
+
+
+def test_default_upsert_keeps_failed_feed_invisible(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    factory = _conn_factory(tmp_path / "atomic.db")
+    monkeypatch.setenv("PLANTING_ETL_CHUNK_SIZE", "1")
+
+    _count_chunk_writes(monkeypatch, fail_on=3)
+    with pytest.raises(RuntimeError, match="worker killed"):
+        etl.start_etl_job(conn_factory=factory, data_loader=lambda: RECORDS)
+
+    with closing(factory()) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM price_weekly").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM etl_checkpoints").fetchone()[0] == 0
+
+    calls = _count_chunk_writes(monkeypatch)
+    etl.start_etl_job(conn_factory=factory, data_loader=lambda: RECORDS)
+
+    assert calls == [1, 1, 1, 1]
+    with closing(factory()) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM price_weekly").fetchone()[0] == len(RECORDS)
+
+
+def test_changed_feed_discards_checkpoint(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    factory = _conn_factory(tmp_path / "changed.db")
+    monkeypatch.setenv("PLANTING_ETL_LOAD_MODE", "chunked")
+    monkeypatch.setenv("PLANTING_ETL_CHUNK_SIZE", "1")
+
+    _count_chunk_writes(monkeypatch, fail_on=2)
+    with pytest.raises(RuntimeError):
+        etl.start_etl_job(conn_factory=factory, data_loader=lambda: RECORDS)
+
+    changed = [{**record, "avg_price": 500} for record in RECORDS]
+    calls = _count_chunk_writes(monkeypatch)
+    etl.start_etl_job(conn_factory=factory, data_loader=lambda: changed)
+
+    assert len(calls) == len(changed)
+    with closing(factory()) as conn:
+        prices = {row[0] for row in conn.execute("SELECT avg_price FROM price_weekly")}
+        assert prices == {500.0}
+
+
+def test_cancel_stops_running_job_at_chunk_boundary(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    factory = _conn_factory(tmp_path / "cancel.db")
+    monkeypatch.setenv("PLANTING_ETL_CHUNK_SIZE", "1")
+    calls = _count_chunk_writes(monkeypatch)
+
+    with closing(factory()) as conn:
+        claim = coalesce.claim_refresh(conn)
+
+    def loader() -> list[dict[str, object]]:
+        with closing(factory()) as other:
+            cancelled = control.cancel_run(other, claim.run_id)
+        assert cancelled is not None and cancelled.state == "running"
+        return RECORDS
+
+    etl.start_etl_job(conn_factory=factory, data_loader=loader, run_id=claim.run_id)
+
+    assert calls == []
+    with closing(factory()) as conn:
+        run = status.get_run(conn, claim.run_id)
+        assert run is not None
+        assert run.state == "failure"
+        assert run.last_error == context.CANCELLED_MESSAGE
+
+
+@pytest.fixture
+def cancel_api_db(tmp_path: Path) -> Iterator[Callable[[], sqlite3.Connection]]:
+    factory = _conn_factory(tmp_path / "cancel-api.db")
+
+    def override() -> Iterator[sqlite3.Connection]:
+        conn = factory()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    app.dependency_overrides[get_conn] = override
+    try:
+        yield factory
+    finally:
+        app.dependency_overrides.pop(get_conn, None)
+
+
+def test_cancel_endpoint(cancel_api_db: Callable[[], sqlite3.Connection]) -> None:
+    factory = cancel_api_db
+    with closing(factory()) as conn:
+        run_id = coalesce.claim_refresh(conn).run_id
+        jobs.enqueue_job(conn, run_id)
+
+    client = TestClient(app)
+    assert client.post("/api/refresh/runs/999/cancel").status_code == 404
+
+    response = client.post(f"/api/refresh/runs/{run_id}/cancel")
+    assert response.status_code == 202
+    body = response.json()
+    # ワーカーが拾う前のジョブはその場で打ち切られる。
+    assert (body["run_id"], body["state"]) == (run_id, "failure")
+    with closing(factory()) as conn:
+        job_state = conn.execute("SELECT state FROM etl_jobs WHERE run_id = ?", (run_id,))
+        assert job_state.fetchone()[0] == "failed"
+
+    assert client.post(f"/api/refresh/runs/{run_id}/cancel").status_code == 202
+    with closing(factory()) as conn:
+        conn.execute(
+            "UPDATE etl_runs SET state = 'success', last_error = NULL, error_message = NULL"
+        )
+        conn.commit()
+    assert client.post(f"/api/refresh/runs/{run_id}/cancel").status_code == 409
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import socket
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from app import db, etl, etl_runner
+from app.compat import UTC
+from app.etl_runner import coalesce, metadata
+
+from ._helpers import dead_pid, make_conn, prepare_db
+
+NOW = datetime(2024, 5, 1, 12, 0, tzinfo=UTC)
+
+
+def _finish(conn: sqlite3.Connection, run_id: int) -> None:
+    etl_runner._mark_run_success(
+        conn, run_id, finished_at="2024-05-01T12:01:00Z", updated_records=0
+    )
+
+
+def test_claim_refresh_joins_in_flight_run(tmp_path: Path) -> None:
+    conn = prepare_db(tmp_path / "claim.db")
+    try:
+        first = coalesce.claim_refresh(conn, idempotency_key="browser-a", now=NOW)
+        retry = coalesce.claim_refresh(conn, idempotency_key="browser-a", now=NOW)
+        other = coalesce.claim_refresh(conn, idempotency_key="browser-b", now=NOW)
+
+        assert first.created
+        assert (retry.run_id, retry.created) == (first.run_id, False)
+        assert (other.run_id, other.created) == (first.run_id, False)
+        assert conn.execute("SELECT COUNT(*) FROM etl_runs").fetchone()[0] == 1
+        keys = conn.execute(
+            "SELECT idempotency_key, run_id FROM etl_refresh_requests ORDER BY idempotency_key"
+        ).fetchall()
+        assert [tuple(row) for row in keys] == [
+            ("browser-a", first.run_id),
+            ("browser-b", first.run_id),
+        ]
+
+        _finish(conn, first.run_id)
+        later = coalesce.claim_refresh(
+            conn, idempotency_key="browser-a", now=NOW + timedelta(minutes=5)
+        )
+        assert later.created
+        assert later.run_id != first.run_id
+    finally:
+        conn.close()
+
+
+def test_claim_refresh_purges_expired_keys(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("PLANTING_REFRESH_IDEMPOTENCY_TTL", "60")
+    conn = prepare_db(tmp_path / "claim-ttl.db")
+    try:
+        first = coalesce.claim_refresh(conn, idempotency_key="old", now=NOW)
+        _finish(conn, first.run_id)
+
+        coalesce.claim_refresh(conn, idempotency_key="new", now=NOW + timedelta(minutes=2))
+
+        keys = conn.execute("SELECT idempotency_key, expires_at FROM etl_refresh_requests")
+        assert [tuple(row) for row in keys] == [("new", "2024-05-01T12:03:00Z")]
+    finally:
+        conn.close()
+
+
+def test_claim_refresh_reclaims_abandoned_runs(tmp_path: Path) -> None:
+    conn = prepare_db(tmp_path / "claim-stale.db")
+    try:
+        abandoned = etl_runner._insert_run_metadata(conn, "2024-05-01T09:00:00Z")
+
+        claim = coalesce.claim_refresh(conn, now=NOW)
+
+        assert claim.created
+        row = conn.execute(
+            "SELECT state, last_error FROM etl_runs WHERE id = ?", (abandoned,)
+        ).fetchone()
+        assert row["state"] == "stale"
+        assert row["last_error"] == "run abandoned before completion"
+    finally:
+        conn.close()
+
+
+def test_claim_refresh_keeps_leased_run_and_reclaims_expired_lease(tmp_path: Path) -> None:
+    conn = prepare_db(tmp_path / "claim-lease.db")
+    try:
+        # 別ホストの run は生死を確かめられないので、リースの期限だけで判断する。
+        leased = etl_runner._insert_run_metadata(conn, "2024-05-01T08:00:00Z", owner="other:1")
+        metadata._heartbeat_run(conn, leased, now="2024-05-01T11:59:30Z", owner="other:1")
+
+        joined = coalesce.claim_refresh(conn, now=NOW)
+        expired = coalesce.claim_refresh(conn, now=NOW + timedelta(minutes=1))
+
+        assert (joined.run_id, joined.created) == (leased, False)
+        assert expired.created
+        state = conn.execute("SELECT state FROM etl_runs WHERE id = ?", (leased,)).fetchone()
+        assert state["state"] == "stale"
+    finally:
+        conn.close()
+
+
+def test_claim_refresh_reclaims_run_whose_process_died(tmp_path: Path) -> None:
+    conn = prepare_db(tmp_path / "claim-dead.db")
+    try:
+        # 再起動で消えた同じホストのプロセスの run は、リースが新しくても待たずに取り直す。
+        owner = f"{socket.gethostname()}:{dead_pid()}"
+        orphan = etl_runner._insert_run_metadata(conn, "2024-05-01T12:00:00Z", owner=owner)
+
+        claim = coalesce.claim_refresh(conn, now=NOW)
+
+        assert claim.created
+        assert claim.run_id != orphan
+    finally:
+        conn.close()
+
+
+def test_start_etl_job_renews_lease_while_running(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("PLANTING_ETL_RUN_LEASE", "1")
+    db_path = tmp_path / "claim-heartbeat.db"
+    prepare_db(db_path).close()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_run_etl(conn: sqlite3.Connection, *, data_loader: object | None = None) -> int:
+        started.set()
+        release.wait(10)
+        return 0
+
+    monkeypatch.setattr(etl_runner, "_load_run_etl", lambda: slow_run_etl)
+    job = threading.Thread(
+        target=etl.start_etl_job, kwargs={"conn_factory": lambda: make_conn(db_path)}
+    )
+    job.start()
+    try:
+        assert started.wait(10)
+        # リースの 2 倍以上待っても、ハートビートが続いていれば同じ run に合流する。
+        threading.Event().wait(2.5)
+        conn = make_conn(db_path)
+        try:
+            claim = coalesce.claim_refresh(conn)
+        finally:
+            conn.close()
+        assert not claim.created
+    finally:
+        release.set()
+        job.join(10)
+
+
+def test_single_running_index_rejects_second_running_row(tmp_path: Path) -> None:
+    conn = prepare_db(tmp_path / "claim-index.db")
+    try:
+        etl_runner._insert_run_metadata(conn, "2024-05-01T12:00:00Z")
+        with pytest.raises(sqlite3.IntegrityError):
+            etl_runner._insert_run_metadata(conn, "2024-05-01T12:00:01Z")
+    finally:
+        conn.close()
+
+
+def test_init_db_collapses_duplicate_running_rows(tmp_path: Path) -> None:
+    conn = make_conn(tmp_path / "claim-legacy.db")
+    try:
+        db.init_db(conn)
+        conn.execute("DROP INDEX idx_etl_runs_single_running")
+        etl_runner._insert_run_metadata(conn, "2024-05-01T12:00:00Z")
+        newest = etl_runner._insert_run_metadata(conn, "2024-05-01T12:00:01Z")
+
+        db.init_db(conn)
+
+        running = conn.execute("SELECT id FROM etl_runs WHERE state = 'running'").fetchall()
+        assert [row["id"] for row in running] == [newest]
+    finally:
+        conn.close()
+
+
+def test_start_etl_job_skips_when_run_in_flight(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    db_path = tmp_path / "claim-job.db"
+    conn = prepare_db(db_path)
+    try:
+        in_flight = coalesce.claim_refresh(conn)
+    finally:
+        conn.close()
+
+    calls: list[int] = []
+
+    def fake_run_etl(conn: sqlite3.Connection, *, data_loader: object | None = None) -> int:
+        calls.append(1)
+        return 0
+
+    monkeypatch.setattr(etl_runner, "_load_run_etl", lambda: fake_run_etl)
+
+    etl.start_etl_job(conn_factory=lambda: make_conn(db_path))
+    assert calls == []
+
+    etl.start_etl_job(conn_factory=lambda: make_conn(db_path), run_id=in_flight.run_id)
+    assert calls == [1]
+    with closing(make_conn(db_path)) as check:
+        states = check.execute("SELECT id, state FROM etl_runs").fetchall()
+        assert [tuple(row) for row in states] == [(in_flight.run_id, "success")]
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+from pathlib import Path
+
+from app import etl, schemas
+from app.etl_runner import coalesce, events
+
+from ._helpers import make_conn, prepare_db
+
+RECORDS: list[dict[str, object]] = [
+    {"crop_id": 1, "week": "2024-W01", "avg_price": 120, "source": "feed"},
+    {"crop_id": 2, "week": "2024-W01", "avg_price": 80, "source": "feed"},
+]
+
+
+def test_runner_pushes_state_transitions_and_stage_progress(tmp_path: Path) -> None:
+    db_path = tmp_path / "events.db"
+    prepare_db(db_path).close()
+
+    async def scenario() -> list[events.RefreshEvent]:
+        received: list[events.RefreshEvent] = []
+        with events.bus.subscribe() as subscription:
+            job = asyncio.create_task(
+                asyncio.to_thread(
+                    etl.start_etl_job,
+                    conn_factory=lambda: make_conn(db_path),
+                    data_loader=lambda: RECORDS,
+                )
+            )
+            while True:
+                event = await asyncio.wait_for(subscription.get(), timeout=5)
+                received.append(event)
+                if event.kind == "state" and event.data["state"] != "running":
+                    break
+            await job
+        return received
+
+    received = asyncio.run(scenario())
+
+    assert received[0].kind == "state" and received[0].data["state"] == "running"
+    assert received[-1].data["state"] == "success"
+    assert received[-1].data["updated_records"] == len(RECORDS)
+    stages = [event.data["stage"]["stage"] for event in received if event.kind == "stage"]
+    assert stages == ["load", "transform", "validate", "upsert", "metadata_refresh"]
+    assert {event.run_id for event in received} == {received[0].run_id}
+    assert events.bus.subscriber_count == 0
+
+
+def test_stream_events_sends_snapshot_then_published_events() -> None:
+    bus = events.RefreshEventBus()
+    snapshot = schemas.RefreshStatus(state="running", run_id=7)
+
+    async def scenario() -> list[str]:
+        stream = events.stream_events(lambda: snapshot, target=bus, heartbeat=0.05)
+        frames = [await anext(stream), await anext(stream)]
+        assert bus.subscriber_count == 1
+        bus.publish(events.RefreshEvent("state", 7, {"run_id": 7, "state": "success"}))
+        frames.append(await anext(stream))
+        frames.append(await anext(stream))
+        await stream.aclose()
+        return frames
+
+    frames = asyncio.run(scenario())
+
+    assert frames[0] == "retry: 3000\n\n"
+    kind, data = frames[1].strip().split("\n")
+    assert kind == "event: state"
+    assert json.loads(data.removeprefix("data: "))["run_id"] == 7
+    assert frames[2] == 'event: state\ndata: {"run_id":7,"state":"success"}\n\n'
+    assert frames[3] == ": keep-alive\n\n"
+    assert bus.subscriber_count == 0
+
+
+def test_stream_events_keeps_events_published_while_reading_snapshot() -> None:
+    bus = events.RefreshEventBus()
+
+    def snapshot() -> schemas.RefreshStatus:
+        # スナップショットを読んだ直後、最初の get() より前に実行が終わった場合を再現する。
+        status = schemas.RefreshStatus(state="running", run_id=7)
+        bus.publish(events.RefreshEvent("state", 7, {"run_id": 7, "state": "success"}))
+        return status
+
+    async def scenario() -> list[str]:
+        stream = events.stream_events(snapshot, target=bus, heartbeat=5.0)
+        frames = [await anext(stream) for _ in range(3)]
+        await stream.aclose()
+        return frames
+
+    frames = asyncio.run(scenario())
+
+    assert json.loads(frames[1].split("data: ", 1)[1])["state"] == "running"
+    assert frames[2] == 'event: state\ndata: {"run_id":7,"state":"success"}\n\n'
+
+
+def test_slow_subscriber_drops_oldest_events() -> None:
+    bus = events.RefreshEventBus(queue_size=2)
+
+    async def scenario() -> tuple[list[int | None], int]:
+        with bus.subscribe() as subscription:
+            for run_id in range(4):
+                bus.publish(events.RefreshEvent("state", run_id, {}))
+            await asyncio.sleep(0)
+            kept = [(await subscription.get()).run_id for _ in range(2)]
+            return kept, subscription.dropped
+
+    assert asyncio.run(scenario()) == ([2, 3], 2)
+
+
+def test_watch_database_bridges_worker_progress(tmp_path: Path) -> None:
+    db_path = tmp_path / "watch.db"
+    prepare_db(db_path).close()
+    bus = events.RefreshEventBus()
+
+    def conn_factory() -> sqlite3.Connection:
+        return make_conn(db_path)
+
+    async def scenario() -> list[events.RefreshEvent]:
+        stop = asyncio.Event()
+        with bus.subscribe() as subscription:
+            watcher = asyncio.create_task(
+                events.watch_database(
+                    conn_factory=conn_factory, interval=0.01, target=bus, stop_event=stop
+                )
+            )
+            # 別プロセスのワーカー相当として、同じ DB に直接書き込む。
+            with conn_factory() as conn:
+                run_id = coalesce.claim_refresh(conn).run_id
+            first = await asyncio.wait_for(subscription.get(), timeout=5)
+            await asyncio.to_thread(
+                etl.start_etl_job,
+                conn_factory=conn_factory,
+                data_loader=lambda: RECORDS,
+                run_id=run_id,
+            )
+            received = [first]
+            while received[-1].kind != "state" or received[-1].data["state"] == "running":
+                received.append(await asyncio.wait_for(subscription.get(), timeout=5))
+            stop.set()
+            await watcher
+        return received
+
+    received = asyncio.run(scenario())
+
+    assert received[0].data["state"] == "running"
+    assert received[-1].data["state"] == "success"
+    assert [event.data["seq"] for event in received if event.kind == "stage"] == [0, 1, 2, 3, 4]
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+from contextlib import closing
+from pathlib import Path
+
+from app import db, etl
+
+from ._helpers import make_conn, prepare_crops, seed_market_scopes, seed_theme_tokens
+
+FEED: list[dict[str, object]] = [
+    {"crop_id": 1, "scope": "national", "week": "2024-W05", "avg_price": 220, "unit": "円/kg"},
+    {"crop_id": 1, "scope": "city:tokyo", "week": "2024-W05", "avg_price": 24, "unit": "円/100g"},
+    {"crop_id": 2, "scope": "city:sapporo", "week": "2024-W05", "avg_price": 30, "unit": "円/kg"},
+]
+
+
+def test_start_etl_job_links_quarantined_rows_to_run(tmp_path: Path) -> None:
+    db_path = tmp_path / "quarantine.db"
+    with closing(make_conn(db_path)) as conn:
+        db.init_db(conn)
+        prepare_crops(conn)
+        seed_theme_tokens(
+            conn,
+            [("accent.national", "#22c55e", "#000000"), ("accent.tokyo", "#2563eb", "#ffffff")],
+        )
+        seed_market_scopes(
+            conn,
+            [
+                ("national", "全国平均", "Asia/Tokyo", 10, "accent.national"),
+                ("city:tokyo", "東京都中央卸売", "Asia/Tokyo", 20, "accent.tokyo"),
+            ],
+        )
+
+    etl.start_etl_job(
+        conn_factory=lambda: make_conn(db_path),
+        data_loader=lambda: FEED,
+        max_retries=1,
+    )
+
+    conn = make_conn(db_path)
+    try:
+        run = conn.execute("SELECT id, state, updated_records FROM etl_runs").fetchone()
+        assert (run["state"], run["updated_records"]) == ("success", 2)
+        scopes = conn.execute("SELECT scope FROM market_prices ORDER BY scope").fetchall()
+        assert [row["scope"] for row in scopes] == ["city:tokyo", "national"]
+
+        quarantined = conn.execute(
+            "SELECT run_id, scope, payload, reason FROM etl_quarantine"
+        ).fetchall()
+        assert len(quarantined) == 1
+        assert quarantined[0]["run_id"] == run["id"]
+        assert quarantined[0]["reason"] == "Unknown market scope: city:sapporo"
+        assert json.loads(str(quarantined[0]["payload"]))["crop_id"] == 2
+    finally:
+        conn.close()
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import random
 import sqlite3
+from contextlib import closing
 from pathlib import Path
+from typing import Any
 
 import pytest
 
 from app import db, etl, etl_runner
+from app.etl_runner import context, runner
 
 from ._helpers import make_conn, prepare_crops
 
@@ -92,3 +96,145 @@ def test_start_etl_job_retries_database_errors(
         assert row["status"] == "failure"
         assert row["updated_records"] == 0
         assert row["last_error"] == "db locked"
+
+
+def _busy_error(db_path: Path) -> sqlite3.OperationalError:
+    holder = make_conn(db_path)
+    contender = sqlite3.connect(db_path, timeout=0)
+    try:
+        holder.execute("BEGIN EXCLUSIVE")
+        try:
+            contender.execute("CREATE TABLE busy_probe (id INTEGER)")
+        except sqlite3.OperationalError as exc:
+            return exc
+        raise AssertionError("expected SQLITE_BUSY")
+    finally:
+        holder.rollback()
+        holder.close()
+        contender.close()
+
+
+def test_is_transient_distinguishes_busy_from_permanent_errors(tmp_path: Path) -> None:
+    busy = _busy_error(tmp_path / "busy.db")
+    conn = make_conn()
+    try:
+        with pytest.raises(sqlite3.OperationalError) as missing_table:
+            conn.execute("SELECT * FROM missing_table")
+    finally:
+        conn.close()
+
+    assert runner._is_transient(busy)
+    assert not runner._is_transient(missing_table.value)
+    assert not runner._is_transient(sqlite3.IntegrityError("UNIQUE constraint failed"))
+    assert runner._is_transient(sqlite3.OperationalError("database is locked"))
+
+
+def test_retries_use_capped_exponential_backoff_and_record_attempts() -> None:
+    sleeps: list[float] = []
+    calls = {"count": 0}
+
+    def flaky_run_etl(conn: sqlite3.Connection, *, data_loader: object | None = None) -> int:
+        calls["count"] += 1
+        if calls["count"] < 5:
+            raise sqlite3.OperationalError("database is locked")
+        return 7
+
+    run = context.RunContext(run_id=1)
+    conn = make_conn()
+    try:
+        with context.activate(run):
+            updated = etl_runner._run_etl_with_retries(
+                load_run_etl=lambda: flaky_run_etl,
+                conn=conn,
+                data_loader=None,
+                max_retries=5,
+                retry_delay=0.1,
+                max_retry_delay=0.3,
+                rng=random.Random(3),
+                sleep=sleeps.append,
+            )
+    finally:
+        conn.close()
+
+    assert updated == 7
+    assert len(sleeps) == 4
+    for attempt, delay in enumerate(sleeps, start=1):
+        assert 0.0 <= delay <= min(0.3, 0.1 * 2 ** (attempt - 1))
+    assert [item.attempt for item in run.attempts] == [1, 2, 3, 4]
+    assert all(item.transient for item in run.attempts)
+    assert [item.wait_ms for item in run.attempts] == pytest.approx([s * 1000 for s in sleeps])
+
+
+def test_permanent_database_errors_are_not_retried(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    db_path = tmp_path / "etl_permanent.db"
+    with closing(make_conn(db_path)) as conn:
+        db.init_db(conn)
+
+    attempts = {"count": 0}
+
+    def broken_run_etl(conn: sqlite3.Connection, *, data_loader: object | None = None) -> int:
+        attempts["count"] += 1
+        raise sqlite3.IntegrityError("FOREIGN KEY constraint failed")
+
+    monkeypatch.setattr(etl_runner, "_load_run_etl", lambda: broken_run_etl)
+
+    with pytest.raises(sqlite3.IntegrityError):
+        etl.start_etl_job(conn_factory=lambda: make_conn(db_path), max_retries=5)
+
+    assert attempts["count"] == 1
+    with closing(make_conn(db_path)) as conn:
+        rows = conn.execute("SELECT attempt, transient, wait_ms FROM etl_run_attempts").fetchall()
+    assert [tuple(row) for row in rows] == [(1, 0, 0.0)]
+
+
+def test_retry_resumes_after_last_committed_chunk(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from app.etl import transform
+
+    db_path = tmp_path / "etl_resume.db"
+    with closing(make_conn(db_path)) as conn:
+        db.init_db(conn)
+        prepare_crops(conn)
+
+    records = [
+        {"crop_id": 1, "week": f"2024-W0{week}", "avg_price": 100 + week, "unit": "円/kg"}
+        for week in range(1, 5)
+    ]
+    loads = {"count": 0}
+
+    def loader() -> list[dict[str, object]]:
+        loads["count"] += 1
+        return records
+
+    written: list[list[str]] = []
+    original_upsert_rows = transform._upsert_rows
+    failures = {"remaining": 1}
+
+    def flaky_upsert_rows(
+        conn: sqlite3.Connection, legacy_rows: list[Any], market_rows: list[Any]
+    ) -> None:
+        weeks = [row[1] for row in legacy_rows]
+        written.append(weeks)
+        if weeks == ["2024-W03"] and failures["remaining"]:
+            failures["remaining"] -= 1
+            raise sqlite3.OperationalError("database is locked")
+        original_upsert_rows(conn, legacy_rows, market_rows)
+
+    monkeypatch.setenv("PLANTING_ETL_LOAD_MODE", "chunked")
+    monkeypatch.setenv("PLANTING_ETL_CHUNK_SIZE", "1")
+    monkeypatch.setattr(transform, "_upsert_rows", flaky_upsert_rows)
+
+    etl.start_etl_job(conn_factory=lambda: make_conn(db_path), data_loader=loader, retry_delay=0)
+
+    assert loads["count"] == 1
+    assert written == [["2024-W01"], ["2024-W02"], ["2024-W03"], ["2024-W03"], ["2024-W04"]]
+    with closing(make_conn(db_path)) as conn:
+        weeks = [row[0] for row in conn.execute("SELECT week FROM price_weekly ORDER BY week")]
+        attempts = conn.execute("SELECT attempt, error, transient FROM etl_run_attempts")
+        run = conn.execute("SELECT state, updated_records FROM etl_runs").fetchone()
+        assert weeks == ["2024-W01", "2024-W02", "2024-W03", "2024-W04"]
+        assert [tuple(row) for row in attempts] == [(1, "OperationalError: database is locked", 1)]
+        assert (run["state"], run["updated_records"]) == ("success", 4)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+
+import pytest
+
+from app import etl_runner, warmup
+from app.etl_runner import coalesce, context
+from app.etl_runner.scheduler import RefreshScheduler, SchedulerConfig
+
+from ._helpers import make_conn, prepare_db
+
+
+def _fake_run_etl(conn: sqlite3.Connection, *, data_loader: object | None = None) -> int:
+    return 0
+
+
+def test_scheduler_config_reads_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("PLANTING_REFRESH_INTERVAL", raising=False)
+    assert SchedulerConfig.from_env() is None
+
+    monkeypatch.setenv("PLANTING_REFRESH_INTERVAL", "600")
+    assert SchedulerConfig.from_env() == SchedulerConfig(interval=600.0, jitter=60.0)
+
+    monkeypatch.setenv("PLANTING_REFRESH_JITTER", "5")
+    assert SchedulerConfig.from_env() == SchedulerConfig(interval=600.0, jitter=5.0)
+
+    monkeypatch.setenv("PLANTING_REFRESH_INTERVAL", "0")
+    assert SchedulerConfig.from_env() is None
+
+    monkeypatch.setenv("PLANTING_REFRESH_INTERVAL", "hourly")
+    with pytest.raises(ValueError, match="Invalid refresh scheduler settings"):
+        SchedulerConfig.from_env()
+
+
+def test_next_delay_stays_within_jitter_window() -> None:
+    scheduler = RefreshScheduler(SchedulerConfig(interval=100.0, jitter=10.0), rng=random.Random(7))
+
+    delays = [scheduler.next_delay() for _ in range(200)]
+
+    assert all(90.0 <= delay <= 110.0 for delay in delays)
+    assert len({round(delay, 3) for delay in delays}) > 1
+
+
+def test_run_once_refreshes_and_warms_caches(tmp_path: Path) -> None:
+    db_path = tmp_path / "scheduled.db"
+    prepare_db(db_path, seeded=True).close()
+    warmed: list[dict[str, float]] = []
+    scheduler = RefreshScheduler(
+        SchedulerConfig(interval=60.0),
+        conn_factory=lambda: make_conn(db_path),
+        warm=lambda conn: warmed.append(warmup.warm_read_caches(conn)),
+    )
+
+    assert asyncio.run(scheduler.run_once()) is True
+
+    with closing(make_conn(db_path)) as conn:
+        status = etl_runner.get_last_status(conn)
+    assert status.state == "success"
+    assert status.updated_records > 0
+    assert len(warmed) == 1
+    assert set(warmed[0]) == set(warmup.warmers())
+
+
+def test_run_once_skips_while_previous_run_is_in_progress(tmp_path: Path) -> None:
+    db_path = tmp_path / "scheduled-skip.db"
+    prepare_db(db_path, seeded=True).close()
+    with closing(make_conn(db_path)) as conn:
+        in_flight = coalesce.claim_refresh(conn)
+    warmed: list[sqlite3.Connection] = []
+    scheduler = RefreshScheduler(
+        SchedulerConfig(interval=60.0),
+        conn_factory=lambda: make_conn(db_path),
+        warm=warmed.append,
+    )
+
+    assert asyncio.run(scheduler.run_once()) is False
+
+    assert scheduler.skipped_runs == 1
+    assert warmed == []
+    with closing(make_conn(db_path)) as conn:
+        runs = conn.execute("SELECT id, state FROM etl_runs").fetchall()
+    assert [tuple(row) for row in runs] == [(in_flight.run_id, "running")]
+
+
+def test_scheduler_loop_runs_on_cadence_and_stops_cleanly(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    db_path = tmp_path / "scheduled-loop.db"
+    prepare_db(db_path, seeded=True).close()
+    monkeypatch.setattr(etl_runner, "_load_run_etl", lambda: _fake_run_etl)
+    scheduler = RefreshScheduler(
+        SchedulerConfig(interval=0.01, jitter=0.005, shutdown_timeout=5.0),
+        conn_factory=lambda: make_conn(db_path),
+    )
+
+    async def scenario() -> None:
+        scheduler.start()
+        for _ in range(500):
+            if scheduler.completed_runs >= 2:
+                break
+            await asyncio.sleep(0.01)
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+
+    assert scheduler.completed_runs >= 2
+    with closing(make_conn(db_path)) as conn:
+        states = {row["state"] for row in conn.execute("SELECT state FROM etl_runs")}
+    assert states == {"success"}
+
+
+def test_stop_cancels_in_flight_run(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    db_path = tmp_path / "scheduled-stop.db"
+    prepare_db(db_path, seeded=True).close()
+    started = threading.Event()
+
+    def slow_run_etl(conn: sqlite3.Connection, *, data_loader: object | None = None) -> int:
+        started.set()
+        deadline = time.monotonic() + 5.0
+        while time.monotonic() < deadline:
+            context.check_cancelled()
+            time.sleep(0.01)
+        return 0
+
+    monkeypatch.setattr(etl_runner, "_load_run_etl", lambda: slow_run_etl)
+    scheduler = RefreshScheduler(
+        SchedulerConfig(interval=0.01, jitter=0.0, shutdown_timeout=5.0),
+        conn_factory=lambda: make_conn(db_path),
+    )
+
+    async def scenario() -> float:
+        scheduler.start()
+        await asyncio.to_thread(started.wait, 5.0)
+        began = time.monotonic()
+        await scheduler.stop()
+        return time.monotonic() - began
+
+    elapsed = asyncio.run(scenario())
+
+    assert elapsed < 4.0
+    with closing(make_conn(db_path)) as conn:
+        runs = conn.execute("SELECT state, last_error FROM etl_runs").fetchall()
+    assert [tuple(row) for row in runs] == [("failure", context.CANCELLED_MESSAGE)]
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from app import etl_runner
+from app import db, etl_runner
 
 from ._helpers import make_conn
 
@@ -31,6 +31,36 @@ def test_ensure_schema_backfills_missing_columns(tmp_path: Path) -> None:
         conn.close()
 
 
+def test_ensure_schema_adds_rss_columns_to_existing_stage_table(tmp_path: Path) -> None:
+    conn = make_conn(tmp_path / "stages.db")
+    try:
+        conn.execute(
+            """
+            CREATE TABLE etl_run_stages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id INTEGER NOT NULL,
+                seq INTEGER NOT NULL,
+                stage TEXT NOT NULL,
+                duration_ms REAL NOT NULL,
+                rows INTEGER NOT NULL,
+                rows_per_sec REAL,
+                peak_rss_kb INTEGER,
+                UNIQUE (run_id, seq)
+            )
+            """
+        )
+        conn.commit()
+
+        db.init_db(conn)
+
+        columns = {
+            row["name"] for row in conn.execute("PRAGMA table_info('etl_run_stages')").fetchall()
+        }
+        assert {"rss_start_kb", "rss_end_kb"}.issubset(columns)
+    finally:
+        conn.close()
+
+
 def test_insert_run_metadata_persists_defaults() -> None:
     from app import db
 
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+import pytest
+
+from app import etl
+from app.etl import sources
+
+from ._helpers import make_conn, prepare_db, seed_market_scopes, seed_theme_tokens
+
+NATIONAL_FEED: list[dict[str, object]] = [
+    {"crop_id": 1, "scope": "national", "week": "2024-W05", "avg_price": 220, "unit": "円/kg"},
+    {"crop_id": 2, "scope": "national", "week": "2024-W05", "avg_price": 180, "unit": "円/kg"},
+]
+CITY_FEED: list[dict[str, object]] = [
+    {"crop_id": 1, "scope": "city:tokyo", "week": "2024-W05", "avg_price": 24, "unit": "円/100g"},
+]
+
+
+def _prepare(db_path: Path) -> None:
+    with closing(prepare_db(db_path)) as conn:
+        seed_theme_tokens(
+            conn,
+            [("accent.national", "#22c55e", "#000000"), ("accent.tokyo", "#2563eb", "#ffffff")],
+        )
+        seed_market_scopes(
+            conn,
+            [
+                ("national", "全国平均", "Asia/Tokyo", 10, "accent.national"),
+                ("city:tokyo", "東京都中央卸売", "Asia/Tokyo", 20, "accent.tokyo"),
+            ],
+        )
+
+
+def _source_rows(conn: sqlite3.Connection) -> dict[str, sqlite3.Row]:
+    rows = conn.execute(
+        "SELECT source, records, rows, duration_ms, started_at, error FROM etl_run_sources"
+    ).fetchall()
+    return {str(row["source"]): row for row in rows}
+
+
+def test_registry_rejects_duplicate_sources() -> None:
+    registry = sources.SourceRegistry()
+    registry.register_loader("national", lambda: NATIONAL_FEED)
+    registry.register_loader("city", lambda: CITY_FEED)
+
+    with pytest.raises(sources.SourceRegistrationError):
+        registry.register_loader("city", lambda: [])
+
+    assert registry.names() == ("city", "national")
+    assert [source.name for source in registry.sources()] == ["city", "national"]
+    with pytest.raises(KeyError):
+        registry.get("missing")
+
+
+def test_sources_from_env_builds_feed_file_sources(tmp_path: Path) -> None:
+    value = os.pathsep.join([f"national={tmp_path / 'n.json'}", f"city={tmp_path / 'c.json'}"])
+
+    parsed = list(sources._sources_from_env(value))
+
+    assert [source.name for source in parsed] == ["national", "city"]
+    assert all(not source.io_bound for source in parsed)
+    with pytest.raises(ValueError):
+        list(sources._sources_from_env("broken"))
+
+
+def test_start_etl_job_ingests_sources_and_records_stats(tmp_path: Path) -> None:
+    db_path = tmp_path / "sources.db"
+    _prepare(db_path)
+
+    etl.start_etl_job(
+        conn_factory=lambda: make_conn(db_path),
+        sources=[
+            sources.EtlSource("national", lambda: NATIONAL_FEED),
+            sources.EtlSource("city", lambda: CITY_FEED),
+        ],
+        retry_delay=0,
+    )
+
+    with closing(make_conn(db_path)) as conn:
+        prices = conn.execute(
+            "SELECT crop_id, scope, avg_price FROM market_prices ORDER BY scope, crop_id"
+        ).fetchall()
+        assert [(row["crop_id"], row["scope"], row["avg_price"]) for row in prices] == [
+            (1, "city:tokyo", pytest.approx(240.0)),
+            (1, "national", pytest.approx(220.0)),
+            (2, "national", pytest.approx(180.0)),
+        ]
+        run = conn.execute("SELECT state, updated_records FROM etl_runs").fetchone()
+        assert (run["state"], run["updated_records"]) == ("success", 3)
+
+        stats = _source_rows(conn)
+        assert set(stats) == {"national", "city"}
+        assert (stats["national"]["records"], stats["national"]["rows"]) == (2, 2)
+        assert (stats["city"]["records"], stats["city"]["rows"]) == (1, 1)
+        assert all(row["duration_ms"] >= 0 for row in stats.values())
+        assert all(row["error"] is None for row in stats.values())
+
+
+def test_start_etl_job_fails_run_when_a_source_fails(tmp_path: Path) -> None:
+    db_path = tmp_path / "sources-failure.db"
+    _prepare(db_path)
+
+    def broken_loader() -> list[dict[str, object]]:
+        raise ValueError("feed unavailable")
+
+    with pytest.raises(sources.SourceIngestError, match="feed unavailable"):
+        etl.start_etl_job(
+            conn_factory=lambda: make_conn(db_path),
+            sources=[
+                sources.EtlSource("national", lambda: NATIONAL_FEED),
+                sources.EtlSource("city", broken_loader),
+            ],
+            retry_delay=0,
+        )
+
+    with closing(make_conn(db_path)) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM market_prices").fetchone()[0] == 0
+        run = conn.execute("SELECT state FROM etl_runs").fetchone()
+        assert run["state"] == "failure"
+        stats = _source_rows(conn)
+        assert stats["national"]["error"] is None
+        assert "feed unavailable" in str(stats["city"]["error"])
+
+
+def test_ingest_sources_runs_cpu_bound_sources_in_process_pool(tmp_path: Path) -> None:
+    national_path = tmp_path / "national.json"
+    city_path = tmp_path / "city.json"
+    national_path.write_text(json.dumps(NATIONAL_FEED), encoding="utf-8")
+    city_path.write_text(json.dumps(CITY_FEED), encoding="utf-8")
+
+    results = sources.ingest_sources(
+        [
+            sources.feed_file_source("national", national_path),
+            sources.feed_file_source("city", city_path),
+        ],
+        max_workers=2,
+    )
+
+    assert [result.name for result in results] == ["national", "city"]
+    assert [result.error for result in results] == [None, None]
+    assert [result.rows for result in results] == [2, 1]
+    assert results[1].market_rows[0][1:4] == ("city:tokyo", "2024-W05", pytest.approx(240.0))
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+from app import etl, etl_runner
+from app.etl_runner import context, status
+
+from ._helpers import make_conn, prepare_db
+
+FEED: list[dict[str, object]] = [
+    {"crop_id": 1, "week": "2024-W05", "avg_price": 220, "unit": "円/kg"},
+    {"crop_id": 2, "week": "2024-W05", "avg_price": 180, "unit": "円/kg"},
+]
+
+
+def _stage_rows(conn: sqlite3.Connection) -> list[sqlite3.Row]:
+    return conn.execute(
+        "SELECT run_id, seq, stage, duration_ms, rows, rows_per_sec, rss_start_kb, rss_end_kb"
+        " FROM etl_run_stages ORDER BY seq"
+    ).fetchall()
+
+
+def test_stage_records_timing_only_inside_active_run() -> None:
+    with context.stage("orphan") as timing:
+        timing.rows = 10
+    assert timing.duration_ms >= 0
+
+    run = context.RunContext(run_id=7)
+    with context.activate(run), context.stage("load") as timing:
+        timing.rows = 1000
+    assert [item.stage for item in run.stages] == ["load"]
+    assert run.stages[0].rows == 1000
+    assert context.StageTiming("idle").rows_per_sec is None
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc/self/statm")
+def test_stage_records_current_rss_at_start_and_end() -> None:
+    run = context.RunContext(run_id=7)
+    with context.activate(run), context.stage("load"):
+        # 64 MiB を書き込みで確保し、段階の前後で常駐量が増えたことを確かめる。
+        buffer = b"x" * (64 << 20)
+    timing = run.stages[0]
+    assert timing.rss_start_kb is not None and timing.rss_end_kb is not None
+    assert timing.rss_end_kb - timing.rss_start_kb >= 32 << 10
+    del buffer
+
+
+def test_start_etl_job_records_stage_timings(tmp_path: Path) -> None:
+    db_path = tmp_path / "stages.db"
+    prepare_db(db_path).close()
+
+    etl.start_etl_job(conn_factory=lambda: make_conn(db_path), data_loader=lambda: FEED)
+
+    conn = make_conn(db_path)
+    try:
+        rows = _stage_rows(conn)
+        assert [row["stage"] for row in rows] == [
+            "load",
+            "transform",
+            "validate",
+            "upsert",
+            "metadata_refresh",
+        ]
+        by_stage = {row["stage"]: row for row in rows}
+        assert by_stage["load"]["rows"] == 2
+        assert by_stage["upsert"]["rows"] == 2
+        assert by_stage["upsert"]["rows_per_sec"] > 0
+        assert all(row["duration_ms"] >= 0 for row in rows)
+
+        status = etl_runner.get_last_status(conn)
+        assert status.state == "success"
+        assert status.run_id == rows[0]["run_id"]
+        assert [stage.stage for stage in status.stages] == [row["stage"] for row in rows]
+    finally:
+        conn.close()
+
+
+def test_failed_run_keeps_completed_stage_timings(tmp_path: Path) -> None:
+    db_path = tmp_path / "stages-failure.db"
+    prepare_db(db_path).close()
+
+    with pytest.raises(ValueError, match="Unsupported unit"):
+        etl.start_etl_job(
+            conn_factory=lambda: make_conn(db_path),
+            data_loader=lambda: [{"crop_id": 1, "week": "2024-W05", "unit": "円/t"}],
+            max_retries=1,
+        )
+
+    conn = make_conn(db_path)
+    try:
+        assert [row["stage"] for row in _stage_rows(conn)] == ["load", "transform"]
+        runs = status.list_runs(conn, limit=5)
+        assert [run.state for run in runs] == ["failure"]
+        assert [stage.stage for stage in runs[0].stages] == ["load", "transform"]
+    finally:
+        conn.close()
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from app import db, etl
+from app.etl import staging
+
+from ._helpers import make_conn, prepare_crops, seed_market_scopes, seed_theme_tokens
+
+RECORDS: list[dict[str, object]] = [
+    {
+        "crop_id": 1,
+        "week": "2024-01-01",
+        "avg_price": 12,
+        "stddev": 0.8,
+        "unit": "円/100g",
+        "source": "market",
+    },
+    {
+        "crop_id": 1,
+        "scope": "national",
+        "week": "2024-W02",
+        "avg_price": 200,
+        "stddev": 10,
+        "unit": "円/kg",
+        "source": "market",
+    },
+    {
+        "crop_id": 2,
+        "scope": "city:tokyo",
+        "week": "2024-W02",
+        "avg_price": 30,
+        "stddev": 2,
+        "unit": "円/100g",
+        "source": "market",
+    },
+]
+
+
+def _prepare(conn: sqlite3.Connection) -> None:
+    db.init_db(conn)
+    prepare_crops(conn)
+    seed_theme_tokens(
+        conn,
+        [("accent.national", "#22c55e", "#000000"), ("accent.tokyo", "#2563eb", "#ffffff")],
+    )
+    seed_market_scopes(
+        conn,
+        [
+            ("national", "全国平均", "Asia/Tokyo", 10, "accent.national"),
+            ("city:tokyo", "東京都中央卸売", "Asia/Tokyo", 20, "accent.tokyo"),
+        ],
+    )
+
+
+def _snapshot(conn: sqlite3.Connection) -> tuple[list[tuple[object, ...]], ...]:
+    weekly = conn.execute(
+        "SELECT crop_id, week, avg_price, stddev, unit, source FROM price_weekly"
+        " ORDER BY crop_id, week"
+    ).fetchall()
+    market = conn.execute(
+        "SELECT crop_id, scope, week, avg_price, stddev, unit, source FROM market_prices"
+        " ORDER BY crop_id, scope, week"
+    ).fetchall()
+    return [tuple(row) for row in weekly], [tuple(row) for row in market]
+
+
+def test_staging_load_matches_upsert_load(tmp_path: Path) -> None:
+    upsert_conn = make_conn(tmp_path / "upsert.db")
+    staging_conn = make_conn(tmp_path / "staging.db")
+    try:
+        _prepare(upsert_conn)
+        _prepare(staging_conn)
+
+        upserted = etl.run_etl(upsert_conn, data_loader=lambda: RECORDS, load_mode="upsert")
+        staged = etl.run_etl(staging_conn, data_loader=lambda: RECORDS, load_mode="staging")
+
+        assert upserted == staged == len(RECORDS)
+        assert _snapshot(staging_conn) == _snapshot(upsert_conn)
+
+        cache_row = staging_conn.execute(
+            "SELECT payload FROM metadata_cache WHERE cache_key = 'market_metadata'"
+        ).fetchone()
+        assert cache_row is not None
+        payload = json.loads(str(cache_row["payload"]))
+        tokyo = next(item for item in payload["markets"] if item["scope"] == "city:tokyo")
+        assert tokyo["effective_from"] == "2024-W02"
+
+        leftovers = staging_conn.execute(
+            "SELECT (SELECT COUNT(*) FROM temp.etl_stage_price_weekly)"
+            " + (SELECT COUNT(*) FROM temp.etl_stage_market_prices)"
+        ).fetchone()
+        assert leftovers[0] == 0
+    finally:
+        upsert_conn.close()
+        staging_conn.close()
+
+
+def test_staging_load_updates_existing_rows(tmp_path: Path) -> None:
+    conn = make_conn(tmp_path / "staging-update.db")
+    try:
+        _prepare(conn)
+        conn.execute(
+            "INSERT INTO price_weekly (crop_id, week, avg_price, stddev, unit, source)"
+            " VALUES (1, '2024-W01', 50.0, 5.0, '円/kg', 'seed')"
+        )
+        conn.commit()
+
+        etl.run_etl(conn, data_loader=lambda: RECORDS[:1], load_mode="staging")
+
+        row = conn.execute(
+            "SELECT avg_price, source FROM price_weekly WHERE crop_id = 1 AND week = '2024-W01'"
+        ).fetchone()
+        assert (row["avg_price"], row["source"]) == (pytest.approx(120.0), "market")
+        count = conn.execute("SELECT COUNT(*) FROM price_weekly").fetchone()
+        assert count[0] == 1
+    finally:
+        conn.close()
+
+
+def test_staging_load_rejects_unknown_crops_without_touching_live_tables(
+    tmp_path: Path,
+) -> None:
+    conn = make_conn(tmp_path / "staging-reject.db")
+    try:
+        _prepare(conn)
+        records = [*RECORDS, {"crop_id": 99, "week": "2024-W05", "avg_price": 1}]
+
+        with pytest.raises(ValueError, match="Unknown crop_id"):
+            etl.run_etl(conn, data_loader=lambda: records, load_mode="staging")
+
+        assert _snapshot(conn) == ([], [])
+        assert (
+            conn.execute("SELECT COUNT(*) FROM metadata_cache").fetchone()[0] == 0
+        ), "metadata cache must not be refreshed for a rejected batch"
+    finally:
+        conn.close()
+
+
+def test_run_etl_reads_load_mode_from_environment(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    conn = make_conn(tmp_path / "staging-env.db")
+    try:
+        _prepare(conn)
+        monkeypatch.setenv("PLANTING_ETL_LOAD_MODE", "bulk")
+
+        with pytest.raises(ValueError, match="Unsupported ETL load mode"):
+            etl.run_etl(conn, data_loader=lambda: RECORDS)
+
+        monkeypatch.setenv("PLANTING_ETL_LOAD_MODE", "staging")
+        assert etl.run_etl(conn, data_loader=lambda: RECORDS) == len(RECORDS)
+    finally:
+        conn.close()
+
+
+def test_merge_via_staging_refuses_pending_transaction(tmp_path: Path) -> None:
+    conn = make_conn(tmp_path / "staging-pending.db")
+    try:
+        _prepare(conn)
+        conn.execute("INSERT INTO crops (id, name, category) VALUES (3, 'C', 'leaf')")
+
+        with pytest.raises(RuntimeError, match="open transaction"):
+            staging.merge_via_staging(conn, [(1, "2024-W01", 1.0, None, "円/kg", "feed")], [])
+
+        conn.rollback()
+        assert conn.execute("SELECT COUNT(*) FROM crops").fetchone()[0] == 2
+        assert _snapshot(conn) == ([], [])
+    finally:
+        conn.close()
+
+
+def test_merge_via_staging_clears_stage_and_keeps_original_error(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    conn = make_conn(tmp_path / "staging-cleanup.db")
+    try:
+        _prepare(conn)
+        rows = [(1, "2024-W01", 1.0, None, "円/kg", "feed")]
+
+        def fail(_: sqlite3.Connection) -> None:
+            raise ValueError("finalize failed")
+
+        with pytest.raises(ValueError, match="finalize failed"):
+            staging.merge_via_staging(conn, rows, [], finalize=fail)
+        assert conn.execute("SELECT COUNT(*) FROM temp.etl_stage_price_weekly").fetchone()[0] == 0
+        assert _snapshot(conn) == ([], [])
+
+        def broken_clear(_: sqlite3.Connection) -> None:
+            raise sqlite3.OperationalError("disk I/O error")
+
+        monkeypatch.setattr(staging, "_clear_staging_tables", broken_clear)
+        with pytest.raises(ValueError, match="finalize failed"):
+            staging.merge_via_staging(conn, rows, [], finalize=fail)
+        assert not conn.in_transaction
+    finally:
+        conn.close()
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import closing
+from pathlib import Path
+
+import pytest
+
+from app import db, etl, etl_runner
+from app.etl_runner import coalesce, status
+
+from ._helpers import make_conn, prepare_db
+
+RECORDS: list[dict[str, object]] = [
+    {"crop_id": 1, "week": "2024-W01", "avg_price": 120, "source": "feed"},
+]
+
+
+@pytest.fixture(autouse=True)
+def _clear_status_cache() -> Iterator[None]:
+    status.invalidate_status()
+    yield
+    status.invalidate_status()
+
+
+def test_run_history_query_is_served_by_started_at_index(tmp_path: Path) -> None:
+    with closing(prepare_db(tmp_path / "plan.db")) as conn:
+        plan = " ".join(
+            str(row[3]) for row in conn.execute("EXPLAIN QUERY PLAN " + status._RUNS_SQL, (1,))
+        )
+
+    assert "idx_etl_runs_started_at" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_init_db_migrates_legacy_run_table_once(tmp_path: Path) -> None:
+    conn = make_conn(tmp_path / "legacy.db")
+    try:
+        conn.execute(
+            """
+            CREATE TABLE etl_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_at TEXT NOT NULL,
+                status TEXT NOT NULL,
+                updated_records INTEGER NOT NULL,
+                error_message TEXT
+            )
+            """
+        )
+        conn.execute(
+            "INSERT INTO etl_runs (run_at, status, updated_records)"
+            " VALUES ('2024-01-01T00:00:00Z', 'success', 3)"
+        )
+        conn.commit()
+
+        db.init_db(conn)
+
+        last = etl_runner.get_last_status(conn)
+        assert (last.state, last.started_at, last.updated_records) == (
+            "success",
+            "2024-01-01T00:00:00Z",
+            3,
+        )
+    finally:
+        conn.close()
+
+
+def test_last_status_cache_tracks_new_runs_and_runner_updates(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("PLANTING_REFRESH_STATUS_TTL", "60")
+    db_path = tmp_path / "cache.db"
+    with closing(prepare_db(db_path)) as conn:
+        assert etl_runner.get_last_status(conn).state == "stale"
+
+        run_id = coalesce.claim_refresh(conn).run_id
+        # 新しい実行は MAX(id) の変化で即座に反映される。
+        assert etl_runner.get_last_status(conn).state == "running"
+
+        conn.execute("UPDATE etl_runs SET state = 'failure' WHERE id = ?", (run_id,))
+        conn.commit()
+        # 同じ行の書き換えは TTL の間キャッシュが優先される。
+        assert etl_runner.get_last_status(conn).state == "running"
+        conn.execute("UPDATE etl_runs SET state = 'running' WHERE id = ?", (run_id,))
+        conn.commit()
+
+    etl.start_etl_job(
+        conn_factory=lambda: make_conn(db_path), data_loader=lambda: RECORDS, run_id=run_id
+    )
+
+    with closing(make_conn(db_path)) as conn:
+        last = etl_runner.get_last_status(conn)
+        assert (last.run_id, last.state, last.updated_records) == (run_id, "success", 1)
+
+
+def test_finished_runs_are_compacted_beyond_retention(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("PLANTING_ETL_RUN_RETENTION", "2")
+    db_path = tmp_path / "retention.db"
+    prepare_db(db_path).close()
+
+    for _ in range(4):
+        etl.start_etl_job(conn_factory=lambda: make_conn(db_path), data_loader=lambda: RECORDS)
+
+    with closing(make_conn(db_path)) as conn:
+        run_ids = [row[0] for row in conn.execute("SELECT id FROM etl_runs ORDER BY id")]
+        assert run_ids == [3, 4]
+        stage_runs = {row[0] for row in conn.execute("SELECT run_id FROM etl_run_stages")}
+        assert stage_runs == {3, 4}
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+
+import pytest
+from fastapi import BackgroundTasks
+
+from app import etl_runner, services
+from app.etl_runner import coalesce, context, jobs, worker
+
+from ._helpers import dead_pid, make_conn, prepare_db
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+def _queue_run(db_path: Path) -> int:
+    with closing(make_conn(db_path)) as conn:
+        claim = coalesce.claim_refresh(conn, idempotency_key="worker-test")
+        jobs.enqueue_job(conn, claim.run_id)
+        return claim.run_id
+
+
+def _job_states(db_path: Path) -> list[tuple[int, str]]:
+    with closing(make_conn(db_path)) as conn:
+        rows = conn.execute("SELECT run_id, state FROM etl_jobs ORDER BY id").fetchall()
+        return [(int(row["run_id"]), str(row["state"])) for row in rows]
+
+
+def test_start_refresh_enqueues_job_in_process_mode(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    db_path = tmp_path / "enqueue.db"
+    prepare_db(db_path, seeded=True).close()
+    monkeypatch.setenv("PLANTING_ETL_EXECUTOR", "process")
+    background = BackgroundTasks()
+
+    with closing(make_conn(db_path)) as conn:
+        response = services.start_refresh(background, conn=conn, idempotency_key="k")
+        run_id = conn.execute("SELECT id FROM etl_runs").fetchone()["id"]
+
+    assert response.state == "running"
+    assert background.tasks == []
+    assert _job_states(db_path) == [(run_id, "queued")]
+
+    monkeypatch.setenv("PLANTING_ETL_EXECUTOR", "threads")
+    with pytest.raises(ValueError, match="Unsupported ETL executor"):
+        jobs.resolve_executor()
+
+
+def test_run_worker_drains_queue_and_reports_to_etl_runs(tmp_path: Path) -> None:
+    db_path = tmp_path / "worker.db"
+    prepare_db(db_path, seeded=True).close()
+    run_id = _queue_run(db_path)
+
+    processed = worker.run_worker(conn_factory=lambda: make_conn(db_path), once=True)
+
+    assert processed == 1
+    assert _job_states(db_path) == [(run_id, "done")]
+    with closing(make_conn(db_path)) as conn:
+        status = etl_runner.get_last_status(conn)
+    assert (status.run_id, status.state) == (run_id, "success")
+    assert status.updated_records > 0
+    assert [stage.stage for stage in status.stages][:2] == ["load", "transform"]
+
+
+def test_stage_progress_is_visible_while_run_is_in_flight(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    db_path = tmp_path / "progress.db"
+    prepare_db(db_path, seeded=True).close()
+    run_id = _queue_run(db_path)
+    observed: list[list[str]] = []
+
+    def fake_run_etl(conn: sqlite3.Connection, *, data_loader: object | None = None) -> int:
+        with context.stage("load") as timing:
+            timing.rows = 3
+        with closing(make_conn(db_path)) as reader:
+            rows = reader.execute(
+                "SELECT stage FROM etl_run_stages WHERE run_id = ?", (run_id,)
+            ).fetchall()
+            observed.append([row["stage"] for row in rows])
+        return 3
+
+    monkeypatch.setattr(etl_runner, "_load_run_etl", lambda: fake_run_etl)
+
+    worker.run_worker(conn_factory=lambda: make_conn(db_path), once=True)
+
+    assert observed == [["load"]]
+
+
+def test_run_worker_requeues_jobs_left_by_crashed_worker(tmp_path: Path) -> None:
+    db_path = tmp_path / "requeue.db"
+    prepare_db(db_path, seeded=True).close()
+    run_id = _queue_run(db_path)
+    with closing(make_conn(db_path)) as conn:
+        # リースは新しいままでも、同じホストで PID が消えていれば放棄とみなす。
+        assert jobs.claim_next_job(conn, f"{socket.gethostname()}:{dead_pid()}") is not None
+        assert jobs.claim_next_job(conn, "other:2") is None
+
+    worker.run_worker(conn_factory=lambda: make_conn(db_path), once=True)
+
+    assert _job_states(db_path) == [(run_id, "done")]
+
+
+def test_requeue_only_takes_remote_jobs_whose_lease_expired(tmp_path: Path) -> None:
+    db_path = tmp_path / "lease.db"
+    prepare_db(db_path, seeded=True).close()
+    run_id = _queue_run(db_path)
+    with closing(make_conn(db_path)) as conn:
+        job = jobs.claim_next_job(conn, "other-host:1")
+        assert job is not None
+
+        assert jobs.requeue_abandoned_jobs(conn) == 0
+        assert _job_states(db_path) == [(run_id, "running")]
+
+        conn.execute(
+            "UPDATE etl_jobs SET claimed_at = ? WHERE id = ?", ("2024-01-01T00:00:00Z", job.id)
+        )
+        conn.commit()
+        assert jobs.requeue_abandoned_jobs(conn) == 1
+    assert _job_states(db_path) == [(run_id, "queued")]
+
+
+def test_second_worker_does_not_reclaim_job_in_flight(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    db_path = tmp_path / "concurrent.db"
+    prepare_db(db_path, seeded=True).close()
+    run_id = _queue_run(db_path)
+    started = threading.Event()
+    release = threading.Event()
+    calls: list[int] = []
+
+    def slow_run_etl(conn: sqlite3.Connection, *, data_loader: object | None = None) -> int:
+        calls.append(run_id)
+        started.set()
+        release.wait(10)
+        return 0
+
+    monkeypatch.setattr(etl_runner, "_load_run_etl", lambda: slow_run_etl)
+    first = threading.Thread(
+        target=worker.run_worker,
+        kwargs={"conn_factory": lambda: make_conn(db_path), "once": True, "lease_seconds": 2.0},
+    )
+    first.start()
+    try:
+        assert started.wait(10)
+        # ハートビートが無ければリース (2 秒) が切れる時間まで待ってから 2 台目を起動する。
+        time.sleep(2.5)
+        processed = worker.run_worker(
+            conn_factory=lambda: make_conn(db_path), once=True, lease_seconds=2.0
+        )
+        assert processed == 0
+        assert _job_states(db_path) == [(run_id, "running")]
+    finally:
+        release.set()
+        first.join(10)
+
+    assert calls == [run_id]
+    assert _job_states(db_path) == [(run_id, "done")]
+
+
+def test_worker_module_runs_queued_job_in_separate_process(tmp_path: Path) -> None:
+    db_path = tmp_path / "subprocess.db"
+    prepare_db(db_path, seeded=True).close()
+    run_id = _queue_run(db_path)
+
+    env = dict(os.environ, PLANTING_DB_PATH=str(db_path))
+    completed = subprocess.run(
+        [sys.executable, "-m", "app.etl_runner.worker", "--once", "--nice", "0"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        timeout=60,
+        check=False,
+    )
+
+    assert completed.returncode == 0, completed.stderr.decode()
+    assert _job_states(db_path) == [(run_id, "done")]
+    with closing(make_conn(db_path)) as conn:
+        state = conn.execute("SELECT state FROM etl_runs WHERE id = ?", (run_id,)).fetchone()
+    assert state["state"] == "success"
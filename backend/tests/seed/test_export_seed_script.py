@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import datetime as dt
+import hashlib
 import importlib
+import lzma
 import sqlite3
 import sys
 from pathlib import Path
@@ -108,3 +110,35 @@ def test_export_seed_script_writes_metadata(
     assert rows["data_fetched_at"] == "2024-01-02"
     assert rows["git_commit"] == "deadbeef"
     assert rows["exported_at"] == fake_now.isoformat()
+
+
+def test_export_seed_is_compacted_and_byte_reproducible(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, sample_payload: SeedPayload
+) -> None:
+    monkeypatch.setattr(export_seed, "load_seed_payload", lambda *, data_dir=None: sample_payload)
+    monkeypatch.setattr(export_seed, "_resolve_git_commit", lambda: "deadbeef")
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1704164645")
+
+    outputs = [tmp_path / name / "seed.db" for name in ("first", "second")]
+    for day, output in enumerate(outputs, start=10):
+        # 実行日が変わっても data_fetched_at は SOURCE_DATE_EPOCH の日付になる。
+        monkeypatch.setattr(export_seed, "_today", lambda day=day: dt.date(2024, 3, day))
+        assert export_seed.main(["--output", str(output)]) == 0
+
+    first, second = outputs
+    assert first.read_bytes() == second.read_bytes()
+    assert lzma.decompress((tmp_path / "first" / "seed.db.xz").read_bytes()) == first.read_bytes()
+    checksums = (tmp_path / "first" / "seed.db.sha256").read_text(encoding="utf-8")
+    assert checksums == (tmp_path / "second" / "seed.db.sha256").read_text(encoding="utf-8")
+    assert checksums.splitlines()[0] == f"{hashlib.sha256(first.read_bytes()).hexdigest()}  seed.db"
+    assert not (tmp_path / "first" / "seed.db.build").exists()
+
+    conn = sqlite3.connect(first)
+    try:
+        assert conn.execute("PRAGMA page_size").fetchone()[0] == export_seed.DEFAULT_PAGE_SIZE
+        assert conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0] > 0
+        metadata = dict(conn.execute("SELECT key, value FROM metadata"))
+    finally:
+        conn.close()
+    assert metadata["exported_at"] == "2024-01-02T03:04:05+00:00"
+    assert metadata["data_fetched_at"] == "2024-01-02"
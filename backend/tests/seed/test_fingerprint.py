@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+import shutil
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from app import db, seed
+from app.seed.data_loader import DEFAULT_DATA_DIR
+
+
+@pytest.fixture()
+def data_dir(tmp_path: Path) -> Path:
+    target = tmp_path / "data"
+    shutil.copytree(DEFAULT_DATA_DIR, target)
+    return target
+
+
+@pytest.fixture()
+def conn(tmp_path: Path) -> sqlite3.Connection:
+    connection = sqlite3.connect(tmp_path / "seed.db")
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA foreign_keys = ON")
+    db.init_db(connection)
+    yield connection
+    connection.close()
+
+
+def _forbid_writes(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(*_: Any, **__: Any) -> None:
+        raise AssertionError("seed payload must not be rewritten")
+
+    monkeypatch.setattr(seed, "load_seed_payload", fail)
+    monkeypatch.setattr(seed, "write_seed_payload", fail)
+
+
+def test_seed_if_changed_skips_unchanged_inputs(
+    conn: sqlite3.Connection, data_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    assert seed.seed_if_changed(conn, data_dir) is True
+    assert seed.read_seed_fingerprint(conn) == seed.seed_fingerprint(data_dir)
+    crops = conn.execute("SELECT COUNT(*) FROM crops").fetchone()[0]
+    assert crops > 0
+
+    _forbid_writes(monkeypatch)
+    assert seed.seed_if_changed(conn, data_dir) is False
+    assert conn.execute("SELECT COUNT(*) FROM crops").fetchone()[0] == crops
+
+
+def test_seed_if_changed_reseeds_when_inputs_change(
+    conn: sqlite3.Connection, data_dir: Path
+) -> None:
+    seed.seed_if_changed(conn, data_dir)
+    before = seed.read_seed_fingerprint(conn)
+
+    crops_path = data_dir / "crops.json"
+    crops = json.loads(crops_path.read_text(encoding="utf-8"))
+    crops[0]["name"] = "改名した作物"
+    crops_path.write_text(json.dumps(crops, ensure_ascii=False), encoding="utf-8")
+
+    assert seed.seed_if_changed(conn, data_dir) is True
+    assert seed.read_seed_fingerprint(conn) != before
+    row = conn.execute("SELECT name FROM crops WHERE id = ?", (crops[0]["id"],)).fetchone()
+    assert row["name"] == "改名した作物"
+
+
+def test_seed_if_changed_reseeds_emptied_database(conn: sqlite3.Connection, data_dir: Path) -> None:
+    seed.seed_if_changed(conn, data_dir)
+    conn.execute("DELETE FROM crops")
+    conn.commit()
+
+    assert seed.seed_if_changed(conn, data_dir) is True
+    assert conn.execute("SELECT COUNT(*) FROM crops").fetchone()[0] > 0
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import importlib
+import sqlite3
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+import pytest
+
+from app import db, dependencies, seed
+from app.seed import data_loader
+
+ROOT_DIR = Path(__file__).resolve().parents[3]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+export_seed: ModuleType = importlib.import_module("scripts.export_seed")
+
+
+@pytest.fixture()
+def snapshot_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("PLANTING_SCHEMA_VERSION", "schema-7")
+    monkeypatch.setattr(export_seed, "_resolve_git_commit", lambda: "deadbeef")
+    output = tmp_path / "seed-20240102.db"
+    assert export_seed.main(["--output", str(output), "--data-date", "2024-01-02"]) == 0
+    return output
+
+
+def _forbid_json_seed(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(*_: Any, **__: Any) -> None:
+        raise AssertionError("JSON seed must not be loaded")
+
+    monkeypatch.setattr(seed, "load_seed_payload", fail)
+
+
+def test_prepare_database_installs_configured_snapshot(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, snapshot_path: Path
+) -> None:
+    monkeypatch.setattr(db, "DATABASE_FILE", tmp_path / "planting.db")
+    monkeypatch.setenv("PLANTING_SEED_SNAPSHOT", str(snapshot_path))
+    monkeypatch.setenv("PLANTING_GIT_COMMIT", "deadbeef")
+    _forbid_json_seed(monkeypatch)
+
+    dependencies.prepare_database()
+    # 二回目の起動は指紋一致で JSON を読まない。
+    monkeypatch.delenv("PLANTING_SEED_SNAPSHOT")
+    dependencies.prepare_database()
+
+    conn = sqlite3.connect(tmp_path / "planting.db")
+    try:
+        crops = conn.execute("SELECT COUNT(*) FROM crops").fetchone()[0]
+        metadata = dict(conn.execute("SELECT key, value FROM metadata"))
+    finally:
+        conn.close()
+    assert crops == len(data_loader.load_seed_payload().crops)
+    assert metadata["git_commit"] == "deadbeef"
+    assert metadata["schema_version"] == "schema-7"
+
+
+def test_snapshot_with_mismatched_schema_falls_back_to_json_seed(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    snapshot_path: Path,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    monkeypatch.setenv("PLANTING_SCHEMA_VERSION", "schema-8")
+    conn = sqlite3.connect(tmp_path / "fresh.db")
+    try:
+        with pytest.raises(seed.SnapshotError, match="schema_version"):
+            seed.install_snapshot(conn, snapshot_path)
+
+        monkeypatch.setenv("PLANTING_SEED_SNAPSHOT", str(snapshot_path))
+        assert seed.install_configured_snapshot(conn) is False
+    finally:
+        conn.close()
+    assert "falling back to JSON seed" in caplog.text
+
+
+def test_snapshot_with_unknown_schema_version_is_checked_against_running_schema(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.delenv("PLANTING_SCHEMA_VERSION", raising=False)
+    monkeypatch.delenv("VITE_SCHEMA_VERSION", raising=False)
+    monkeypatch.setattr(export_seed, "_resolve_git_commit", lambda: "deadbeef")
+    output = tmp_path / "seed-unknown.db"
+    assert export_seed.main(["--output", str(output), "--data-date", "2024-01-02"]) == 0
+    assert seed.snapshot.verify_snapshot(output)["schema_version"] == "unknown"
+
+    # 古いビルドの出力を模して列を落とす。バージョンは両側とも "unknown" のまま。
+    conn = sqlite3.connect(output)
+    try:
+        conn.execute("ALTER TABLE etl_runs DROP COLUMN owner")
+        conn.commit()
+    finally:
+        conn.close()
+
+    with pytest.raises(seed.SnapshotError, match="columns do not match.*etl_runs"):
+        seed.snapshot.verify_snapshot(output)
+
+
+def test_snapshot_is_not_installed_over_existing_data(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, snapshot_path: Path
+) -> None:
+    conn = sqlite3.connect(tmp_path / "live.db")
+    try:
+        db.init_db(conn)
+        conn.execute("INSERT INTO crops (id, name, category) VALUES (99, 'live', 'leaf')")
+        conn.commit()
+
+        assert seed.install_snapshot(conn, snapshot_path) is False
+        assert conn.execute("SELECT id FROM crops").fetchall() == [(99,)]
+    finally:
+        conn.close()
@@ -1,15 +1,22 @@
 from __future__ import annotations
 
+import sqlite3
 from unittest.mock import MagicMock
 
 import pytest
 
+from app import db
 from app.seed import crops_writer, writers
 from app.utils_week import iso_week_from_int
 
 
 def _executed_calls(conn: MagicMock) -> list[tuple[str, tuple[object, ...]]]:
-    return [call.args for call in conn.execute.call_args_list]
+    return [
+        (sql, params)
+        for call in conn.executemany.call_args_list
+        for sql, rows in [call.args]
+        for params in rows
+    ]
 
 
 def test_write_crops_normalizes_category_and_converts_market_units() -> None:
@@ -45,17 +52,16 @@ def test_write_crops_normalizes_category_and_converts_market_units() -> None:
 
     executed = _executed_calls(conn)
 
-    assert (
-        "INSERT OR IGNORE INTO crops (id, name, category) VALUES (?, ?, ?)",
-        (101, "Komatsuna", "leaf"),
-    ) in executed
-    assert (
-        "UPDATE crops SET name = ?, category = ? WHERE id = ?",
-        ("Komatsuna", "leaf", 101),
-    ) in executed
+    assert any(
+        sql.startswith("INSERT INTO crops")
+        and "ON CONFLICT(id) DO UPDATE" in sql
+        and params == (101, "Komatsuna", "leaf")
+        for sql, params in executed
+    )
 
     assert any(
-        sql.startswith("INSERT OR REPLACE INTO price_weekly")
+        sql.startswith("INSERT INTO price_weekly")
+        and "DO UPDATE" in sql
         and params
         == (
             101,
@@ -69,7 +75,8 @@ def test_write_crops_normalizes_category_and_converts_market_units() -> None:
     )
 
     assert any(
-        sql.startswith("INSERT OR REPLACE INTO market_prices")
+        sql.startswith("INSERT INTO market_prices")
+        and "DO UPDATE" in sql
         and params
         == (
             101,
@@ -93,3 +100,34 @@ def test_writers_facade_calls_crops_writer(monkeypatch: pytest.MonkeyPatch) -> N
     writers.write_crops(conn, crops)  # type: ignore[arg-type]
 
     stub.assert_called_once_with(conn, crops)
+
+
+def test_write_crops_upserts_in_place_and_skips_name_collisions() -> None:
+    conn = sqlite3.connect(":memory:")
+    db.init_db(conn)
+    crops_writer.write_crops(
+        conn,
+        [
+            {
+                "id": 1,
+                "name": "Kale",
+                "category": "leaf",
+                "price_weekly": [{"week": 202301, "price": 100}],
+            }
+        ],
+    )
+    crops_writer.write_crops(
+        conn,
+        [
+            {
+                "id": 1,
+                "name": "Kale",
+                "category": "Root",
+                "price_weekly": [{"week": 202301, "price": 120}],
+            },
+            {"id": 2, "name": "Kale", "category": "leaf"},
+        ],
+    )
+
+    assert conn.execute("SELECT id, name, category FROM crops").fetchall() == [(1, "Kale", "root")]
+    assert conn.execute("SELECT id, avg_price FROM price_weekly").fetchall() == [(1, 120.0)]
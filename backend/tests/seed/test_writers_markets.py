@@ -1,14 +1,21 @@
 from __future__ import annotations
 
+import sqlite3
 from unittest.mock import MagicMock
 
 import pytest
 
+from app import db
 from app.seed import markets_writer, write_seed_payload, writers
 
 
 def _executed_calls(conn: MagicMock) -> list[tuple[str, tuple[object, ...]]]:
-    return [call.args for call in conn.execute.call_args_list]
+    return [
+        (sql, params)
+        for call in conn.executemany.call_args_list
+        for sql, rows in [call.args]
+        for params in rows
+    ]
 
 
 def test_write_market_scopes_applies_defaults() -> None:
@@ -26,7 +33,8 @@ def test_write_market_scopes_applies_defaults() -> None:
     executed = _executed_calls(conn)
 
     assert any(
-        sql.startswith("INSERT OR REPLACE INTO market_scopes")
+        sql.startswith("INSERT INTO market_scopes")
+        and "ON CONFLICT(scope) DO UPDATE" in sql
         and params == ("pref:kanagawa", "神奈川", "Asia/Tokyo", 100, "accent.kanagawa")
         for sql, params in executed
     )
@@ -91,3 +99,24 @@ def test_write_seed_payload_delegates_market_sections(monkeypatch: pytest.Monkey
     stub_crops.assert_called_once_with(conn, crops)
     stub_price.assert_called_once_with(conn, price_samples)
     stub_growth.assert_called_once_with(conn, growth_days)
+
+
+def test_rewriting_market_scopes_keeps_categories_and_sample_prices_do_not_override() -> None:
+    conn = sqlite3.connect(":memory:")
+    conn.execute("PRAGMA foreign_keys = ON")
+    db.init_db(conn)
+    markets_writer.write_theme_tokens(conn, [{"token": "accent.x", "hex_color": "#000000"}])
+    scope = {"scope": "national", "display_name": "全国", "theme_token": "accent.x"}
+    markets_writer.write_market_scopes(conn, [scope])
+    markets_writer.write_market_scope_categories(conn, [{"scope": "national", "category": "leaf"}])
+    markets_writer.write_market_scopes(conn, [{**scope, "display_name": "全国平均"}])
+
+    assert conn.execute("SELECT display_name FROM market_scopes").fetchall() == [("全国平均",)]
+    assert conn.execute("SELECT COUNT(*) FROM market_scope_categories").fetchone() == (1,)
+
+    conn.execute("INSERT INTO crops (id, name, category) VALUES (1, 'Kale', 'leaf')")
+    conn.execute(
+        "INSERT INTO price_weekly (crop_id, week, avg_price, source) VALUES (1, '2023-W01', 99, 'x')"
+    )
+    markets_writer.write_price_samples(conn, [{"crop_id": 1, "week": "2023-W01", "avg_price": 1}])
+    assert conn.execute("SELECT avg_price FROM price_weekly").fetchall() == [(99.0,)]
@@ -86,6 +86,8 @@ def test_init_db_creates_expected_tables(tmp_path: Path, monkeypatch: pytest.Mon
             "started_at",
             "finished_at",
             "last_error",
+            "heartbeat_at",
+            "owner",
         ]
     finally:
         conn.close()
@@ -180,15 +180,15 @@ def test_run_etl_invokes_great_expectations_validation(
 
         captured: dict[str, object] = {}
 
-        def fake_validate(
+        def fake_partition(
             conn_param: sqlite3.Connection,
             dataset: list[dict[str, object]],
-        ) -> bool:
+        ) -> etl.expectations.ValidationResult:
             captured["conn"] = conn_param
             captured["dataset"] = dataset
-            return True
+            return etl.expectations.ValidationResult(valid_indexes=list(range(len(dataset))))
 
-        monkeypatch.setattr(etl.expectations, "validate_market_prices", fake_validate)
+        monkeypatch.setattr(etl.expectations, "partition_market_prices", fake_partition)
 
         records = [
             {
@@ -244,10 +244,10 @@ def test_run_etl_logs_and_continues_when_validation_fails(
         )
         conn.commit()
 
-        def failing_validate(*_: object, **__: object) -> bool:
+        def failing_partition(*_: object, **__: object) -> etl.expectations.ValidationResult:
             raise RuntimeError("boom")
 
-        monkeypatch.setattr(etl.expectations, "validate_market_prices", failing_validate)
+        monkeypatch.setattr(etl.expectations, "partition_market_prices", failing_partition)
 
         caplog.set_level("WARNING")
 
@@ -268,13 +268,13 @@ def test_run_etl_logs_and_continues_when_validation_fails(
         assert "市場メタデータ検証の失敗" in caplog.text
         rows = conn.execute("SELECT scope, week FROM market_prices").fetchall()
         assert [(row["scope"], row["week"]) for row in rows] == [("national", "2024-W05")]
+        quarantined = conn.execute("SELECT COUNT(*) FROM etl_quarantine").fetchone()
+        assert quarantined[0] == 0
     finally:
         conn.close()
 
 
-def test_run_etl_filters_city_scopes_when_validation_rejects(
-    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
-) -> None:
+def test_run_etl_quarantines_invalid_rows_and_loads_valid_city_rows(tmp_path: Path) -> None:
     conn = make_conn(tmp_path / "market-validation-reject.db")
     try:
         db.init_db(conn)
@@ -302,18 +302,6 @@ def test_run_etl_filters_city_scopes_when_validation_rejects(
         )
         conn.commit()
 
-        captured: dict[str, object] = {}
-
-        def fake_validate(
-            conn_param: sqlite3.Connection,
-            dataset: list[dict[str, object]],
-        ) -> bool:
-            captured["conn"] = conn_param
-            captured["dataset"] = dataset
-            return False
-
-        monkeypatch.setattr(etl.expectations, "validate_market_prices", fake_validate)
-
         records = [
             {
                 "crop_id": 1,
@@ -333,34 +321,93 @@ def test_run_etl_filters_city_scopes_when_validation_rejects(
                 "unit": "円/kg",
                 "source": "test",
             },
+            {
+                "crop_id": 2,
+                "scope": "city:osaka",
+                "week": "2024-W05",
+                "avg_price": 2_000_000,
+                "stddev": 12,
+                "unit": "円/kg",
+                "source": "test",
+            },
+            {
+                "crop_id": 2,
+                "scope": "city:tokyo",
+                "week": "2024-W05",
+                "avg_price": -1,
+                "stddev": 1,
+                "unit": "円/kg",
+                "source": "test",
+            },
         ]
 
         updated = etl.run_etl(conn, data_loader=lambda: records)
-        assert updated == 1
-        assert captured["conn"] is conn
-        dataset = captured["dataset"]
-        assert isinstance(dataset, list)
-        assert sorted(item["scope"] for item in dataset) == ["city:tokyo", "national"]
+        assert updated == 2
 
         rows = conn.execute(
             "SELECT scope, week, avg_price FROM market_prices ORDER BY scope"
         ).fetchall()
         assert [(row["scope"], row["week"], row["avg_price"]) for row in rows] == [
+            ("city:tokyo", "2024-W05", pytest.approx(330.0)),
             ("national", "2024-W05", pytest.approx(220.0)),
         ]
 
+        quarantined = conn.execute(
+            "SELECT run_id, crop_id, scope, week, payload, reason"
+            " FROM etl_quarantine ORDER BY scope"
+        ).fetchall()
+        assert [(row["crop_id"], row["scope"], row["week"]) for row in quarantined] == [
+            (2, "city:osaka", "2024-W05"),
+            (2, "city:tokyo", "2024-W05"),
+        ]
+        assert quarantined[0]["reason"] == (
+            "Unknown market scope: city:osaka; avg_price out of range: 2000000.0"
+        )
+        assert quarantined[1]["reason"] == "avg_price out of range: -1.0"
+        assert all(row["run_id"] is None for row in quarantined)
+        assert json.loads(str(quarantined[1]["payload"]))["avg_price"] == -1.0
+
         cache_row = conn.execute(
             "SELECT payload FROM metadata_cache WHERE cache_key = 'market_metadata'"
         ).fetchone()
         assert cache_row is not None
         payload = json.loads(str(cache_row["payload"]))
-        assert sorted(item["scope"] for item in payload["markets"]) == [
-            "city:tokyo",
-            "national",
-        ]
         tokyo = next(item for item in payload["markets"] if item["scope"] == "city:tokyo")
-        assert tokyo["effective_from"] is None
-        national = next(item for item in payload["markets"] if item["scope"] == "national")
-        assert national["effective_from"] == "2024-W05"
+        assert tokyo["effective_from"] == "2024-W05"
+    finally:
+        conn.close()
+
+
+def test_partition_market_prices_collects_every_failure(tmp_path: Path) -> None:
+    conn = make_conn(tmp_path / "market-partition.db")
+    try:
+        db.init_db(conn)
+        prepare_crops(conn)
+        conn.execute(
+            "INSERT INTO theme_tokens (token, hex_color, text_color)"
+            " VALUES ('accent.national', '#22c55e', '#000000')"
+        )
+        conn.execute(
+            "INSERT INTO market_scopes (scope, display_name, theme_token)"
+            " VALUES ('national', '全国平均', 'accent.national')"
+        )
+        conn.commit()
+
+        dataset: list[dict[str, object]] = [
+            {"crop_id": 1, "scope": "national", "avg_price": 100.0},
+            {"crop_id": 9, "scope": "national", "avg_price": None},
+            {"crop_id": 1, "scope": "city:nagoya", "avg_price": float("nan")},
+            {"crop_id": 2, "scope": "national", "avg_price": 1_000_000.0},
+        ]
+
+        result = etl.expectations.partition_market_prices(conn, dataset)
+
+        assert result.valid_indexes == [0, 3]
+        assert [(item.index, item.reasons) for item in result.rejected] == [
+            (1, ("Unknown crop_id: 9",)),
+            (2, ("Unknown market scope: city:nagoya", "avg_price out of range: nan")),
+        ]
+        with pytest.raises(ValueError, match="Unknown crop_id: 9"):
+            etl.expectations.validate_market_prices(conn, dataset)
     finally:
         conn.close()
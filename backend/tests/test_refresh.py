@@ -9,6 +9,7 @@ import pytest
 from fastapi.testclient import TestClient
 
 from app import db, seed
+from app.compat import UTC
 from app.main import app
 
 client = TestClient(app)
@@ -74,6 +75,8 @@ def test_refresh_status_returns_default_payload() -> None:
         "finished_at": None,
         "updated_records": 0,
         "last_error": None,
+        "run_id": None,
+        "stages": [],
     }
 
 
@@ -136,3 +139,54 @@ def test_refresh_emits_cache_update_log_on_success(
     assert target_record is not None
     assert target_record.levelno == logging.INFO
     assert getattr(target_record, "updated_records", None) == payload["updated_records"]
+
+
+def test_refresh_runs_exposes_stage_timings() -> None:
+    response = client.post(REFRESH_ENDPOINT, headers=DEFAULT_HEADERS)
+    assert response.status_code == 200
+
+    status_payload = _wait_for_refresh_success()
+    stage_names = [stage["stage"] for stage in status_payload["stages"]]
+    assert stage_names[0] == "load"
+    assert {"transform", "validate", "upsert", "metadata_refresh"}.issubset(stage_names)
+    assert all(stage["duration_ms"] >= 0 for stage in status_payload["stages"])
+
+    runs_response = client.get(f"{REFRESH_ENDPOINT}/runs", params={"limit": 5})
+    assert runs_response.status_code == 200
+    runs = runs_response.json()["runs"]
+    assert len(runs) == 1
+    assert runs[0]["run_id"] == status_payload["run_id"]
+    assert runs[0]["stages"] == status_payload["stages"]
+
+    assert client.get(f"{REFRESH_ENDPOINT}/runs", params={"limit": 0}).status_code == 422
+
+
+def test_refresh_joins_in_flight_run_instead_of_starting_another() -> None:
+    conn = db.connect()
+    try:
+        conn.execute(
+            "INSERT INTO etl_runs (run_at, status, updated_records, state, started_at)"
+            " VALUES (?, 'running', 0, 'running', ?)",
+            (datetime.now(tz=UTC).strftime("%Y-%m-%dT%H:%M:%SZ"),) * 2,
+        )
+        conn.commit()
+        in_flight = conn.execute("SELECT id FROM etl_runs").fetchone()["id"]
+    finally:
+        conn.close()
+
+    for key in ("burst-1", "burst-1", "burst-2"):
+        response = client.post(REFRESH_ENDPOINT, headers={"Idempotency-Key": key})
+        assert response.status_code == 200
+        assert response.json() == {"state": "running"}
+
+    conn = db.connect()
+    try:
+        runs = conn.execute("SELECT id, state FROM etl_runs").fetchall()
+        assert [tuple(row) for row in runs] == [(in_flight, "running")]
+        keyed = conn.execute(
+            "SELECT DISTINCT run_id FROM etl_refresh_requests"
+            " WHERE idempotency_key IN ('burst-1', 'burst-2')"
+        ).fetchall()
+        assert [row["run_id"] for row in keyed] == [in_flight]
+    finally:
+        conn.close()
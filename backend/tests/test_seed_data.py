@@ -10,6 +10,15 @@ from app.seed import data_loader
 from app.utils_week import iso_week_from_int
 
 
+def _executed_rows(conn: MagicMock) -> list[tuple[str, tuple[object, ...]]]:
+    return [
+        (sql, params)
+        for call in conn.executemany.call_args_list
+        for sql, rows in [call.args]
+        for params in rows
+    ]
+
+
 @pytest.fixture
 def seed_payload() -> data_loader.SeedPayload:
     return data_loader.SeedPayload(
@@ -129,19 +138,18 @@ def test_seed_inserts_expected_records(
 
     seed_module.seed(conn=conn)
 
-    executed = [call.args for call in conn.execute.call_args_list]
+    executed = _executed_rows(conn)
 
-    assert (
-        "INSERT OR IGNORE INTO crops (id, name, category) VALUES (?, ?, ?)",
-        (1, "Lettuce", "leaf"),
-    ) in executed
-    assert (
-        "UPDATE crops SET name = ?, category = ? WHERE id = ?",
-        ("Lettuce", "leaf", 1),
-    ) in executed
+    assert any(
+        sql.startswith("INSERT INTO crops")
+        and "ON CONFLICT(id) DO UPDATE" in sql
+        and params == (1, "Lettuce", "leaf")
+        for sql, params in executed
+    )
 
     assert any(
-        sql.startswith("INSERT OR REPLACE INTO price_weekly")
+        sql.startswith("INSERT INTO price_weekly")
+        and "DO UPDATE" in sql
         and params
         == (
             1,
@@ -154,13 +162,14 @@ def test_seed_inserts_expected_records(
         for sql, params in executed
     )
     assert any(
-        sql.startswith("INSERT OR IGNORE INTO price_weekly")
+        sql.startswith("INSERT INTO price_weekly")
+        and "DO NOTHING" in sql
         and params == (2, "2023-W02", 150.0, 10.0, "円/kg", "seed")
         for sql, params in executed
     )
 
     assert any(
-        sql.startswith("INSERT OR REPLACE INTO market_prices")
+        sql.startswith("INSERT INTO market_prices")
         and params
         == (
             1,
@@ -174,7 +183,7 @@ def test_seed_inserts_expected_records(
         for sql, params in executed
     )
     assert any(
-        sql.startswith("INSERT OR REPLACE INTO market_prices")
+        sql.startswith("INSERT INTO market_prices")
         and params
         == (
             1,
@@ -189,23 +198,23 @@ def test_seed_inserts_expected_records(
     )
 
     assert any(
-        sql.startswith("INSERT OR REPLACE INTO market_scopes")
+        sql.startswith("INSERT INTO market_scopes")
         and params == ("national", "全国平均", "Asia/Tokyo", 10, "accent.national")
         for sql, params in executed
     )
     assert any(
-        sql.startswith("INSERT OR REPLACE INTO market_scopes")
+        sql.startswith("INSERT INTO market_scopes")
         and params == ("city:tokyo", "東京都中央卸売", "Asia/Tokyo", 20, "accent.tokyo")
         for sql, params in executed
     )
 
     assert any(
-        sql.startswith("INSERT OR REPLACE INTO market_scope_categories")
+        sql.startswith("INSERT INTO market_scope_categories")
         and params == ("national", "leaf", "葉菜類", 5, "seed")
         for sql, params in executed
     )
     assert any(
-        sql.startswith("INSERT OR REPLACE INTO market_scope_categories")
+        sql.startswith("INSERT INTO market_scope_categories")
         and params == ("city:tokyo", "leaf", "葉菜類", 10, "seed")
         for sql, params in executed
     )
@@ -223,14 +232,12 @@ def test_seed_inserts_expected_records(
         for sql, params in executed
     )
 
-    assert (
-        "INSERT OR IGNORE INTO growth_days (crop_id, region, days) VALUES (?, ?, ?)",
-        (1, "tokyo", 65),
-    ) in executed
-    assert (
-        "UPDATE growth_days SET days = ? WHERE crop_id = ? AND region = ?",
-        (65, 1, "tokyo"),
-    ) in executed
+    assert any(
+        sql.startswith("INSERT INTO growth_days")
+        and "DO UPDATE SET days = excluded.days" in sql
+        and params == (1, "tokyo", 65)
+        for sql, params in executed
+    )
 
     conn.commit.assert_called_once_with()
 
@@ -260,23 +267,13 @@ def test_seed_normalizes_crop_categories(
 
     seed_module.seed(conn=conn)
 
-    executed = [call.args for call in conn.execute.call_args_list]
-
-    insert_categories = {
+    upsert_categories = {
         params[0]: params[2]
-        for sql, params in executed
-        if sql.startswith("INSERT OR IGNORE INTO crops")
+        for sql, params in _executed_rows(conn)
+        if sql.startswith("INSERT INTO crops")
     }
-    update_categories = {
-        params[2]: params[1]
-        for sql, params in executed
-        if sql.startswith("UPDATE crops SET name = ?, category = ? WHERE id = ?")
-    }
-
-    expected = {10: "leaf", 11: "root", 12: "flower", 13: "leaf"}
 
-    assert insert_categories == expected
-    assert update_categories == expected
+    assert upsert_categories == {10: "leaf", 11: "root", 12: "flower", 13: "leaf"}
 
 
 def test_market_scopes_use_market_theme_tokens(theme_token_set: set[str]) -> None:
@@ -12,7 +12,7 @@ from fastapi.testclient import TestClient
 from app.compat import UTC
 from app.main import app
 from app.routes.weather import get_weather_service
-from app.services.weather import OpenMeteoWeatherAdapter, WeatherService
+from app.services.weather import OpenMeteoWeatherAdapter, WeatherService, WeatherServiceError
 
 
 class StubWeatherAdapter:
@@ -174,3 +174,355 @@ def test_weather_service_uses_default_adapter_when_registry_has_no_weather(
 
     assert response.model_dump(by_alias=True) == payload
     assert adapter.calls == [(35.0, 139.0)]
+
+
+def test_weather_service_shares_forecast_within_grid_cell() -> None:
+    payload = {
+        "daily": [{"date": "2024-01-01", "tmax": 10, "tmin": 3, "rain": 0, "wind": 2}],
+        "fetchedAt": "2024-01-01T00:00:00+00:00",
+    }
+    adapter = StubWeatherAdapter(payload)
+    service = WeatherService(
+        adapter_factory=lambda: adapter,
+        clock=lambda: datetime(2024, 1, 1, tzinfo=UTC),
+        grid_degrees=0.1,
+    )
+
+    async def run() -> None:
+        await service.get_weather(35.6812, 139.7671)
+        await service.get_weather(35.6895, 139.6917)
+        await service.get_weather(35.7295, 139.7109)
+
+    asyncio.run(run())
+
+    assert adapter.calls == [(35.7, 139.8), (35.7, 139.7)]
+
+
+def test_weather_service_grid_can_be_disabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("PLANTING_WEATHER_GRID_DEGREES", "0")
+    payload = {
+        "daily": [{"date": "2024-01-01", "tmax": 10, "tmin": 3, "rain": 0, "wind": 2}],
+        "fetchedAt": "2024-01-01T00:00:00+00:00",
+    }
+    adapter = StubWeatherAdapter(payload)
+    service = WeatherService(
+        adapter_factory=lambda: adapter, clock=lambda: datetime(2024, 1, 1, tzinfo=UTC)
+    )
+
+    asyncio.run(service.get_weather(35.6812, 139.7671))
+
+    assert adapter.calls == [(35.6812, 139.7671)]
+
+
+class GatedWeatherAdapter(StubWeatherAdapter):
+    def __init__(self, payload: dict[str, Any], *, error: Exception | None = None) -> None:
+        super().__init__(payload)
+        self.release = asyncio.Event()
+        self._error = error
+
+    async def get_daily(self, lat: float, lon: float) -> dict[str, Any]:
+        self.calls.append((lat, lon))
+        await self.release.wait()
+        if self._error is not None:
+            raise self._error
+        return self._payload
+
+
+def test_weather_service_collapses_concurrent_misses_into_one_fetch() -> None:
+    payload = {
+        "daily": [{"date": "2024-01-01", "tmax": 10, "tmin": 3, "rain": 0, "wind": 2}],
+        "fetchedAt": "2024-01-01T00:00:00+00:00",
+    }
+
+    async def run() -> tuple[GatedWeatherAdapter, list[Any]]:
+        adapter = GatedWeatherAdapter(payload)
+        service = WeatherService(
+            adapter_factory=lambda: adapter, clock=lambda: datetime(2024, 1, 1, tzinfo=UTC)
+        )
+        requests = [asyncio.create_task(service.get_weather(35.0, 139.0)) for _ in range(1_000)]
+        await asyncio.sleep(0)
+        adapter.release.set()
+        return adapter, await asyncio.gather(*requests)
+
+    adapter, responses = asyncio.run(run())
+
+    assert adapter.calls == [(35.0, 139.0)]
+    assert len(responses) == 1_000
+    assert all(response.model_dump(by_alias=True) == payload for response in responses)
+
+
+def test_weather_service_shares_failure_and_retries_next_miss() -> None:
+    from app.services.weather import WeatherServiceError
+
+    payload = {
+        "daily": [{"date": "2024-01-01", "tmax": 10, "tmin": 3, "rain": 0, "wind": 2}],
+        "fetchedAt": "2024-01-01T00:00:00+00:00",
+    }
+    error = WeatherServiceError("provider down", status_code=502)
+
+    async def run() -> tuple[GatedWeatherAdapter, list[Any]]:
+        adapter = GatedWeatherAdapter(payload, error=error)
+        service = WeatherService(
+            adapter_factory=lambda: adapter, clock=lambda: datetime(2024, 1, 1, tzinfo=UTC)
+        )
+        requests = [asyncio.create_task(service.get_weather(35.0, 139.0)) for _ in range(10)]
+        await asyncio.sleep(0)
+        adapter.release.set()
+        results = await asyncio.gather(*requests, return_exceptions=True)
+        with pytest.raises(WeatherServiceError):
+            await service.get_weather(35.0, 139.0)
+        return adapter, results
+
+    adapter, results = asyncio.run(run())
+
+    assert all(result is error for result in results)
+    assert len(adapter.calls) == 2
+
+
+def test_weather_service_shares_one_client_until_closed(monkeypatch: pytest.MonkeyPatch) -> None:
+    import app.services.weather as weather_module
+
+    monkeypatch.setattr(weather_module, "adapter_registry", None)
+    service = WeatherService()
+    config = weather_module.WeatherClientConfig(max_connections=3, keepalive_expiry=5.0)
+
+    async def run() -> None:
+        await service.start(config)
+        client = service._http_client
+        assert client is not None
+        adapter = service._resolve_adapter()
+        assert isinstance(adapter, OpenMeteoWeatherAdapter)
+        assert adapter._client is client
+        assert service._resolve_adapter() is adapter
+
+        await service.aclose()
+        assert client.is_closed
+        assert service._http_client is None
+
+    asyncio.run(run())
+
+
+def test_weather_client_config_reads_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.services.weather import WeatherClientConfig
+
+    monkeypatch.setenv("PLANTING_WEATHER_MAX_CONNECTIONS", "50")
+    monkeypatch.setenv("PLANTING_WEATHER_MAX_KEEPALIVE", "25")
+    monkeypatch.setenv("PLANTING_WEATHER_HTTP2", "true")
+
+    config = WeatherClientConfig.from_env()
+
+    assert (config.max_connections, config.max_keepalive_connections, config.http2) == (
+        50,
+        25,
+        True,
+    )
+    assert config.timeout == 10.0
+
+
+def test_weather_endpoint_serves_stale_payload_and_refreshes_in_background(
+    weather_client: TestClient, reset_weather_dependency: list[None]
+) -> None:
+    payload = {
+        "daily": [{"date": "2024-01-01", "tmax": 25, "tmin": 15, "rain": 12, "wind": 5}],
+        "fetchedAt": "2024-01-01T00:00:00+00:00",
+    }
+    adapter = StubWeatherAdapter(payload)
+    now = [datetime(2024, 1, 1, tzinfo=UTC)]
+    service = WeatherService(
+        adapter_factory=lambda: adapter,
+        clock=lambda: now[0],
+        cache_ttl=timedelta(hours=1),
+        cache_hard_ttl=timedelta(hours=6),
+    )
+    app.dependency_overrides[get_weather_service] = lambda: service
+    params = {"lat": "35.0", "lon": "139.0"}
+
+    assert "X-Weather-Stale" not in weather_client.get("/api/weather", params=params).headers
+
+    now[0] += timedelta(hours=2)
+    stale = weather_client.get("/api/weather", params=params)
+    assert stale.status_code == 200
+    assert stale.headers["X-Weather-Stale"] == "true"
+    assert stale.json() == payload
+    # 裏での再取得が終わると、次の応答は新鮮な値になる。
+    assert len(adapter.calls) == 2
+    assert "X-Weather-Stale" not in weather_client.get("/api/weather", params=params).headers
+    assert len(adapter.calls) == 2
+
+
+def test_weather_service_serves_stale_payload_when_provider_fails_past_hard_ttl() -> None:
+    from app.services.weather import WeatherServiceError
+
+    payload = {
+        "daily": [{"date": "2024-01-01", "tmax": 25, "tmin": 15, "rain": 12, "wind": 5}],
+        "fetchedAt": "2024-01-01T00:00:00+00:00",
+    }
+    adapter = StubWeatherAdapter(payload)
+    now = [datetime(2024, 1, 1, tzinfo=UTC)]
+    service = WeatherService(
+        adapter_factory=lambda: adapter,
+        clock=lambda: now[0],
+        cache_ttl=timedelta(hours=1),
+        cache_hard_ttl=timedelta(hours=6),
+        cache_max_stale=timedelta(days=2),
+    )
+
+    async def failing(lat: float, lon: float) -> dict[str, Any]:
+        raise WeatherServiceError("provider down", status_code=502)
+
+    async def run() -> list[Any]:
+        first = await service.get_weather_result(35.0, 139.0)
+        adapter.get_daily = failing  # type: ignore[method-assign]
+        now[0] += timedelta(hours=12)
+        second = await service.get_weather_result(35.0, 139.0)
+        now[0] += timedelta(days=3)
+        with pytest.raises(WeatherServiceError):
+            await service.get_weather_result(35.0, 139.0)
+        return [first, second]
+
+    first, second = asyncio.run(run())
+
+    assert first.stale is False
+    assert second.stale is True
+    assert second.payload.model_dump(by_alias=True) == payload
+
+
+def test_open_meteo_adapter_requests_many_locations_at_once() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.params["latitude"] == "35.0,36.0"
+        assert request.url.params["longitude"] == "139.0,140.0"
+        daily = {
+            "time": ["2024-01-01"],
+            "temperature_2m_max": [11.2],
+            "temperature_2m_min": [2.3],
+            "precipitation_sum": [0.0],
+            "wind_speed_10m_max": [3.4],
+        }
+        return httpx.Response(200, json=[{"daily": daily}, {"daily": daily}])
+
+    async def run() -> list[dict[str, Any]]:
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        async with client:
+            adapter = OpenMeteoWeatherAdapter(
+                client=client,
+                base_url="https://api.open-meteo.com/v1/forecast",
+                clock=lambda: datetime(2024, 1, 1, tzinfo=UTC),
+            )
+            return await adapter.get_daily_many([(35.0, 139.0), (36.0, 140.0)])
+
+    payloads = asyncio.run(run())
+
+    assert len(payloads) == 2
+    assert payloads[1]["daily"] == [
+        {"date": "2024-01-01", "tmax": 11.2, "tmin": 2.3, "rain": 0.0, "wind": 3.4}
+    ]
+
+
+class MultiLocationStubAdapter(StubWeatherAdapter):
+    def __init__(self, payload: dict[str, Any]) -> None:
+        super().__init__(payload)
+        self.batches: list[list[tuple[float, float]]] = []
+
+    async def get_daily_many(self, locations: list[tuple[float, float]]) -> list[dict[str, Any]]:
+        self.batches.append(list(locations))
+        return [{**self._payload, "fetchedAt": f"{lat}:{lon}"} for lat, lon in locations]
+
+
+def test_weather_batch_dedupes_against_cache_and_keeps_input_order() -> None:
+    adapter = MultiLocationStubAdapter(
+        {
+            "daily": [{"date": "2024-01-01", "tmax": 10, "tmin": 2, "rain": 0, "wind": 3}],
+            "fetchedAt": "single",
+        }
+    )
+    service = WeatherService(
+        adapter_factory=lambda: adapter, clock=lambda: datetime(2024, 1, 1, tzinfo=UTC)
+    )
+
+    async def run() -> list[Any]:
+        await service.get_weather(34.0, 135.0)
+        return await service.get_weather_batch(
+            [(36.0, 140.0), (34.0, 135.0), (35.0, 139.0), (36.01, 140.02), (35.0, 139.0)]
+        )
+
+    results = asyncio.run(run())
+
+    # キャッシュ済みの地点と同じ格子の重複は、1 本の複数地点リクエストから除かれる。
+    assert adapter.batches == [[(36.0, 140.0), (35.0, 139.0)]]
+    assert [result.payload.fetched_at for result in results] == [
+        "36.0:140.0",
+        "single",
+        "35.0:139.0",
+        "36.0:140.0",
+        "35.0:139.0",
+    ]
+
+
+def test_weather_batch_limits_concurrent_single_location_fetches() -> None:
+    active = 0
+    peak = 0
+
+    class SlowAdapter:
+        async def get_daily(self, lat: float, lon: float) -> dict[str, Any]:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            if lat < 0:
+                raise WeatherServiceError("boom", status_code=502)
+            return {
+                "daily": [{"date": "2024-01-01", "tmax": 10, "tmin": 2, "rain": 0, "wind": 3}],
+                "fetchedAt": f"{lat}",
+            }
+
+    service = WeatherService(
+        adapter_factory=SlowAdapter,
+        clock=lambda: datetime(2024, 1, 1, tzinfo=UTC),
+        batch_concurrency=3,
+    )
+    locations = [(float(index), 139.0) for index in range(10)] + [(-1.0, 139.0)]
+
+    results = asyncio.run(service.get_weather_batch(locations))
+
+    assert peak == 3
+    assert [result.payload.fetched_at for result in results[:10]] == [
+        f"{float(index)}" for index in range(10)
+    ]
+    assert isinstance(results[10], WeatherServiceError)
+
+
+def test_weather_batch_endpoint_reports_errors_per_location(
+    weather_client: TestClient, reset_weather_dependency: list[None]
+) -> None:
+    class FlakyAdapter:
+        async def get_daily(self, lat: float, lon: float) -> dict[str, Any]:
+            if lat > 80:
+                raise WeatherServiceError("weather provider request failed", status_code=502)
+            return {
+                "daily": [{"date": "2024-01-01", "tmax": 10, "tmin": 2, "rain": 0, "wind": 3}],
+                "fetchedAt": "2024-01-01T00:00:00+00:00",
+            }
+
+    service = WeatherService(
+        adapter_factory=FlakyAdapter, clock=lambda: datetime(2024, 1, 1, tzinfo=UTC)
+    )
+    app.dependency_overrides[get_weather_service] = lambda: service
+
+    response = weather_client.post(
+        "/api/weather/batch",
+        json={"locations": [{"lat": 35.0, "lon": 139.0}, {"lat": 85.0, "lon": 139.0}]},
+    )
+
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert items[0]["weather"]["fetchedAt"] == "2024-01-01T00:00:00+00:00"
+    assert items[0]["error"] is None
+    assert items[1] == {
+        "lat": 85.0,
+        "lon": 139.0,
+        "weather": None,
+        "stale": False,
+        "error": "weather provider request failed",
+    }
+    assert weather_client.post("/api/weather/batch", json={"locations": []}).status_code == 422
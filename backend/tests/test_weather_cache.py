@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from app import schemas
+from app.compat import UTC
+from app.services.weather_cache import WeatherCache
+
+START = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+def _payload(days: int = 1) -> schemas.WeatherResponse:
+    return schemas.WeatherResponse.model_validate(
+        {
+            "daily": [
+                {"date": f"2024-01-{day + 1:02d}", "tmax": 10, "tmin": 2, "rain": 0, "wind": 3}
+                for day in range(days)
+            ],
+            "fetchedAt": "2024-01-01T00:00:00+00:00",
+        }
+    )
+
+
+def test_cache_evicts_least_recently_used_entry_and_counts() -> None:
+    cache = WeatherCache(ttl=timedelta(hours=1), max_entries=2)
+    cache.put("a", _payload(), START)
+    cache.put("b", _payload(), START)
+    assert cache.get("a", START) is not None
+
+    cache.put("c", _payload(), START)
+
+    assert cache.get("b", START) is None
+    assert cache.get("a", START) is not None
+    assert cache.get("c", START) is not None
+    stats = cache.stats()
+    assert (stats.entries, stats.hits, stats.misses, stats.evictions) == (2, 3, 1, 1)
+
+
+def test_cache_respects_byte_cap() -> None:
+    small = _payload()
+    probe = WeatherCache(ttl=timedelta(hours=1))
+    probe.put("probe", small, START)
+    entry_size = probe.stats().bytes
+
+    cache = WeatherCache(ttl=timedelta(hours=1), max_bytes=entry_size * 3)
+    for index in range(10):
+        cache.put(f"k{index}", small, START)
+
+    stats = cache.stats()
+    assert stats.entries == 3
+    assert stats.bytes <= entry_size * 3
+    assert stats.evictions == 7
+
+
+def test_cache_purges_expired_entries_when_writing() -> None:
+    cache = WeatherCache(ttl=timedelta(hours=1))
+    cache.put("old-1", _payload(), START)
+    cache.put("old-2", _payload(), START + timedelta(minutes=10))
+    # 参照して LRU 末尾に移っても、書き込み時刻で期限切れになる。
+    assert cache.get("old-1", START + timedelta(minutes=30)) is not None
+
+    cache.put("fresh", _payload(), START + timedelta(minutes=65))
+
+    assert len(cache) == 2
+    assert cache.stats().expirations == 1
+    assert cache.get("old-2", START + timedelta(minutes=70)) is None
+    assert cache.stats().expirations == 2
+
+
+def test_cache_purges_entries_written_out_of_cached_at_order() -> None:
+    cache = WeatherCache(ttl=timedelta(hours=1))
+    cache.put("fresh", _payload(), START + timedelta(minutes=50))
+    # 永続層からの温め直しは古い cached_at のまま後から書き込む。
+    cache.put("warmed", _payload(), START)
+
+    cache.put("new", _payload(), START + timedelta(minutes=65))
+
+    assert cache.stats().expirations == 1
+    assert len(cache) == 2
+    assert cache.get("fresh", START + timedelta(minutes=65)) is not None
+
+
+def test_cache_skips_replaced_entries_when_purging() -> None:
+    cache = WeatherCache(ttl=timedelta(hours=1))
+    cache.put("a", _payload(), START)
+    cache.put("a", _payload(), START + timedelta(minutes=40))
+
+    assert cache.purge_expired(START + timedelta(minutes=70)) == 0
+    assert cache.get("a", START + timedelta(minutes=70)) is not None
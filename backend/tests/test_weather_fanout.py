@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Any
+
+import pytest
+from adapter import MajorityVoteStrategy, ProviderRegistry
+
+import app.services.weather as weather_module
+from app.compat import UTC
+from app.services.weather import (
+    FanOutWeatherAdapter,
+    WeatherFanOutConfig,
+    WeatherService,
+    WeatherServiceError,
+)
+
+
+def _payload(tmax: float, source: str) -> dict[str, Any]:
+    return {
+        "daily": [{"date": "2024-01-01", "tmax": tmax, "tmin": 2, "rain": 0, "wind": 3}],
+        "fetchedAt": f"2024-01-01T00:00:00+00:00#{source}",
+    }
+
+
+class StubProvider:
+    def __init__(self, tmax: float, source: str, *, delay: float = 0.0, fail: bool = False):
+        self._payload = _payload(tmax, source)
+        self._delay = delay
+        self._fail = fail
+        self.calls = 0
+        self.cancelled = False
+
+    async def get_daily(self, lat: float, lon: float) -> dict[str, Any]:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self._delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self._fail:
+            raise WeatherServiceError("provider down", status_code=502)
+        return self._payload
+
+
+def _majority() -> MajorityVoteStrategy[dict[str, Any]]:
+    # fetchedAt はプロバイダごとに異なるため、予報本体で多数決を取る。
+    return MajorityVoteStrategy(key=lambda payload: json.dumps(payload["daily"], sort_keys=True))
+
+
+def test_fanout_returns_at_quorum_without_waiting_for_slow_provider() -> None:
+    slow = StubProvider(10, "slow", delay=5.0)
+    adapter = FanOutWeatherAdapter(
+        {
+            "a": StubProvider(20, "a", delay=0.02),
+            "b": StubProvider(10, "b", delay=0.01),
+            "c": StubProvider(10, "c"),
+            "slow": slow,
+        },
+        quorum=3,
+        aggregation_strategy=_majority(),
+    )
+
+    async def run() -> dict[str, Any]:
+        started = time.perf_counter()
+        result = await adapter.get_daily(35.0, 139.0)
+        assert time.perf_counter() - started < 1.0
+        await asyncio.sleep(0)
+        return dict(result)
+
+    result = asyncio.run(run())
+
+    # 多数決は 10 度の予報 2 件が勝ち、プロバイダ名順で最初の b を返す。
+    assert result["fetchedAt"].endswith("#b")
+    assert slow.cancelled
+
+
+def test_fanout_majority_vote_without_key_ignores_fetched_at() -> None:
+    adapter = FanOutWeatherAdapter(
+        {
+            "a": StubProvider(20, "a"),
+            "b": StubProvider(10, "b"),
+            "c": StubProvider(10, "c"),
+        },
+        quorum=3,
+        aggregation_strategy=MajorityVoteStrategy(),
+    )
+
+    result = asyncio.run(adapter.get_daily(35.0, 139.0))
+
+    assert isinstance(result, dict)
+    assert result["fetchedAt"].endswith("#b")
+
+
+def test_fanout_treats_timeouts_and_failures_as_missing_answers() -> None:
+    adapter = FanOutWeatherAdapter(
+        {
+            "down": StubProvider(10, "down", fail=True),
+            "hung": StubProvider(10, "hung", delay=5.0),
+            "ok": StubProvider(10, "ok"),
+        },
+        provider_timeout=0.05,
+    )
+
+    with pytest.raises(WeatherServiceError, match="quorum"):
+        asyncio.run(adapter.get_daily(35.0, 139.0))
+
+    single = FanOutWeatherAdapter(
+        {"down": StubProvider(10, "down", fail=True), "ok": StubProvider(10, "ok")},
+        quorum=1,
+        provider_timeout=0.05,
+    )
+    assert asyncio.run(single.get_daily(35.0, 139.0))["fetchedAt"].endswith("#ok")
+
+
+def test_weather_service_fans_out_over_registered_weather_providers(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    registry = ProviderRegistry()
+    providers = {
+        "weather": StubProvider(12, "weather", delay=0.01),
+        "weather-backup": StubProvider(12, "backup"),
+        "weather-outlier": StubProvider(30, "outlier"),
+        "prices": StubProvider(99, "prices"),
+    }
+    registry.register_factory(
+        "weather", lambda: providers["weather"], aggregation_strategy=MajorityVoteStrategy()
+    )
+    registry.register_factory(
+        "weather-backup", lambda: providers["weather-backup"], metadata={"kind": "weather"}
+    )
+    registry.register_factory(
+        "weather-outlier", lambda: providers["weather-outlier"], metadata={"kind": "weather"}
+    )
+    registry.register_factory("prices", lambda: providers["prices"])
+    monkeypatch.setattr(weather_module, "adapter_registry", registry)
+    service = WeatherService(
+        clock=lambda: datetime(2024, 1, 1, tzinfo=UTC),
+        fanout=WeatherFanOutConfig(enabled=True, quorum=3),
+    )
+
+    response = asyncio.run(service.get_weather(35.0, 139.0))
+
+    assert response.daily[0].tmax == 12
+    assert [providers[name].calls for name in providers] == [1, 1, 1, 0]
+
+
+def test_weather_fanout_config_reads_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("PLANTING_WEATHER_FANOUT", "1")
+    monkeypatch.setenv("PLANTING_WEATHER_QUORUM", "2")
+    monkeypatch.setenv("PLANTING_WEATHER_PROVIDER_TIMEOUT", "1.5")
+
+    assert WeatherFanOutConfig.from_env() == WeatherFanOutConfig(
+        enabled=True, quorum=2, provider_timeout=1.5
+    )
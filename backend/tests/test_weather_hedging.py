@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+import httpx
+import pytest
+from adapter import ProviderRegistry
+
+import app.services.weather as weather_module
+from app.compat import UTC
+from app.services.weather import (
+    HedgedWeatherAdapter,
+    OpenMeteoWeatherAdapter,
+    WeatherFanOutConfig,
+    WeatherService,
+    WeatherServiceError,
+)
+
+_BODY = json.dumps(
+    {
+        "daily": {
+            "time": ["2024-01-01"],
+            "temperature_2m_max": [11.2],
+            "temperature_2m_min": [2.3],
+            "precipitation_sum": [0.0],
+            "wind_speed_10m_max": [3.4],
+        }
+    }
+).encode()
+
+
+@dataclass
+class FaultyServer:
+    """Open-Meteo stub whose paths can be made slow or failing while it runs."""
+
+    port: int = 0
+    delays: dict[str, float] = field(default_factory=dict)
+    statuses: dict[str, int] = field(default_factory=dict)
+    hits: Counter[str] = field(default_factory=Counter)
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.port}{path}"
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            path = head.split(b" ", 2)[1].decode().split("?", 1)[0]
+            self.hits[path] += 1
+            await asyncio.sleep(self.delays.get(path, 0.0))
+            status = self.statuses.get(path, 200)
+            body = _BODY if status == 200 else b"{}"
+            writer.write(
+                f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+@asynccontextmanager
+async def faulty_server() -> AsyncIterator[tuple[FaultyServer, httpx.AsyncClient]]:
+    stub = FaultyServer()
+    server = await asyncio.start_server(stub.handle, "127.0.0.1", 0)
+    stub.port = server.sockets[0].getsockname()[1]
+    async with server, httpx.AsyncClient(timeout=10.0) as client:
+        yield stub, client
+
+
+def _providers(stub: FaultyServer, client: httpx.AsyncClient) -> dict[str, Any]:
+    return {
+        name: OpenMeteoWeatherAdapter(client=client, base_url=stub.url(f"/{name}"))
+        for name in ("primary", "secondary")
+    }
+
+
+def test_hedges_to_second_provider_after_primary_p95() -> None:
+    registry = ProviderRegistry()
+    for _ in range(20):
+        registry.record_success("primary", 0.02)
+
+    async def run() -> tuple[float, FaultyServer]:
+        async with faulty_server() as (stub, client):
+            stub.delays["/primary"] = 3.0
+            adapter = HedgedWeatherAdapter(_providers(stub, client), registry)
+            started = time.perf_counter()
+            await adapter.get_daily(35.0, 139.0)
+            return time.perf_counter() - started, stub
+
+    elapsed, stub = asyncio.run(run())
+
+    # 10 秒のタイムアウトや 3 秒の遅延を待たず、p95 (20ms) 経過後のヘッジで返る。
+    assert elapsed < 1.0
+    assert stub.hits == {"/primary": 1, "/secondary": 1}
+    # 打ち切った呼び出しは失敗に数えない。
+    assert registry.health("primary").error_rate() == 0
+    assert len(registry.health("secondary").latencies) == 1
+
+
+def test_circuit_breaker_trips_on_errors_and_probes_half_open() -> None:
+    now = [0.0]
+    registry = ProviderRegistry(min_requests=3, open_seconds=30.0, clock=lambda: now[0])
+
+    async def run() -> None:
+        async with faulty_server() as (stub, client):
+            stub.statuses["/primary"] = 500
+            adapter = HedgedWeatherAdapter(_providers(stub, client), registry)
+
+            for _ in range(3):
+                await adapter.get_daily(35.0, 139.0)
+            assert registry.health("primary").state == "open"
+
+            await adapter.get_daily(35.0, 139.0)
+            assert stub.hits["/primary"] == 3
+
+            now[0] = 31.0
+            await adapter.get_daily(35.0, 139.0)
+            assert stub.hits["/primary"] == 4
+            assert registry.health("primary").state == "open"
+
+            del stub.statuses["/primary"]
+            now[0] = 62.0
+            await adapter.get_daily(35.0, 139.0)
+            assert stub.hits["/primary"] == 5
+            assert registry.health("primary").state == "closed"
+            assert stub.hits["/secondary"] == 5
+
+    asyncio.run(run())
+
+
+def test_hedged_adapter_reports_unavailable_when_every_circuit_is_open() -> None:
+    registry = ProviderRegistry(min_requests=1, clock=lambda: 0.0)
+
+    async def run() -> None:
+        async with faulty_server() as (stub, client):
+            stub.statuses.update({"/primary": 503, "/secondary": 503})
+            adapter = HedgedWeatherAdapter(_providers(stub, client), registry)
+            with pytest.raises(WeatherServiceError) as first:
+                await adapter.get_daily(35.0, 139.0)
+            assert first.value.status_code == 502
+            with pytest.raises(WeatherServiceError) as second:
+                await adapter.get_daily(35.0, 139.0)
+            assert second.value.status_code == 503
+            assert stub.hits == {"/primary": 1, "/secondary": 1}
+
+    asyncio.run(run())
+
+
+@dataclass
+class RecordingHealth:
+    """Registry stand-in that records outcomes and never has latency samples."""
+
+    events: list[tuple[str, str]] = field(default_factory=list)
+
+    def allow_request(self, name: str) -> bool:
+        return True
+
+    def latency_percentile(self, name: str, percentile: float) -> float | None:
+        return None
+
+    def record_success(self, name: str, latency: float) -> None:
+        self.events.append(("success", name))
+
+    def record_failure(self, name: str) -> None:
+        self.events.append(("failure", name))
+
+    def release(self, name: str) -> None:
+        self.events.append(("release", name))
+
+
+class GatedProvider:
+    def __init__(self, gate: asyncio.Event, *, fail: bool = False) -> None:
+        self._gate = gate
+        self._fail = fail
+
+    async def get_daily(self, lat: float, lon: float) -> dict[str, Any]:
+        await self._gate.wait()
+        if self._fail:
+            raise WeatherServiceError("provider down", status_code=502)
+        return {"daily": [], "fetchedAt": "2024-01-01T00:00:00+00:00"}
+
+
+def test_hedged_adapter_settles_every_call_finished_in_the_same_wakeup() -> None:
+    health = RecordingHealth()
+
+    async def run() -> Mapping[str, Any]:
+        gate = asyncio.Event()
+        adapter = HedgedWeatherAdapter(
+            {
+                "primary": GatedProvider(gate),
+                "secondary": GatedProvider(gate, fail=True),
+                "tertiary": GatedProvider(gate, fail=True),
+            },
+            health,  # type: ignore[arg-type]
+            default_delay=0.01,
+        )
+        call = asyncio.create_task(adapter.get_daily(35.0, 139.0))
+        await asyncio.sleep(0.1)
+        # 3 件とも起動済みのところで同時に終わらせる。
+        gate.set()
+        return await call
+
+    result = asyncio.run(run())
+
+    assert result["daily"] == []
+    # 終わった呼び出しは成否だけが記録され、打ち切り扱いの release は呼ばれない。
+    assert sorted(health.events) == [
+        ("failure", "secondary"),
+        ("failure", "tertiary"),
+        ("success", "primary"),
+    ]
+
+
+def test_weather_service_hedges_across_registered_weather_providers(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def run() -> tuple[float, Counter[str]]:
+        async with faulty_server() as (stub, client):
+            stub.statuses["/weather"] = 500
+            registry = ProviderRegistry()
+            for name in ("weather", "weather-backup"):
+                adapter = OpenMeteoWeatherAdapter(client=client, base_url=stub.url(f"/{name}"))
+                registry.register_factory(
+                    name, lambda adapter=adapter: adapter, metadata={"kind": "weather"}
+                )
+            monkeypatch.setattr(weather_module, "adapter_registry", registry)
+            service = WeatherService(
+                clock=lambda: datetime(2024, 1, 1, tzinfo=UTC),
+                fanout=WeatherFanOutConfig(enabled=False),
+            )
+            response = await service.get_weather(35.0, 139.0)
+            return response.daily[0].tmax, stub.hits
+
+    tmax, hits = asyncio.run(run())
+
+    assert tmax == 11.2
+    assert hits == {"/weather": 1, "/weather-backup": 1}
+
+
+def test_single_weather_provider_goes_through_circuit_breaker(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    now = [datetime(2024, 1, 1, tzinfo=UTC)]
+
+    async def run() -> tuple[FaultyServer, list[int], bool]:
+        async with faulty_server() as (stub, client):
+            registry = ProviderRegistry(min_requests=3, clock=lambda: 0.0)
+            adapter = OpenMeteoWeatherAdapter(client=client, base_url=stub.url("/weather"))
+            registry.register_factory("weather", lambda: adapter)
+            monkeypatch.setattr(weather_module, "adapter_registry", registry)
+            service = WeatherService(
+                clock=lambda: now[0], fanout=WeatherFanOutConfig(enabled=False)
+            )
+            await service.get_weather(35.0, 139.0)
+
+            stub.statuses["/weather"] = 500
+            now[0] += timedelta(days=3)
+            statuses = []
+            for lat in (36.0, 37.0, 38.0):
+                with pytest.raises(WeatherServiceError) as error:
+                    await service.get_weather(lat, 139.0)
+                statuses.append(error.value.status_code)
+            # 回路が開いた後は上流を待たずに失敗し、保持している予報で応答する。
+            result = await service.get_weather_result(35.0, 139.0)
+            return stub, statuses, result.stale
+
+    stub, statuses, stale = asyncio.run(run())
+
+    assert statuses == [502, 502, 503]
+    assert stale
+    assert stub.hits["/weather"] == 3
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from contextlib import suppress
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from app import schemas
+from app.compat import UTC
+from app.services.weather import WeatherService, WeatherServiceError
+from app.services.weather_store import WeatherStore
+
+START = datetime(2024, 1, 1, tzinfo=UTC)
+PAYLOAD: dict[str, Any] = {
+    "daily": [{"date": "2024-01-01", "tmax": 10, "tmin": 2, "rain": 0, "wind": 3}],
+    "fetchedAt": "2024-01-01T00:00:00+00:00",
+}
+
+
+class _CountingAdapter:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def get_daily(self, lat: float, lon: float) -> dict[str, Any]:
+        self.calls += 1
+        return PAYLOAD
+
+
+def _store(path: Path, *, flush_size: int = 32) -> WeatherStore:
+    return WeatherStore(lambda: sqlite3.connect(path), flush_size=flush_size, ensure_schema=True)
+
+
+def _rows(path: Path) -> list[tuple[str, str]]:
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT key, last_used_at FROM weather_cache ORDER BY key").fetchall()
+
+
+def test_store_batches_writes_and_drops_expired_rows(tmp_path: Path) -> None:
+    path = tmp_path / "weather.db"
+    store = _store(path, flush_size=2)
+    payload = schemas.WeatherResponse.model_validate(PAYLOAD)
+
+    assert not store.stage("old", payload, cached_at=START, expires_at=START + timedelta(hours=1))
+    assert not path.exists()
+    assert store.stage("new", payload, cached_at=START, expires_at=START + timedelta(days=1))
+    assert store.flush(START + timedelta(hours=2)) == 2
+
+    assert [key for key, _ in _rows(path)] == ["new"]
+    stored = store.get("new", START + timedelta(hours=2))
+    assert stored is not None
+    assert stored.payload == payload
+    assert stored.cached_at == START
+
+
+def test_store_loads_most_recently_used_entries(tmp_path: Path) -> None:
+    path = tmp_path / "weather.db"
+    store = _store(path)
+    payload = schemas.WeatherResponse.model_validate(PAYLOAD)
+    for index in range(3):
+        store.stage(
+            f"k{index}",
+            payload,
+            cached_at=START + timedelta(minutes=index),
+            expires_at=START + timedelta(days=1),
+        )
+    store.flush(START)
+    store.touch("k0", START + timedelta(hours=1))
+    store.flush(START + timedelta(hours=1))
+
+    recent = store.load_recent(START + timedelta(hours=1), limit=2)
+
+    assert [entry.key for entry in recent] == ["k0", "k2"]
+
+
+def test_service_warms_memory_cache_from_store_on_start(tmp_path: Path) -> None:
+    path = tmp_path / "weather.db"
+
+    async def scenario() -> tuple[int, int]:
+        first_adapter = _CountingAdapter()
+        first = WeatherService(
+            adapter_factory=lambda: first_adapter,
+            clock=lambda: START,
+            store=_store(path),
+        )
+        await first.get_weather(35.0, 139.0)
+        await first.aclose()
+
+        second_adapter = _CountingAdapter()
+        second = WeatherService(
+            adapter_factory=lambda: second_adapter,
+            clock=lambda: START + timedelta(hours=1),
+            store=_store(path),
+        )
+        await second.start()
+        try:
+            payload = await second.get_weather(35.0, 139.0)
+        finally:
+            await second.aclose()
+        assert payload.fetched_at == PAYLOAD["fetchedAt"]
+        return first_adapter.calls, second_adapter.calls
+
+    assert asyncio.run(scenario()) == (1, 0)
+    assert len(_rows(path)) == 1
+
+
+def test_service_reads_through_store_before_fetching(tmp_path: Path) -> None:
+    path = tmp_path / "weather.db"
+    store = _store(path)
+    store.stage(
+        "35.000000:139.000000",
+        schemas.WeatherResponse.model_validate(PAYLOAD),
+        cached_at=START,
+        expires_at=START + timedelta(days=7),
+    )
+    store.flush(START)
+    adapter = _CountingAdapter()
+    # start() を呼ばないので温め直しは行われず、キャッシュミス時に永続層を参照する。
+    service = WeatherService(
+        adapter_factory=lambda: adapter,
+        clock=lambda: START + timedelta(hours=2),
+        store=_store(path),
+    )
+
+    asyncio.run(service.get_weather(35.0, 139.0))
+
+    assert adapter.calls == 0
+    assert service.cache_stats().entries == 1
+
+
+class _FlakyConnections:
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self.fail = True
+
+    def __call__(self) -> sqlite3.Connection:
+        if self.fail:
+            raise sqlite3.OperationalError("database is locked")
+        return sqlite3.connect(self._path)
+
+
+def test_failed_flush_keeps_rows_for_next_flush(tmp_path: Path) -> None:
+    path = tmp_path / "weather.db"
+    connections = _FlakyConnections(path)
+    store = WeatherStore(connections, ensure_schema=True)
+    payload = schemas.WeatherResponse.model_validate(PAYLOAD)
+    store.stage("k", payload, cached_at=START, expires_at=START + timedelta(days=1))
+
+    with pytest.raises(sqlite3.OperationalError):
+        store.flush(START)
+    connections.fail = False
+
+    assert store.flush(START) == 1
+    assert [key for key, _ in _rows(path)] == ["k"]
+
+
+def test_service_survives_failing_store(tmp_path: Path) -> None:
+    now = [START]
+    adapter = _CountingAdapter()
+    service = WeatherService(
+        adapter_factory=lambda: adapter,
+        clock=lambda: now[0],
+        store=WeatherStore(_FlakyConnections(tmp_path / "weather.db"), flush_size=1),
+    )
+
+    async def scenario() -> tuple[str, bool]:
+        fetched = await service.get_weather(35.0, 139.0)
+        assert fetched.fetched_at == PAYLOAD["fetchedAt"]
+        # ハード TTL を過ぎて上流も落ちたときは、ストアが壊れていても古い値で応答する。
+        now[0] = START + timedelta(days=3)
+
+        async def failing(lat: float, lon: float) -> dict[str, Any]:
+            raise WeatherServiceError("provider down", status_code=502)
+
+        adapter.get_daily = failing  # type: ignore[method-assign]
+        result = await service.get_weather_result(35.0, 139.0)
+        await service.aclose()
+        return result.payload.fetched_at, result.stale
+
+    assert asyncio.run(scenario()) == (PAYLOAD["fetchedAt"], True)
+    assert adapter.calls == 1
+
+
+def test_service_flushes_store_periodically_after_start(tmp_path: Path) -> None:
+    path = tmp_path / "weather.db"
+
+    async def scenario() -> list[tuple[str, str]]:
+        service = WeatherService(
+            adapter_factory=_CountingAdapter,
+            clock=lambda: START,
+            store=_store(path),
+            store_flush_interval=0.01,
+        )
+        await service.start()
+        try:
+            await service.get_weather(35.0, 139.0)
+            # aclose() より前に、flush_size に届かない 1 行が書き出されるのを待つ。
+            for _ in range(200):
+                await asyncio.sleep(0.01)
+                with suppress(sqlite3.OperationalError):
+                    if path.exists() and _rows(path):
+                        break
+            return _rows(path)
+        finally:
+            await service.aclose()
+
+    assert [key for key, _ in asyncio.run(scenario())] == ["35.000000:139.000000"]
@@ -1,16 +1,21 @@
 from __future__ import annotations
+import math
 import sys
-from collections import Counter
+import time
+from collections import Counter, deque
 from collections.abc import Callable, Hashable, Mapping, Sequence
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from threading import Lock
 from types import MappingProxyType, ModuleType
-from typing import Any, Dict, Generic, MutableMapping, TypeVar
+from typing import Any, Dict, Generic, Literal, MutableMapping, TypeVar
 
 __all__ = [
     "AggregationError",
     "AggregationStrategy",
+    "CircuitState",
     "MajorityVoteStrategy",
     "ProviderRegistrationError",
+    "ProviderHealth",
     "ProviderRegistry",
     "ProviderSpec",
     "registry",
@@ -74,9 +79,46 @@ class ProviderSpec:
             raise TypeError("metadata must be a mapping")
 
 
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+@dataclass
+class ProviderHealth:
+    window: int
+    latencies: deque[float] = field(init=False)
+    outcomes: deque[bool] = field(init=False)
+    state: CircuitState = "closed"
+    opened_at: float = 0.0
+    probing: bool = False
+
+    def __post_init__(self) -> None:
+        self.latencies = deque(maxlen=self.window)
+        self.outcomes = deque(maxlen=self.window)
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+
 class ProviderRegistry:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        window: int = 100,
+        failure_rate_threshold: float = 0.5,
+        min_requests: int = 5,
+        open_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
         self._providers: MutableMapping[str, ProviderSpec] = {}
+        self._health: Dict[str, ProviderHealth] = {}
+        self._window = window
+        self._failure_rate_threshold = failure_rate_threshold
+        self._min_requests = min_requests
+        self._open_seconds = open_seconds
+        self._clock = clock
+        self._lock = Lock()
 
     def register(self, spec: ProviderSpec, *, override: bool = False) -> None:
         if spec.name in self._providers and not override:
@@ -108,6 +150,77 @@ class ProviderRegistry:
     def as_mapping(self) -> Mapping[str, ProviderSpec]:
         return MappingProxyType(dict(self._providers))
 
+    def health(self, name: str) -> ProviderHealth:
+        with self._lock:
+            return self._health_for(name)
+
+    def allow_request(self, name: str) -> bool:
+        """Closed circuits pass; an open one lets a single half-open probe through once cooled down."""
+
+        with self._lock:
+            health = self._health_for(name)
+            if health.state == "closed":
+                return True
+            if health.state == "open":
+                if self._clock() - health.opened_at < self._open_seconds:
+                    return False
+                health.state = "half_open"
+            if health.probing:
+                return False
+            health.probing = True
+            return True
+
+    def record_success(self, name: str, latency: float) -> None:
+        with self._lock:
+            health = self._health_for(name)
+            health.latencies.append(latency)
+            if health.state == "half_open":
+                health.state = "closed"
+                health.probing = False
+                health.outcomes.clear()
+            health.outcomes.append(True)
+
+    def record_failure(self, name: str) -> None:
+        with self._lock:
+            health = self._health_for(name)
+            if health.state == "half_open":
+                self._open(health)
+                return
+            health.outcomes.append(False)
+            if (
+                health.state == "closed"
+                and len(health.outcomes) >= self._min_requests
+                and health.error_rate() >= self._failure_rate_threshold
+            ):
+                self._open(health)
+
+    def release(self, name: str) -> None:
+        """Give back a half-open probe whose call was abandoned before it finished."""
+
+        with self._lock:
+            self._health_for(name).probing = False
+
+    def latency_percentile(
+        self, name: str, percentile: float, *, min_samples: int = 5
+    ) -> float | None:
+        with self._lock:
+            samples = sorted(self._health_for(name).latencies)
+        if len(samples) < min_samples:
+            return None
+        rank = max(math.ceil(percentile / 100 * len(samples)), 1)
+        return samples[rank - 1]
+
+    def _health_for(self, name: str) -> ProviderHealth:
+        health = self._health.get(name)
+        if health is None:
+            health = self._health[name] = ProviderHealth(self._window)
+        return health
+
+    def _open(self, health: ProviderHealth) -> None:
+        health.state = "open"
+        health.opened_at = self._clock()
+        health.probing = False
+
 
 registry = ProviderRegistry()
 
@@ -131,11 +244,13 @@ majority_vote.__all__ = ["MajorityVoteStrategy"]
 _module("adapter.core.providers")
 providers_registry = _module("adapter.core.providers.registry")
 providers_registry.ProviderRegistry = ProviderRegistry
+providers_registry.ProviderHealth = ProviderHealth
 providers_registry.ProviderSpec = ProviderSpec
 providers_registry.ProviderRegistrationError = ProviderRegistrationError
 providers_registry.registry = registry
 providers_registry.default_registry = registry
 providers_registry.__all__ = [
+    "ProviderHealth",
     "ProviderRegistry",
     "ProviderSpec",
     "ProviderRegistrationError",
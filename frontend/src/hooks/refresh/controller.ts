@@ -2,10 +2,11 @@ import { useCallback, useEffect, useMemo, useRef, useState } from 'react'
 
 import { TOAST_AUTO_DISMISS_MS } from '../../constants/toast'
 import { TOAST_MESSAGES } from '../../constants/messages'
-import { fetchRefreshStatus, postRefresh } from '../../lib/api'
+import { fetchRefreshStatus, postRefresh, refreshEventsUrl } from '../../lib/api'
 import type { RefreshStatusResponse } from '../../types'
 import { setLastSync as setServiceWorkerLastSync } from '../../lib/swClient'
 
+import { createRefreshEventStream, supportsRefreshEvents } from './eventStream'
 import { createRefreshStatusPoller, isTerminalState } from './poller'
 
 type RefreshLastSyncSnapshot = {
@@ -153,6 +154,7 @@ export const useRefreshStatusController = (
   const toastSeq = useRef(0)
   const toastTimers = useRef(new Map<string, ReturnType<typeof setTimeout>>())
   const pollerRef = useRef<ReturnType<typeof createRefreshStatusPoller> | null>(null)
+  const streamRef = useRef<ReturnType<typeof createRefreshEventStream> | null>(null)
 
   const cancelToastTimer = useCallback((id: string) => {
     const timer = toastTimers.current.get(id)
@@ -190,6 +192,8 @@ export const useRefreshStatusController = (
   )
 
   const clearTimers = useCallback(() => {
+    streamRef.current?.stop()
+    streamRef.current = null
     pollerRef.current?.stop()
     pollerRef.current = null
     if (timeoutTimer.current) {
@@ -272,7 +276,24 @@ export const useRefreshStatusController = (
         finish(toastFromStatus(response), response)
       } else {
         enqueue({ variant: 'info', message: TOAST_MESSAGES.refreshRequestStarted, detail: null })
-        await pollerRef.current?.run()
+        let eventsUnavailable = !supportsRefreshEvents()
+        if (!eventsUnavailable) {
+          // SSE で進捗を受け取り、使えない環境でだけ status のポーリングに戻す。
+          streamRef.current = createRefreshEventStream({
+            url: refreshEventsUrl(),
+            isActive: () => active.current,
+            onTerminal: (status) => {
+              finish(toastFromStatus(status), status)
+            },
+            onUnavailable: () => {
+              eventsUnavailable = true
+            },
+          })
+          await streamRef.current.run()
+        }
+        if (eventsUnavailable) {
+          await pollerRef.current?.run()
+        }
       }
     } catch (error) {
       finish({
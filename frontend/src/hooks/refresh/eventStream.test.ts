@@ -0,0 +1,93 @@
+import { describe, expect, it, vi } from 'vitest'
+
+import { createRefreshEventStream, type RefreshEventSource } from './eventStream'
+import type { RefreshStatusResponse } from '../../types'
+
+const buildStatus = (state: RefreshStatusResponse['state']): RefreshStatusResponse => ({
+  state,
+  started_at: null,
+  finished_at: null,
+  updated_records: 0,
+  last_error: null,
+})
+
+class FakeEventSource implements RefreshEventSource {
+  onerror: ((event: Event) => void) | null = null
+  readonly close = vi.fn()
+  private readonly listeners = new Map<string, (event: MessageEvent<string>) => void>()
+
+  addEventListener(type: string, listener: (event: MessageEvent<string>) => void): void {
+    this.listeners.set(type, listener)
+  }
+
+  emit(type: string, status: RefreshStatusResponse): void {
+    this.listeners.get(type)?.(new MessageEvent(type, { data: JSON.stringify(status) }))
+  }
+
+  fail(): void {
+    this.onerror?.(new Event('error'))
+  }
+}
+
+describe('createRefreshEventStream', () => {
+  it('終端状態を受け取ると onTerminal を呼んで接続を閉じる', async () => {
+    const source = new FakeEventSource()
+    const onTerminal = vi.fn()
+    const stream = createRefreshEventStream({
+      url: '/api/refresh/events',
+      isActive: () => true,
+      onTerminal,
+      onUnavailable: vi.fn(),
+      createEventSource: () => source,
+    })
+
+    const running = stream.run()
+    source.emit('state', buildStatus('running'))
+    expect(onTerminal).not.toHaveBeenCalled()
+    source.emit('state', buildStatus('success'))
+    await running
+
+    expect(onTerminal).toHaveBeenCalledTimes(1)
+    expect(onTerminal).toHaveBeenCalledWith(buildStatus('success'))
+    expect(source.close).toHaveBeenCalled()
+  })
+
+  it('一度も受信できずに切断されたら onUnavailable でポーリングへ戻す', async () => {
+    const source = new FakeEventSource()
+    const onUnavailable = vi.fn()
+    const stream = createRefreshEventStream({
+      url: '/api/refresh/events',
+      isActive: () => true,
+      onTerminal: vi.fn(),
+      onUnavailable,
+      createEventSource: () => source,
+    })
+
+    const running = stream.run()
+    source.fail()
+    await running
+
+    expect(onUnavailable).toHaveBeenCalledTimes(1)
+    expect(source.close).toHaveBeenCalled()
+  })
+
+  it('受信後の切断は自動再接続に任せる', () => {
+    const source = new FakeEventSource()
+    const onUnavailable = vi.fn()
+    const stream = createRefreshEventStream({
+      url: '/api/refresh/events',
+      isActive: () => true,
+      onTerminal: vi.fn(),
+      onUnavailable,
+      createEventSource: () => source,
+    })
+
+    void stream.run()
+    source.emit('state', buildStatus('running'))
+    source.fail()
+    stream.stop()
+
+    expect(onUnavailable).not.toHaveBeenCalled()
+    expect(source.close).toHaveBeenCalledTimes(1)
+  })
+})
@@ -0,0 +1,80 @@
+import type { RefreshStatusResponse } from '../../types'
+
+import { isTerminalState } from './poller'
+
+export interface RefreshEventSource {
+  addEventListener(type: 'state', listener: (event: MessageEvent<string>) => void): void
+  close(): void
+  onerror: ((event: Event) => void) | null
+}
+
+export interface RefreshEventStreamOptions {
+  readonly url: string
+  readonly isActive: () => boolean
+  readonly onTerminal: (status: RefreshStatusResponse) => void
+  // 一度も受信できないまま切断された場合に呼ばれる。呼び出し側はポーリングへ切り替える。
+  readonly onUnavailable: () => void
+  readonly createEventSource?: (url: string) => RefreshEventSource
+}
+
+export interface RefreshEventStream {
+  readonly run: () => Promise<void>
+  readonly stop: () => void
+}
+
+export const supportsRefreshEvents = (): boolean => typeof EventSource !== 'undefined'
+
+export const createRefreshEventStream = (
+  options: RefreshEventStreamOptions,
+): RefreshEventStream => {
+  let source: RefreshEventSource | null = null
+  let settle: (() => void) | null = null
+
+  const close = (): void => {
+    source?.close()
+    source = null
+    settle?.()
+    settle = null
+  }
+
+  return {
+    run() {
+      close()
+      if (!options.isActive()) return Promise.resolve()
+      return new Promise<void>((resolve) => {
+        settle = resolve
+        const create = options.createEventSource ?? ((url: string) => new EventSource(url))
+        const current = create(options.url)
+        source = current
+        let received = false
+
+        current.addEventListener('state', (event) => {
+          received = true
+          if (!options.isActive()) {
+            close()
+            return
+          }
+          let status: RefreshStatusResponse
+          try {
+            status = JSON.parse(event.data) as RefreshStatusResponse
+          } catch {
+            return
+          }
+          if (isTerminalState(status.state)) {
+            close()
+            options.onTerminal(status)
+          }
+        })
+        current.onerror = () => {
+          // 受信実績があればブラウザの自動再接続に任せる。
+          if (received) return
+          close()
+          if (options.isActive()) options.onUnavailable()
+        }
+      })
+    },
+    stop() {
+      close()
+    },
+  }
+}
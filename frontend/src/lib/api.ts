@@ -373,6 +373,8 @@ export const fetchRefreshStatus = async (): Promise<RefreshStatusResponse> => {
   return data
 }
 
+export const refreshEventsUrl = (): string => buildUrl('/refresh/events')
+
 export interface PriceSeriesResponse {
   readonly series: PriceSeries
   readonly isMarketFallback: boolean
@@ -49,12 +49,23 @@ export interface RefreshResponse {
   last_error?: string | null
 }
 
+export interface RefreshStage {
+  stage: string
+  duration_ms: number
+  rows: number
+  rows_per_sec: number | null
+  rss_start_kb: number | null
+  rss_end_kb: number | null
+}
+
 export interface RefreshStatusResponse {
   state: RefreshState
   started_at: string | null
   finished_at: string | null
   updated_records: number
   last_error: string | null
+  run_id?: number | null
+  stages?: RefreshStage[]
 }
 
 export interface RefreshStatus {
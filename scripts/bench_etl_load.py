@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+BACKEND_DIR = ROOT_DIR / "backend"
+for candidate in (ROOT_DIR, BACKEND_DIR):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from app import db as db_module  # noqa: E402
+from app import etl as etl_module  # noqa: E402
+
+_SCOPES = ("national", "city:tokyo", "city:osaka", "city:nagoya")
+
+
+def _open_connection(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+def _prepare_database(path: Path, *, crops: int) -> None:
+    conn = _open_connection(path)
+    try:
+        db_module.init_db(conn)
+        conn.execute(
+            "INSERT INTO theme_tokens (token, hex_color, text_color) VALUES (?, ?, ?)",
+            ("accent.bench", "#22c55e", "#000000"),
+        )
+        conn.executemany(
+            "INSERT INTO market_scopes (scope, display_name, theme_token) VALUES (?, ?, ?)",
+            [(scope, scope, "accent.bench") for scope in _SCOPES],
+        )
+        conn.executemany(
+            "INSERT INTO crops (id, name, category) VALUES (?, ?, 'leaf')",
+            [(crop_id, f"crop-{crop_id}") for crop_id in range(1, crops + 1)],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _build_records(rows: int, *, crops: int) -> list[dict[str, Any]]:
+    weeks_per_series = max(1, rows // (crops * len(_SCOPES)))
+    records: list[dict[str, Any]] = []
+    for index in range(rows):
+        series, week_offset = divmod(index, weeks_per_series)
+        crop_id = series % crops + 1
+        scope = _SCOPES[(series // crops) % len(_SCOPES)]
+        year = 2000 + week_offset // 52
+        week = week_offset % 52 + 1
+        records.append(
+            {
+                "crop_id": crop_id,
+                "scope": scope,
+                "week": f"{year}-W{week:02d}",
+                "avg_price": float(100 + index % 400),
+                "stddev": 5.0,
+                "unit": "円/kg",
+                "source": "bench",
+            }
+        )
+    return records
+
+
+def _run_mode(
+    mode: etl_module.LoadMode, records: list[dict[str, Any]], *, crops: int, workdir: Path
+) -> tuple[float, int]:
+    path = workdir / f"bench-{mode}.db"
+    _prepare_database(path, crops=crops)
+    conn = _open_connection(path)
+    try:
+        started = time.perf_counter()
+        updated = etl_module.run_etl(conn, data_loader=lambda: records, load_mode=mode)
+        elapsed = time.perf_counter() - started
+    finally:
+        conn.close()
+    return elapsed, updated
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare ETL load modes on a synthetic feed")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of feed records")
+    parser.add_argument("--crops", type=int, default=500, help="Number of distinct crops")
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        default=["upsert", "staging"],
+        choices=["upsert", "staging"],
+        help="Load modes to measure",
+    )
+    args = parser.parse_args(argv)
+
+    records = _build_records(args.rows, crops=args.crops)
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in args.modes:
+            elapsed, updated = _run_mode(mode, records, crops=args.crops, workdir=Path(tmp))
+            print(
+                f"{mode:<8} rows={updated:>9} elapsed={elapsed:8.2f}s"
+                f" throughput={updated / elapsed:>10.0f} rows/s"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
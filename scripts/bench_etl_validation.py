@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+BACKEND_DIR = ROOT_DIR / "backend"
+for candidate in (ROOT_DIR, BACKEND_DIR):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from app import db as db_module  # noqa: E402
+from app.etl import expectations  # noqa: E402
+
+_SCOPES = ("national", "city:tokyo", "city:osaka", "city:nagoya")
+
+
+def _prepare_connection(*, crops: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    db_module.init_db(conn)
+    conn.execute(
+        "INSERT INTO theme_tokens (token, hex_color, text_color) VALUES (?, ?, ?)",
+        ("accent.bench", "#22c55e", "#000000"),
+    )
+    conn.executemany(
+        "INSERT INTO market_scopes (scope, display_name, theme_token) VALUES (?, ?, ?)",
+        [(scope, scope, "accent.bench") for scope in _SCOPES],
+    )
+    conn.executemany(
+        "INSERT INTO crops (id, name, category) VALUES (?, ?, 'leaf')",
+        [(crop_id, f"crop-{crop_id}") for crop_id in range(1, crops + 1)],
+    )
+    conn.commit()
+    return conn
+
+
+def _build_dataset(rows: int, *, crops: int, invalid_ratio: float) -> list[dict[str, Any]]:
+    invalid_every = int(1 / invalid_ratio) if invalid_ratio > 0 else 0
+    dataset: list[dict[str, Any]] = []
+    for index in range(rows):
+        record: dict[str, Any] = {
+            "crop_id": index % crops + 1,
+            "scope": _SCOPES[index % len(_SCOPES)],
+            "avg_price": float(100 + index % 400),
+        }
+        if invalid_every and index % invalid_every == 0:
+            record["scope"] = "city:unknown"
+            record["avg_price"] = -1.0
+        dataset.append(record)
+    return dataset
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure ETL market price validation scaling")
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000, 1_000_000],
+        help="Batch sizes to validate",
+    )
+    parser.add_argument("--crops", type=int, default=500, help="Number of distinct crops")
+    parser.add_argument(
+        "--invalid-ratio", type=float, default=0.01, help="Share of rows that fail validation"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of repetitions per size")
+    args = parser.parse_args(argv)
+
+    conn = _prepare_connection(crops=args.crops)
+    try:
+        for rows in args.rows:
+            dataset = _build_dataset(rows, crops=args.crops, invalid_ratio=args.invalid_ratio)
+            best = float("inf")
+            rejected = 0
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                result = expectations.partition_market_prices(conn, dataset)
+                best = min(best, time.perf_counter() - started)
+                rejected = len(result.rejected)
+            print(
+                f"rows={rows:>9} rejected={rejected:>7} elapsed={best:8.3f}s"
+                f" per_row={best / rows * 1e9:8.0f}ns"
+            )
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
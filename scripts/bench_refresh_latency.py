@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+BACKEND_DIR = ROOT_DIR / "backend"
+
+_PROBE_PATH = "/api/crops"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def _write_feed(path: Path, db_path: Path, rows: int) -> None:
+    conn = sqlite3.connect(db_path)
+    try:
+        crop_ids = [int(row[0]) for row in conn.execute("SELECT id FROM crops")]
+        scopes = [str(row[0]) for row in conn.execute("SELECT scope FROM market_scopes")]
+    finally:
+        conn.close()
+    weeks_per_series = max(1, rows // (len(crop_ids) * len(scopes)))
+    records: list[dict[str, Any]] = []
+    for index in range(rows):
+        series, week_offset = divmod(index, weeks_per_series)
+        records.append(
+            {
+                "crop_id": crop_ids[series % len(crop_ids)],
+                "scope": scopes[(series // len(crop_ids)) % len(scopes)],
+                "week": f"{2000 + week_offset // 52}-W{week_offset % 52 + 1:02d}",
+                "avg_price": float(100 + index % 400),
+                "unit": "円/kg",
+                "source": "bench",
+            }
+        )
+    path.write_text(json.dumps(records), encoding="utf-8")
+
+
+def _wait_ready(client: httpx.Client, deadline: float) -> None:
+    while time.monotonic() < deadline:
+        try:
+            if client.get(_PROBE_PATH).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("server did not become ready")
+
+
+def _probe(client: httpx.Client, samples: list[float]) -> None:
+    started = time.perf_counter()
+    response = client.get(_PROBE_PATH)
+    samples.append((time.perf_counter() - started) * 1000.0)
+    response.raise_for_status()
+
+
+def _summary(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (
+        f"n={len(ordered):>5} p50={statistics.median(ordered):7.2f}ms"
+        f" p95={p95:7.2f}ms max={ordered[-1]:8.2f}ms"
+    )
+
+
+def _run_mode(executor: str, *, workdir: Path, rows: int, idle_probes: int) -> None:
+    db_path = workdir / f"bench-{executor}.db"
+    feed_path = workdir / "feed.json"
+    env = dict(os.environ, PLANTING_DB_PATH=str(db_path), PLANTING_ETL_EXECUTOR=executor)
+    subprocess.run(
+        [sys.executable, "-c", "from app.dependencies import prepare_database as p; p()"],
+        cwd=BACKEND_DIR,
+        env=env,
+        check=True,
+    )
+    if not feed_path.exists():
+        _write_feed(feed_path, db_path, rows)
+    env["PLANTING_ETL_SOURCES"] = f"bench={feed_path}"
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=60.0) as client:
+            _wait_ready(client, time.monotonic() + 30.0)
+            idle: list[float] = []
+            for _ in range(idle_probes):
+                _probe(client, idle)
+
+            busy: list[float] = []
+            started = time.perf_counter()
+            client.post("/api/refresh", headers={"Idempotency-Key": f"bench-{executor}"})
+            while True:
+                _probe(client, busy)
+                state = client.get("/api/refresh/status").json()["state"]
+                if state != "running":
+                    break
+            elapsed = time.perf_counter() - started
+            print(f"{executor:<8} idle    {_summary(idle)}")
+            print(f"{executor:<8} refresh {_summary(busy)} state={state} refresh={elapsed:6.2f}s")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure API latency while a refresh runs inline vs in the ETL worker"
+    )
+    parser.add_argument("--rows", type=int, default=200_000, help="Feed rows for the refresh")
+    parser.add_argument("--idle-probes", type=int, default=200, help="Probes before refresh")
+    parser.add_argument(
+        "--executors",
+        nargs="+",
+        default=["inline", "process"],
+        choices=["inline", "process"],
+        help="ETL executors to compare",
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for executor in args.executors:
+            _run_mode(executor, workdir=Path(tmp), rows=args.rows, idle_probes=args.idle_probes)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
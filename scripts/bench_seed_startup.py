@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+BACKEND_DIR = ROOT_DIR / "backend"
+for candidate in (ROOT_DIR, BACKEND_DIR):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from app import db as db_module  # noqa: E402
+from app import seed as seed_module  # noqa: E402
+from app.seed.data_loader import DEFAULT_DATA_DIR  # noqa: E402
+from scripts import export_seed  # noqa: E402
+
+_CATEGORIES = ("leaf", "root", "flower")
+_REGIONS = ("cold", "temperate", "warm")
+
+
+def _open_connection(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+def _build_data_dir(target: Path, *, crops: int, weeks: int) -> None:
+    shutil.copytree(DEFAULT_DATA_DIR, target)
+    crop_rows: list[dict[str, Any]] = []
+    growth_rows: list[dict[str, Any]] = []
+    for crop_id in range(1, crops + 1):
+        crop_rows.append(
+            {
+                "id": crop_id,
+                "name": f"crop-{crop_id}",
+                "category": _CATEGORIES[crop_id % len(_CATEGORIES)],
+                "price_weekly": [
+                    {
+                        "week": f"{2000 + offset // 52}-W{offset % 52 + 1:02d}",
+                        "price": float(100 + (crop_id + offset) % 400),
+                        "source": "bench",
+                    }
+                    for offset in range(weeks)
+                ],
+            }
+        )
+        growth_rows.extend(
+            {"crop_id": crop_id, "region": region, "days": 60 + crop_id % 40} for region in _REGIONS
+        )
+    (target / "crops.json").write_text(json.dumps(crop_rows, ensure_ascii=False), "utf-8")
+    (target / "growth_days.json").write_text(json.dumps(growth_rows), "utf-8")
+    (target / "price_weekly.sample.json").write_text("[]", "utf-8")
+
+
+def _startup(db_path: Path, data_dir: Path) -> tuple[float, bool]:
+    # dependencies.prepare_database と同じ手順を計測する。
+    started = time.perf_counter()
+    conn = _open_connection(db_path)
+    try:
+        installed = seed_module.install_configured_snapshot(conn)
+        db_module.init_db(conn)
+        seeded = installed or seed_module.seed_if_changed(conn, data_dir)
+    finally:
+        conn.close()
+    return time.perf_counter() - started, seeded
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure startup with and without reseeding")
+    parser.add_argument("--crops", type=int, default=20_000, help="Number of generated crops")
+    parser.add_argument("--weeks", type=int, default=52, help="Weekly prices per crop")
+    parser.add_argument("--restarts", type=int, default=3, help="Warm restarts to measure")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp) / "data"
+        _build_data_dir(data_dir, crops=args.crops, weeks=args.weeks)
+        db_path = Path(tmp) / "startup.db"
+
+        elapsed, seeded = _startup(db_path, data_dir)
+        print(f"cold     seeded={seeded!s:<5} elapsed={elapsed:8.3f}s")
+        for attempt in range(1, args.restarts + 1):
+            elapsed, seeded = _startup(db_path, data_dir)
+            print(f"restart{attempt} seeded={seeded!s:<5} elapsed={elapsed:8.3f}s")
+
+        snapshot_path = Path(tmp) / "seed-snapshot.db"
+        export_seed._export_database(
+            snapshot_path, data_dir=data_dir, data_date=None, today=dt.date.today()
+        )
+        os.environ[seed_module.snapshot.SNAPSHOT_ENV] = str(snapshot_path)
+        elapsed, seeded = _startup(Path(tmp) / "from-snapshot.db", data_dir)
+        print(f"snapshot seeded={seeded!s:<5} elapsed={elapsed:8.3f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import Any
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+BACKEND_DIR = ROOT_DIR / "backend"
+for candidate in (ROOT_DIR, BACKEND_DIR):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from app import db as db_module  # noqa: E402
+from app.seed.writers import _crops_common as common  # noqa: E402
+from app.seed.writers import crops as crops_writer  # noqa: E402
+
+_CATEGORIES = ("Leafy", "root", "flowering")
+_UNITS = ("円/kg", "円/100g")
+
+CropsWriter = Callable[[sqlite3.Connection, Iterable[Mapping[str, Any]]], None]
+
+
+def _legacy_write_crops(conn: sqlite3.Connection, crops: Iterable[Mapping[str, Any]]) -> None:
+    # 比較用: 1 行ずつ execute していた旧実装。
+    crops_list = list(crops)
+    for crop in crops_list:
+        crop_id = int(crop["id"])
+        category = common.normalize_crop_category(crop["category"])
+        conn.execute(
+            "INSERT OR IGNORE INTO crops (id, name, category) VALUES (?, ?, ?)",
+            (crop_id, crop["name"], category),
+        )
+        conn.execute(
+            "UPDATE crops SET name = ?, category = ? WHERE id = ?",
+            (crop["name"], category, crop_id),
+        )
+    for crop_id, price in common.iter_price_records(crops_list):
+        conn.execute(
+            "INSERT OR REPLACE INTO price_weekly"
+            " (crop_id, week, avg_price, stddev, unit, source) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                crop_id,
+                common.normalize_week_value(price["week"]),
+                common.optional_float(price.get("price")),
+                common.optional_float(price.get("stddev")),
+                price.get("unit", "円/kg"),
+                price.get("source", "seed"),
+            ),
+        )
+    for crop_id, price in common.iter_market_price_records(crops_list):
+        unit, factor = common.convert_unit(str(price.get("unit", "円/kg")))
+        avg_value = common.optional_float(price.get("avg_price"))
+        conn.execute(
+            "INSERT OR REPLACE INTO market_prices"
+            " (crop_id, scope, week, avg_price, stddev, unit, source)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                crop_id,
+                str(price["scope"]),
+                common.normalize_week_value(price["week"]),
+                None if avg_value is None else avg_value * factor,
+                None,
+                unit,
+                price.get("source", "seed"),
+            ),
+        )
+
+
+def _iter_crop_batches(
+    *, crops: int, weeks: int, market_weeks: int, batch: int
+) -> Iterator[list[dict[str, Any]]]:
+    # 10 年分の週次価格を全作物ぶんメモリに載せないよう、作物単位で分割して渡す。
+    for start in range(1, crops + 1, batch):
+        yield [
+            {
+                "id": crop_id,
+                "name": f"crop-{crop_id}",
+                "category": _CATEGORIES[crop_id % len(_CATEGORIES)],
+                "price_weekly": [
+                    {"week": 200001 + offset // 52 * 100 + offset % 52, "price": 100 + offset}
+                    for offset in range(weeks)
+                ],
+                "market_prices": [
+                    {
+                        "scope": "national",
+                        "week": f"{2000 + offset // 52}-W{offset % 52 + 1:02d}",
+                        "avg_price": 10 + offset % 40,
+                        "unit": _UNITS[offset % len(_UNITS)],
+                    }
+                    for offset in range(market_weeks)
+                ],
+            }
+            for crop_id in range(start, min(start + batch, crops + 1))
+        ]
+
+
+def _run_writer(
+    name: str, writer: CropsWriter, args: argparse.Namespace, *, workdir: Path
+) -> tuple[float, int]:
+    path = workdir / f"bench-{name}.db"
+    conn = sqlite3.connect(path)
+    try:
+        db_module.init_db(conn)
+        conn.commit()
+        batches = _iter_crop_batches(
+            crops=args.crops, weeks=args.weeks, market_weeks=args.market_weeks, batch=args.batch
+        )
+        elapsed = 0.0
+        for crops in batches:
+            started = time.perf_counter()
+            writer(conn, crops)
+            elapsed += time.perf_counter() - started
+        started = time.perf_counter()
+        conn.commit()
+        elapsed += time.perf_counter() - started
+        rows = conn.execute("SELECT COUNT(*) FROM price_weekly").fetchone()[0]
+    finally:
+        conn.close()
+    return elapsed, int(rows)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare seed crop writers on synthetic data")
+    parser.add_argument("--crops", type=int, default=100_000, help="Number of crops")
+    parser.add_argument("--weeks", type=int, default=520, help="Weekly prices per crop")
+    parser.add_argument("--market-weeks", type=int, default=52, help="Market prices per crop")
+    parser.add_argument("--batch", type=int, default=1_000, help="Crops per writer call")
+    parser.add_argument(
+        "--writers",
+        nargs="+",
+        default=["legacy", "batched"],
+        choices=["legacy", "batched"],
+        help="Writers to measure",
+    )
+    args = parser.parse_args(argv)
+
+    writers: dict[str, CropsWriter] = {
+        "legacy": _legacy_write_crops,
+        "batched": crops_writer.write_crops,
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.writers:
+            elapsed, rows = _run_writer(name, writers[name], args, workdir=Path(tmp))
+            print(
+                f"{name:<8} price_rows={rows:>10} elapsed={elapsed:8.2f}s"
+                f" throughput={rows / elapsed:>10.0f} rows/s"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
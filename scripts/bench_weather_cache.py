@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+from collections.abc import Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+BACKEND_DIR = ROOT_DIR / "backend"
+for candidate in (ROOT_DIR, BACKEND_DIR):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from app.compat import UTC  # noqa: E402
+from app.services.weather import WeatherService  # noqa: E402
+
+_PAYLOAD: dict[str, Any] = {
+    "daily": [
+        {"date": "2024-01-01", "tmax": 11.2, "tmin": 2.3, "rain": 0.0, "wind": 3.4},
+        {"date": "2024-01-02", "tmax": 13.4, "tmin": 4.5, "rain": 1.2, "wind": 5.6},
+    ],
+    "fetchedAt": "2024-01-01T00:00:00+00:00",
+}
+
+
+class _StubAdapter:
+    async def get_daily(self, lat: float, lon: float) -> dict[str, Any]:
+        return _PAYLOAD
+
+
+def _coordinate(index: int) -> tuple[float, float]:
+    # 0.0001 度刻みで重複しない座標を日本付近に敷き詰める。
+    row, column = divmod(index, 10_000)
+    return 30.0 + row * 0.0001, 130.0 + column * 0.0001
+
+
+async def _soak(args: argparse.Namespace) -> None:
+    service = WeatherService(
+        adapter_factory=_StubAdapter,
+        clock=lambda: datetime(2024, 1, 1, tzinfo=UTC),
+        cache_max_entries=args.max_entries,
+        cache_max_bytes=args.max_bytes,
+        # 格子化すると座標が同じキーに畳まれるため、キャッシュ上限の検証では無効にする。
+        grid_degrees=0,
+    )
+    tracemalloc.start()
+    started = time.perf_counter()
+    for index in range(args.coordinates):
+        await service.get_weather(*_coordinate(index))
+        if (index + 1) % args.report_every == 0:
+            current, peak = tracemalloc.get_traced_memory()
+            stats = service.cache_stats()
+            print(
+                f"requests={index + 1:>9} entries={stats.entries:>7} evictions={stats.evictions:>9}"
+                f" traced={current / 1_048_576:7.1f}MiB peak={peak / 1_048_576:7.1f}MiB"
+                f" elapsed={time.perf_counter() - started:7.1f}s"
+            )
+    tracemalloc.stop()
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Soak the weather cache with distinct coordinates")
+    parser.add_argument("--coordinates", type=int, default=1_000_000, help="Distinct coordinates")
+    parser.add_argument("--max-entries", type=int, default=10_000, help="Cache entry cap")
+    parser.add_argument("--max-bytes", type=int, default=32 * 1024 * 1024, help="Cache byte cap")
+    parser.add_argument("--report-every", type=int, default=100_000, help="Reporting interval")
+    args = parser.parse_args(argv)
+
+    asyncio.run(_soak(args))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Sequence
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+BACKEND_DIR = ROOT_DIR / "backend"
+for candidate in (ROOT_DIR, BACKEND_DIR):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from app.services.weather import (  # noqa: E402
+    OpenMeteoWeatherAdapter,
+    WeatherClientConfig,
+    create_weather_client,
+)
+
+_BODY = json.dumps(
+    {
+        "daily": {
+            "time": ["2024-01-01", "2024-01-02"],
+            "temperature_2m_max": [11.2, 13.4],
+            "temperature_2m_min": [2.3, 4.5],
+            "precipitation_sum": [0.0, 1.2],
+            "wind_speed_10m_max": [3.4, 5.6],
+        }
+    }
+).encode()
+_RESPONSE = (
+    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+    + f"Content-Length: {len(_BODY)}\r\nConnection: keep-alive\r\n\r\n".encode()
+    + _BODY
+)
+
+
+def _self_signed_cert(workdir: Path) -> tuple[Path, Path]:
+    cert, key = workdir / "stub.pem", workdir / "stub.key"
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=127.0.0.1",
+            "-addext",
+            "subjectAltName=IP:127.0.0.1",
+            "-keyout",
+            str(key),
+            "-out",
+            str(cert),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    # Open-Meteo 互換の固定レスポンスを keep-alive で返し続ける最小のスタブ。
+    try:
+        while await reader.readuntil(b"\r\n\r\n"):
+            writer.write(_RESPONSE)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _measure(adapter: OpenMeteoWeatherAdapter, requests: int) -> list[float]:
+    latencies: list[float] = []
+    for index in range(requests):
+        started = time.perf_counter()
+        await adapter.get_daily(35.0 + index * 0.001, 139.0)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+async def _run(args: argparse.Namespace, ssl_context: ssl.SSLContext | None) -> None:
+    server = await asyncio.start_server(_handle, "127.0.0.1", 0, ssl=ssl_context)
+    port = server.sockets[0].getsockname()[1]
+    scheme = "https" if ssl_context is not None else "http"
+    base_url = f"{scheme}://127.0.0.1:{port}/v1/forecast"
+    async with server:
+        per_call = OpenMeteoWeatherAdapter(base_url=base_url)
+        results = {"per-call": await _measure(per_call, args.requests)}
+
+        client = create_weather_client(WeatherClientConfig())
+        try:
+            shared = OpenMeteoWeatherAdapter(client=client, base_url=base_url)
+            results["shared"] = await _measure(shared, args.requests)
+        finally:
+            await client.aclose()
+
+    for name, latencies in results.items():
+        ordered = sorted(latencies)
+        print(
+            f"{name:<9} {scheme} requests={len(latencies):>5}"
+            f" mean={statistics.fmean(latencies):7.2f}ms"
+            f" p50={ordered[len(ordered) // 2]:7.2f}ms"
+            f" p95={ordered[int(len(ordered) * 0.95)]:7.2f}ms"
+        )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare per-call and shared weather HTTP clients against a local stub"
+    )
+    parser.add_argument("--requests", type=int, default=500, help="Sequential requests per mode")
+    parser.add_argument("--plain", action="store_true", help="Use HTTP instead of TLS")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ssl_context = None
+        if not args.plain:
+            cert, key = _self_signed_cert(Path(tmp))
+            ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            ssl_context.load_cert_chain(cert, key)
+            # 既定アダプタが内部で作るクライアントにも自己署名証明書を信頼させる。
+            os.environ["SSL_CERT_FILE"] = str(cert)
+        asyncio.run(_run(args, ssl_context))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
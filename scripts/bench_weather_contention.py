@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from collections.abc import Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+BACKEND_DIR = ROOT_DIR / "backend"
+for candidate in (ROOT_DIR, BACKEND_DIR):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from app.compat import UTC  # noqa: E402
+from app.services.weather import WeatherService  # noqa: E402
+
+_PAYLOAD: dict[str, Any] = {
+    "daily": [
+        {"date": "2024-01-01", "tmax": 11.2, "tmin": 2.3, "rain": 0.0, "wind": 3.4},
+        {"date": "2024-01-02", "tmax": 13.4, "tmin": 4.5, "rain": 1.2, "wind": 5.6},
+    ],
+    "fetchedAt": "2024-01-01T00:00:00+00:00",
+}
+
+
+class _StubAdapter:
+    async def get_daily(self, lat: float, lon: float) -> dict[str, Any]:
+        # 上流待ちを模して一度だけイベントループへ制御を返す。
+        await asyncio.sleep(0)
+        return _PAYLOAD
+
+
+async def _ticker(stop: asyncio.Event, lags: list[float], interval: float) -> None:
+    # 予定時刻からの遅れをイベントループの詰まりとして記録する。
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - expected) * 1000)
+
+
+async def _worker(
+    service: WeatherService,
+    rng: random.Random,
+    args: argparse.Namespace,
+    latencies: list[float],
+) -> None:
+    for _ in range(args.requests):
+        if rng.random() < args.miss_ratio:
+            lat, lon = 10.0 + rng.random() * 30, 120.0 + rng.random() * 30
+        else:
+            index = rng.randrange(args.keys)
+            lat, lon = 30.0 + index * 0.001, 130.0
+        started = time.perf_counter()
+        await service.get_weather(lat, lon)
+        latencies.append((time.perf_counter() - started) * 1000)
+        # 実際のリクエストはソケット I/O で必ず制御を返すので、その境目を模す。
+        await asyncio.sleep(0)
+
+
+async def _run(args: argparse.Namespace) -> None:
+    service = WeatherService(
+        adapter_factory=_StubAdapter,
+        clock=lambda: datetime(2024, 1, 1, tzinfo=UTC),
+        grid_degrees=0,
+    )
+    for index in range(args.keys):
+        await service.get_weather(30.0 + index * 0.001, 130.0)
+
+    stop = asyncio.Event()
+    lags: list[float] = []
+    ticker = asyncio.create_task(_ticker(stop, lags, args.tick_ms / 1000))
+    latencies: list[float] = []
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _worker(service, random.Random(seed), args, latencies)
+            for seed in range(args.concurrency)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+
+    ordered = sorted(latencies)
+    lag_order = sorted(lags) or [0.0]
+    stats = service.cache_stats()
+    print(
+        f"concurrency={args.concurrency} requests={len(latencies)}"
+        f" throughput={len(latencies) / elapsed:,.0f}/s"
+        f" mean={statistics.fmean(latencies):.3f}ms"
+        f" p99={ordered[int(len(ordered) * 0.99)]:.3f}ms"
+    )
+    print(
+        f"loop-lag p50={lag_order[len(lag_order) // 2]:.3f}ms"
+        f" p99={lag_order[int(len(lag_order) * 0.99)]:.3f}ms max={lag_order[-1]:.3f}ms"
+        f" hits={stats.hits} misses={stats.misses}"
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Drive WeatherService with many concurrent coroutines"
+    )
+    parser.add_argument("--concurrency", type=int, default=5_000, help="Concurrent coroutines")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per coroutine")
+    parser.add_argument("--keys", type=int, default=1_000, help="Warm cache keys")
+    parser.add_argument("--miss-ratio", type=float, default=0.05, help="Share of cold keys")
+    parser.add_argument("--tick-ms", type=float, default=1.0, help="Loop-lag probe interval")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs")
+    args = parser.parse_args(argv)
+
+    for _ in range(args.repeat):
+        asyncio.run(_run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
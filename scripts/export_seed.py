@@ -2,7 +2,10 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
+import hashlib
+import lzma
 import os
+import shutil
 import sqlite3
 import subprocess
 import sys
@@ -29,6 +32,11 @@ CREATE TABLE IF NOT EXISTS metadata (
 """.strip()
 
 
+# 4096/8192/16384/65536 を 2 万作物の合成データで比べ、生ファイル・圧縮後とも最小だった値。
+DEFAULT_PAGE_SIZE = 8192
+_SIDECAR_SUFFIXES = (".xz", ".sha256")
+
+
 def _today() -> dt.date:
     return dt.date.today()
 
@@ -37,16 +45,30 @@ def _utcnow() -> dt.datetime:
     return dt.datetime.now(dt.timezone.utc)
 
 
+def _source_date_epoch() -> dt.datetime | None:
+    # SOURCE_DATE_EPOCH があれば時刻・日付をすべてそこから決め、同じ入力から同じバイト列を得る。
+    epoch = os.getenv("SOURCE_DATE_EPOCH")
+    if not epoch:
+        return None
+    return dt.datetime.fromtimestamp(int(epoch), dt.timezone.utc)
+
+
+def _exported_at() -> str:
+    return (_source_date_epoch() or _utcnow()).isoformat()
+
+
+def _export_date() -> dt.date:
+    fixed = _source_date_epoch()
+    return fixed.date() if fixed is not None else _today()
+
+
 def _default_output(today: dt.date) -> Path:
     return _DATA_DIR / f"seed-{today:%Y%m%d}.db"
 
 
 def _resolve_schema_version() -> str:
-    for key in ("PLANTING_SCHEMA_VERSION", "VITE_SCHEMA_VERSION"):
-        value = os.getenv(key)
-        if value:
-            return value
-    return "unknown"
+    # サーバー側のスナップショット検証と同じ規則で解決する。
+    return seed_module.snapshot.resolve_schema_version()
 
 
 def _resolve_git_commit() -> str:
@@ -56,9 +78,14 @@ def _resolve_git_commit() -> str:
         return "unknown"
 
 
+def _sidecar_path(path: Path, suffix: str) -> Path:
+    return path.with_name(path.name + suffix)
+
+
 def _ensure_output_path(path: Path) -> None:
-    if path.exists():
-        raise SystemExit(f"Output file already exists: {path}")
+    for candidate in (path, *(_sidecar_path(path, suffix) for suffix in _SIDECAR_SUFFIXES)):
+        if candidate.exists():
+            raise SystemExit(f"Output file already exists: {candidate}")
     path.parent.mkdir(parents=True, exist_ok=True)
 
 
@@ -76,6 +103,7 @@ def _write_metadata(
     data_fetched_at: str,
     git_commit: str,
     exported_at: str,
+    seed_fingerprint: str,
 ) -> None:
     conn.execute(_METADATA_TABLE_SQL)
     records = [
@@ -83,20 +111,61 @@ def _write_metadata(
         ("data_fetched_at", data_fetched_at),
         ("git_commit", git_commit),
         ("exported_at", exported_at),
+        # 取り込み後の起動で seed_if_changed が JSON を読み直さないようにする。
+        (seed_module.fingerprint.SEED_FINGERPRINT_KEY, seed_fingerprint),
     ]
     conn.executemany("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", records)
 
 
+def _compact_database(build_path: Path, output_path: Path, *, page_size: int) -> None:
+    conn = sqlite3.connect(build_path)
+    try:
+        conn.execute("ANALYZE")
+        conn.commit()
+        # VACUUM INTO は保留中の page_size を出力側に適用し、空きページのない新しいファイルを書く。
+        conn.execute(f"PRAGMA page_size = {int(page_size)}")
+        conn.execute("VACUUM INTO ?", (str(output_path),))
+    finally:
+        conn.close()
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_sidecars(output_path: Path) -> str:
+    compressed_path = _sidecar_path(output_path, ".xz")
+    # xz はヘッダに時刻を持たず再現可能で、gzip の 32KiB 窓では届かない
+    # 重複インデックス同士の一致もファイル全体から拾える。
+    with output_path.open("rb") as src, lzma.open(compressed_path, "wb") as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+
+    content_hash = _sha256(output_path)
+    lines = [
+        f"{content_hash}  {output_path.name}",
+        f"{_sha256(compressed_path)}  {compressed_path.name}",
+    ]
+    _sidecar_path(output_path, ".sha256").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return content_hash
+
+
 def _export_database(
     output_path: Path,
     *,
     data_dir: Path | None,
     data_date: str | None,
     today: dt.date,
-) -> None:
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> str:
     _ensure_output_path(output_path)
     payload: SeedPayload = load_seed_payload(data_dir=data_dir)
-    conn = _open_connection(output_path)
+    build_path = _sidecar_path(output_path, ".build")
+    build_path.unlink(missing_ok=True)
+    conn = _open_connection(build_path)
     try:
         db_module.init_db(conn)
         write_seed_payload(
@@ -108,7 +177,7 @@ def _export_database(
             market_scope_categories=payload.market_scope_categories,
             theme_tokens=payload.theme_tokens,
         )
-        exported_at = _utcnow().isoformat()
+        exported_at = _exported_at()
         fetched_at = data_date or today.isoformat()
         _write_metadata(
             conn,
@@ -116,28 +185,51 @@ def _export_database(
             data_fetched_at=fetched_at,
             git_commit=_resolve_git_commit(),
             exported_at=exported_at,
+            seed_fingerprint=seed_module.seed_fingerprint(data_dir),
         )
         conn.commit()
     finally:
         conn.close()
 
+    try:
+        _compact_database(build_path, output_path, page_size=page_size)
+    finally:
+        build_path.unlink(missing_ok=True)
+    return _write_sidecars(output_path)
+
 
 def main(argv: Sequence[str] | None = None) -> int:
-    parser = argparse.ArgumentParser(description="Export seed payload into sqlite database")
+    parser = argparse.ArgumentParser(
+        description="Export seed payload into sqlite database",
+        epilog=(
+            "exported_at, the default --data-date and the default output name come from the"
+            " current time unless SOURCE_DATE_EPOCH is set. Set SOURCE_DATE_EPOCH (for example"
+            " to `git log -1 --format=%ct`) to get byte-identical exports of the same inputs."
+        ),
+    )
     parser.add_argument("--output", type=Path, help="Output database path")
     parser.add_argument("--data-dir", type=Path, help="Seed data directory", default=None)
-    parser.add_argument("--data-date", type=str, help="Data acquisition date (YYYY-MM-DD)")
+    parser.add_argument(
+        "--data-date",
+        type=str,
+        help="Data acquisition date (YYYY-MM-DD); defaults to the SOURCE_DATE_EPOCH date or today",
+    )
+    parser.add_argument(
+        "--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="SQLite page size of the export"
+    )
     args = parser.parse_args(argv)
 
-    today = _today()
+    today = _export_date()
     output_path = args.output if args.output is not None else _default_output(today)
 
-    _export_database(
+    content_hash = _export_database(
         output_path,
         data_dir=args.data_dir,
         data_date=args.data_date,
         today=today,
+        page_size=args.page_size,
     )
+    print(f"{content_hash}  {output_path}")
     return 0
 
 